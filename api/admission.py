@@ -0,0 +1,145 @@
+import threading
+
+import pandas as pd
+
+from api.scoring import local_timestamp
+
+ADMIT   = "admit"
+DEGRADE = "degrade"
+REJECT  = "reject"
+
+
+class AdmissionController:
+    """
+    Deadline-aware admission control for the scoring path.
+
+    Tracks requests admitted but not yet finished (queued + running) and
+    an EWMA of model service time. A request is:
+      - rejected  when the hard queue limit is hit or its deadline has passed,
+      - degraded  when the soft queue limit is hit or the estimated
+                  completion time exceeds its deadline,
+      - admitted  otherwise.
+    """
+
+    def __init__(self, max_inflight=64, hard_limit=256, concurrency=4,
+                 initial_service_ms=10.0, alpha=0.2):
+        self.max_inflight = max_inflight
+        self.hard_limit = hard_limit
+        self.concurrency = max(1, concurrency)
+        self.alpha = alpha
+        self.service_ms = initial_service_ms
+
+        self.inflight = 0
+        self.admitted = 0
+        self.degraded = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def estimate_ms(self, inflight=None):
+        """Expected queue wait plus service time for a new request."""
+        inflight = self.inflight if inflight is None else inflight
+        waves = inflight // self.concurrency
+        return (waves + 1) * self.service_ms
+
+    def admit(self, deadline_ms=None):
+        with self._lock:
+            if self.inflight >= self.hard_limit or (deadline_ms is not None and deadline_ms <= 0):
+                self.rejected += 1
+                return REJECT
+            if self.inflight >= self.max_inflight or (
+                deadline_ms is not None and self.estimate_ms() > deadline_ms
+            ):
+                self.degraded += 1
+                return DEGRADE
+            self.inflight += 1
+            self.admitted += 1
+            return ADMIT
+
+    def release(self, service_ms=None):
+        with self._lock:
+            self.inflight -= 1
+            if service_ms is not None:
+                self.service_ms += self.alpha * (service_ms - self.service_ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "inflight": self.inflight,
+                "max_inflight": self.max_inflight,
+                "hard_limit": self.hard_limit,
+                "concurrency": self.concurrency,
+                "service_ms_ewma": round(self.service_ms, 3),
+                "estimated_wait_ms": round(self.estimate_ms(), 3),
+                "admitted": self.admitted,
+                "degraded": self.degraded,
+                "rejected": self.rejected,
+            }
+
+
+class LiveWork:
+    """
+    Live scoring calls queued or running in the threadpool, across every
+    path (/predict, /predict/batch, each streaming micro-batch). Used as a
+    context manager around the call.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.count += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.count -= 1
+
+
+# ── Degraded-mode rules ───────────────────────────────────
+# Cheap fallback over raw fields only; no feature engineering or model.
+#   amount >= 50,000          +0.35   (>= 20,000: +0.15)
+#   account_age_days < 30     +0.30   (< 90: +0.10)
+#   night (00:00–05:59 IST)   +0.20
+# on top of a 0.05 base score, capped at 0.99. Fraud needs at least
+# two signals to cross FALLBACK_THRESHOLD.
+
+FALLBACK_THRESHOLD = 0.5
+
+
+def fallback_score(data: dict) -> float:
+    score = 0.05
+
+    amount = float(data.get("amount") or 0.0)
+    if amount >= 50000:
+        score += 0.35
+    elif amount >= 20000:
+        score += 0.15
+
+    age = data.get("account_age_days")
+    if age is not None and age < 30:
+        score += 0.30
+    elif age is not None and age < 90:
+        score += 0.10
+
+    # same parser and IST normalisation as the model path, so a "...Z"
+    # timestamp gets the same night flag in degraded mode
+    ts = local_timestamp(data.get("timestamp"))
+    hour = None if pd.isna(ts) else ts.hour
+    if hour is not None and 0 <= hour <= 5:
+        score += 0.20
+
+    return min(score, 0.99)
+
+
+def fallback_decision(data: dict) -> dict:
+    prob = fallback_score(data)
+    return {
+        "transaction_id":    data["transaction_id"],
+        "fraud_probability": round(prob, 6),
+        "decision":          "Fraud" if prob > FALLBACK_THRESHOLD else "Safe",
+        "risk_level":        "High" if prob > 0.70 else ("Medium" if prob > FALLBACK_THRESHOLD else "Low"),
+        "threshold_used":    FALLBACK_THRESHOLD,
+        "degraded":          True
+    }
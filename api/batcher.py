@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+
+from api.scoring import engineer_frame, score_frame
+
+
+class MicroBatcher:
+    """
+    Coalesces individually submitted transactions into one model call.
+
+    A batch is flushed when it reaches `max_batch` rows or when the oldest
+    row has waited `max_wait_ms`. Feature engineering and inference run in
+    the threadpool so the event loop keeps reading sockets meanwhile.
+    `bundle()` returns the current (model, features, threshold), so a
+    model reload is picked up on the next batch. `enrich(df)`, if given,
+    fills in the raw frame before feature engineering; `observe(df, X,
+    probs, score_ms)`, if given, sees every scored batch and may return a
+    callable, which is run once the batch's results have been handed back.
+    `work`, if given, is a context manager held around each threadpool call.
+    """
+
+    def __init__(self, bundle, max_batch=256, max_wait_ms=5.0, enrich=None, observe=None,
+                 work=None):
+        self.bundle = bundle
+        self.enrich = enrich
+        self.observe = observe
+        self.work = work
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._task = None
+        self._loop = None
+
+        self.batches = 0
+        self.rows = 0
+        self.busy_ms = 0.0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, data: dict):
+        """Score one validated request dict; resolves to its decision."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((data, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # drain whatever else is already waiting, up to the cap
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            records = [data for data, _ in batch]
+            after = []
+            try:
+                start = time.perf_counter()
+                if self.work is not None:
+                    with self.work:
+                        results = await run_in_threadpool(self._score, records, after)
+                else:
+                    results = await run_in_threadpool(self._score, records, after)
+                self.busy_ms += (time.perf_counter() - start) * 1000
+                self.batches += 1
+                self.rows += len(records)
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            for job in after:
+                job()
+
+    def _score(self, records, after):
+        model, features, threshold = self.bundle()
+        df = pd.DataFrame.from_records(records)
+        if self.enrich is not None:
+            df = self.enrich(df)
+        try:
+            return self._score_frame(df, model, features, threshold, after)
+        except Exception:
+            if len(df) == 1:
+                raise
+        # A batch mixes records from unrelated connections, so one bad row
+        # must not fail the rest: rescore row by row (already enriched, so
+        # the online stores see each transaction once).
+        results = []
+        for i in range(len(df)):
+            try:
+                results.extend(self._score_frame(df.iloc[i:i + 1], model, features, threshold, after))
+            except Exception as e:
+                results.append({"transaction_id": records[i]["transaction_id"], "error": str(e)})
+        return results
+
+    def _score_frame(self, df, model, features, threshold, after):
+        X = engineer_frame(df, features)
+        start = time.perf_counter()
+        results = score_frame(model, X, df["transaction_id"].tolist(), threshold)
+        if "recent_duplicate" in df.columns:
+            for result, dup in zip(results, df["recent_duplicate"].to_numpy()):
+                result["recent_duplicate"] = bool(dup)
+        if self.observe is not None:
+            score_ms = (time.perf_counter() - start) * 1000
+            job = self.observe(df, X, [r["fraud_probability"] for r in results], score_ms)
+            if job is not None:
+                after.append(job)
+        return results
+
+    def backlog(self):
+        """Rows waiting for a batch slot."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "busy_ms": round(self.busy_ms, 1),
+            "queued": self.backlog(),
+        }
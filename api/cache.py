@@ -0,0 +1,130 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def payload_key(data: dict) -> str:
+    """transaction_id plus a hash of the full payload.
+
+    A retry with an identical body hits; a reused id with a
+    different body is scored again.
+    """
+    body = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return f"{data.get('transaction_id')}:{hashlib.sha1(body).hexdigest()}"
+
+
+class _InFlight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+    """
+    Bounded TTL + LRU cache of scoring results with single-flight.
+
+    Concurrent requests for the same key wait on the first computation
+    instead of scoring again. `invalidate()` bumps a generation counter
+    so results computed against a swapped-out model are never stored.
+    """
+
+    def __init__(self, maxsize=50000, ttl_seconds=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def peek(self, key):
+        """Return a live cached value (counted as a hit) or None, never blocking."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_or_compute(self, key, compute):
+        """Return (value, hit). `hit` is True for cached and coalesced results."""
+        if self.maxsize <= 0:
+            return compute(), False
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value, True
+                del self._data[key]
+                self.expirations += 1
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = _InFlight()
+                self._inflight[key] = pending
+                generation = self._generation
+                self.misses += 1
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value, True
+
+        try:
+            pending.value = compute()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if pending.error is None and generation == self._generation:
+                    self._data[key] = (time.monotonic() + self.ttl, pending.value)
+                    self._data.move_to_end(key)
+                    while len(self._data) > self.maxsize:
+                        self._data.popitem(last=False)
+                        self.evictions += 1
+            pending.event.set()
+
+        return pending.value, False
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "generation": self._generation,
+            }
@@ -0,0 +1,125 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from api.scoring import parse_timestamps
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK      = "application/x-msgpack"
+JSON         = "application/json"
+
+_MSGPACK_ALIASES = {MSGPACK, "application/msgpack", "application/vnd.msgpack"}
+
+REQUIRED_COLUMNS = [
+    "transaction_id", "timestamp", "sender_id", "receiver_id", "amount",
+    "transaction_type", "merchant_category", "sender_state", "receiver_state",
+    "sender_bank", "receiver_bank", "device_type", "network_type",
+    "account_age_days",
+]
+
+
+class UnsupportedFormat(Exception):
+    pass
+
+
+class BatchValidationError(Exception):
+    pass
+
+
+def body_format(content_type):
+    media = (content_type or JSON).split(";")[0].strip().lower()
+    if media == ARROW_STREAM:
+        return ARROW_STREAM
+    if media in _MSGPACK_ALIASES:
+        return MSGPACK
+    if media in (JSON, "application/x-ndjson"):
+        return JSON
+    raise UnsupportedFormat(f"Unsupported content type: {media}")
+
+
+# ── Decoding ──────────────────────────────────────────────
+def decode_batch(body: bytes, fmt: str) -> pd.DataFrame:
+    """
+    Decode a batch body into a column frame.
+
+    Arrow IPC is columnar on the wire. MessagePack and JSON accept either
+    a column map ({"amount": [...], ...}) or a list of row objects.
+    """
+    if fmt == ARROW_STREAM:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise UnsupportedFormat("Arrow ingestion needs pyarrow (pip install pyarrow)")
+        with pa.ipc.open_stream(pa.BufferReader(body)) as reader:
+            return reader.read_all().to_pandas()
+
+    if fmt == MSGPACK:
+        try:
+            import msgpack
+        except ImportError:
+            raise UnsupportedFormat("MessagePack ingestion needs msgpack (pip install msgpack)")
+        payload = msgpack.unpackb(body, raw=False)
+    else:
+        payload = json.loads(body)
+
+    if isinstance(payload, dict) and "records" in payload:
+        payload = payload["records"]
+    if isinstance(payload, dict):
+        return pd.DataFrame(payload)
+    if isinstance(payload, list):
+        return pd.DataFrame.from_records(payload)
+    raise BatchValidationError("Batch body must be a column map or a list of records")
+
+
+# ── Vectorized validation ─────────────────────────────────
+def validate_batch(df: pd.DataFrame) -> np.ndarray:
+    """
+    Column-wise checks matching TransactionRequest. Returns an array of
+    per-row error strings (None where the row is valid). Missing required
+    columns fail the whole batch.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise BatchValidationError(f"Missing required columns: {', '.join(missing)}")
+
+    errors = np.full(len(df), None, dtype=object)
+
+    def flag(mask, message):
+        mask = np.asarray(mask, dtype=bool) & pd.isna(errors)
+        errors[mask] = message
+
+    amount = pd.to_numeric(df["amount"], errors="coerce")
+    age    = pd.to_numeric(df["account_age_days"], errors="coerce")
+    ts     = parse_timestamps(df["timestamp"])
+
+    for column in REQUIRED_COLUMNS:
+        flag(df[column].isna(), f"{column} is required")
+    flag(~(amount > 0), "amount must be > 0")
+    flag(~np.isfinite(amount), "amount must be finite")
+    flag(~(age >= 0), "account_age_days must be >= 0")
+    flag(ts.isna(), "timestamp is not a valid ISO-8601 datetime")
+    return errors
+
+
+# ── Encoding ──────────────────────────────────────────────
+def encode_results(columns: dict, fmt: str):
+    """Encode result columns in the request's format; returns (bytes, media_type)."""
+    if fmt == ARROW_STREAM:
+        import pyarrow as pa
+        table = pa.table(columns)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), ARROW_STREAM
+
+    # NaN is not valid JSON; missing values go out as null
+    plain = {
+        k: [None if isinstance(x, float) and x != x else x for x in np.asarray(v).tolist()]
+        for k, v in columns.items()
+    }
+    if fmt == MSGPACK:
+        import msgpack
+        return msgpack.packb(plain, use_bin_type=True), MSGPACK
+    return json.dumps(plain).encode("utf-8"), JSON
@@ -0,0 +1,378 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+SCORE_BINS = 100                                      # uniform over [0, 1]
+LATENCY_EDGES = np.geomspace(0.05, 30000, 80)         # ms, log-spaced
+PATH_CODES = {"predict": 0, "batch": 1, "stream": 2, "degraded": 3}
+
+
+def _percentiles(hist, upper_edges, qs=(50, 90, 99)):
+    """Percentiles from a histogram, reported at the bin's upper edge."""
+    total = hist.sum()
+    if total == 0:
+        return [None] * len(qs)
+    cum = np.cumsum(hist)
+    idx = [int(np.searchsorted(cum, total * q / 100.0)) for q in qs]
+    return [round(float(upper_edges[min(i, len(upper_edges) - 1)]), 4) for i in idx]
+
+
+_SCORE_UPPER = np.linspace(0, 1, SCORE_BINS + 1)[1:]
+_LATENCY_UPPER = np.append(LATENCY_EDGES, np.inf)
+
+
+class _Minute:
+    """Mergeable per-minute aggregate (counts and fixed histograms)."""
+
+    __slots__ = ("minute", "count", "fraud", "degraded", "latency_sum",
+                 "score_hist", "latency_hist")
+
+    def __init__(self, minute):
+        self.minute = minute
+        self.count = 0
+        self.fraud = 0
+        self.degraded = 0
+        self.latency_sum = 0.0
+        self.score_hist = np.zeros(SCORE_BINS, dtype=np.int64)
+        self.latency_hist = np.zeros(len(LATENCY_EDGES) + 1, dtype=np.int64)
+
+    def add(self, probs, is_fraud, latency_ms, degraded):
+        self.count += len(probs)
+        self.fraud += int(is_fraud.sum())
+        self.degraded += int(degraded.sum())
+        self.latency_sum += float(latency_ms.sum())
+        score_bins = np.clip((probs * SCORE_BINS).astype(np.int64), 0, SCORE_BINS - 1)
+        self.score_hist += np.bincount(score_bins, minlength=SCORE_BINS)
+        self.latency_hist += np.bincount(
+            np.searchsorted(LATENCY_EDGES, latency_ms), minlength=len(LATENCY_EDGES) + 1
+        )
+
+    def merge(self, other):
+        self.count += other.count
+        self.fraud += other.fraud
+        self.degraded += other.degraded
+        self.latency_sum += other.latency_sum
+        self.score_hist += other.score_hist
+        self.latency_hist += other.latency_hist
+
+    def summary(self, histograms=False):
+        s50, s90, s99 = _percentiles(self.score_hist, _SCORE_UPPER)
+        l50, l90, l99 = _percentiles(self.latency_hist, _LATENCY_UPPER)
+        row = {
+            "minute": self.minute,
+            "count": self.count,
+            "fraud": self.fraud,
+            "fraud_rate": round(self.fraud / self.count, 5) if self.count else None,
+            "degraded": self.degraded,
+            "score_p50": s50, "score_p90": s90, "score_p99": s99,
+            "latency_mean_ms": round(self.latency_sum / self.count, 3) if self.count else None,
+            "latency_p50_ms": l50, "latency_p90_ms": l90, "latency_p99_ms": l99,
+        }
+        if histograms:
+            row["score_hist"] = self.score_hist.tolist()
+            row["latency_hist"] = self.latency_hist.tolist()
+        return row
+
+    @classmethod
+    def from_row(cls, row):
+        m = cls(row["minute"])
+        m.count, m.fraud, m.degraded = row["count"], row["fraud"], row["degraded"]
+        m.latency_sum = (row["latency_mean_ms"] or 0.0) * row["count"]
+        m.score_hist = np.asarray(row["score_hist"], dtype=np.int64)
+        m.latency_hist = np.asarray(row["latency_hist"], dtype=np.int64)
+        return m
+
+
+class DecisionLog:
+    """
+    Append-only log of every decision plus per-minute rollups.
+
+    Decisions are buffered in memory and written by a background thread
+    as Arrow IPC record batches into `segment-*.arrow` files (a new
+    segment every `segment_rows` rows), so the request path only appends
+    to a list. Rollups are updated as decisions arrive; each minute is
+    appended to `rollups.ndjson` once it closes, histograms included, so
+    any time range can be re-aggregated without reading raw segments.
+
+    Retention runs on the same thread. Closed segments older than
+    `retain_minutes` are deleted, and so are the oldest ones while all
+    segments together exceed `max_bytes` (None: no size cap).
+    `rollups.ndjson` is rewritten without expired minutes about once an
+    hour.
+    """
+
+    def __init__(self, directory, segment_rows=1_000_000, flush_rows=4096,
+                 flush_seconds=1.0, retain_minutes=7 * 24 * 60, max_bytes=None,
+                 recent=200, retention_seconds=60.0):
+        import pyarrow as pa  # optional dependency; the caller disables the log without it
+
+        self._pa = pa
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.retain_minutes = retain_minutes
+        self.max_bytes = max_bytes
+        self.retention_seconds = retention_seconds
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._buffer = []
+        self._pending = 0
+        self._recent = deque(maxlen=recent)
+        self._minutes = {}
+        self._closed = deque()
+        self._writer = None
+        self._segment_path = None
+        self._segment_written = 0
+        self.rows_logged = 0
+        self.rows_written = 0
+        self.segments = 0
+        self.segments_deleted = 0
+        self.bytes_on_disk = 0
+
+        self._rollup_path = os.path.join(directory, "rollups.ndjson")
+        self._rollups_from = None  # oldest minute still in rollups.ndjson
+        self._load_rollups()
+        self._retained_at = 0.0
+
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="decision-log", daemon=True)
+        self._thread.start()
+
+    # ── Appending (request path) ──────────────────────────
+    def append(self, transaction_ids, probs, threshold, latency_ms, path, amounts=None,
+               degraded=False, ts=None):
+        """Record a batch of decisions (arrays or scalars of equal length)."""
+        ids = np.atleast_1d(np.asarray(transaction_ids, dtype=object))
+        n = len(ids)
+        if n == 0:
+            return
+        probs = np.broadcast_to(np.asarray(probs, dtype=np.float64), (n,))
+        latency = np.broadcast_to(np.asarray(latency_ms, dtype=np.float64), (n,))
+        amounts = np.broadcast_to(
+            np.asarray(np.nan if amounts is None else amounts, dtype=np.float64), (n,)
+        )
+        flags = np.broadcast_to(np.asarray(degraded, dtype=bool), (n,))
+        is_fraud = probs > threshold
+        ts = time.time() if ts is None else ts
+        minute = int(ts // 60)
+
+        batch = {
+            "ts": np.full(n, ts),
+            "transaction_id": ids,
+            "amount": amounts,
+            "fraud_probability": probs,
+            "is_fraud": is_fraud,
+            "latency_ms": latency,
+            "path": np.full(n, PATH_CODES.get(path, -1), dtype=np.int8),
+            "degraded": flags,
+        }
+        with self._lock:
+            self._buffer.append(batch)
+            bucket = self._minutes.get(minute)
+            if bucket is None:
+                bucket = self._minutes[minute] = _Minute(minute)
+            bucket.add(probs, is_fraud, latency, flags)
+            self.rows_logged += n
+            for i in range(max(0, n - self._recent.maxlen), n):
+                self._recent.append({
+                    "ts": ts,
+                    "transaction_id": str(ids[i]),
+                    "amount": None if np.isnan(amounts[i]) else float(amounts[i]),
+                    "fraud_probability": round(float(probs[i]), 6),
+                    "decision": "Fraud" if is_fraud[i] else "Safe",
+                    "risk_level": "High" if probs[i] > 0.70 else ("Medium" if is_fraud[i] else "Low"),
+                    "path": path,
+                })
+            self._pending += n
+            pending = self._pending
+        if pending >= self.flush_rows:
+            self._wake.set()
+
+    # ── Background writer ─────────────────────────────────
+    def _run(self):
+        while not self._stop:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Decision log flush failed: {e}")
+            if time.monotonic() - self._retained_at >= self.retention_seconds:
+                self._retained_at = time.monotonic()
+                try:
+                    self.enforce_retention()
+                except Exception as e:
+                    print(f"Decision log retention failed: {e}")
+
+    def flush(self, final=False):
+        with self._lock:
+            batches, self._buffer = self._buffer, []
+            self._pending = 0
+            # on shutdown the open minute is persisted too; rows merge additively
+            now_minute = int(time.time() // 60) + (1 if final else 0)
+            closing = [m for m in self._minutes if m < now_minute]
+            closed = [self._minutes.pop(m) for m in sorted(closing)]
+        if batches:
+            self._write_batches(batches)
+        if closed:
+            with open(self._rollup_path, "a") as f:
+                for bucket in closed:
+                    f.write(json.dumps(bucket.summary(histograms=True)) + "\n")
+            if self._rollups_from is None:
+                self._rollups_from = closed[0].minute
+            with self._lock:
+                self._closed.extend(closed)
+                self._trim()
+
+    def _write_batches(self, batches):
+        pa = self._pa
+        columns = {k: np.concatenate([b[k] for b in batches]) for k in batches[0]}
+        table = pa.table({
+            "ts": pa.array(columns["ts"], pa.float64()),
+            "transaction_id": pa.array(columns["transaction_id"].astype(str), pa.string()),
+            "amount": pa.array(columns["amount"], pa.float32()),
+            "fraud_probability": pa.array(columns["fraud_probability"], pa.float32()),
+            "is_fraud": pa.array(columns["is_fraud"], pa.bool_()),
+            "latency_ms": pa.array(columns["latency_ms"], pa.float32()),
+            "path": pa.array(columns["path"], pa.int8()),
+            "degraded": pa.array(columns["degraded"], pa.bool_()),
+        })
+        if self._writer is None or self._segment_written >= self.segment_rows:
+            self._rotate(table.schema)
+        self._writer.write_table(table)
+        self._segment_written += table.num_rows
+        self.rows_written += table.num_rows
+
+    def _rotate(self, schema):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+        name = f"segment-{time.strftime('%Y%m%dT%H%M%S')}-{self.segments:05d}.arrow"
+        self._segment_path = os.path.join(self.directory, name)
+        self._sink = self._pa.OSFile(self._segment_path, "wb")
+        self._writer = self._pa.ipc.new_stream(self._sink, schema)
+        self._segment_written = 0
+        self.segments += 1
+
+    def close(self):
+        self._stop = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush(final=True)
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            self._writer = None
+
+    # ── Retention ─────────────────────────────────────────
+    def enforce_retention(self):
+        """Delete expired or over-budget segments and compact the rollups."""
+        segments = []
+        for name in sorted(os.listdir(self.directory)):  # names sort by creation time
+            path = os.path.join(self.directory, name)
+            if name.startswith("segment-") and name.endswith(".arrow"):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                segments.append((path, st.st_size, st.st_mtime))
+
+        cutoff = time.time() - self.retain_minutes * 60
+        total = sum(size for _, size, _ in segments)
+        for path, size, mtime in segments:
+            if path == self._segment_path:
+                continue  # still being written; the newest anyway
+            expired = mtime < cutoff
+            over = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or over):
+                break
+            os.remove(path)
+            total -= size
+            self.segments_deleted += 1
+        self.bytes_on_disk = total
+
+        oldest = int(time.time() // 60) - self.retain_minutes
+        if self._rollups_from is not None and self._rollups_from < oldest - 60:
+            self._compact_rollups()
+
+    def _compact_rollups(self):
+        # _closed already holds exactly the retained minutes, histograms included
+        with self._lock:
+            self._trim()
+            kept = list(self._closed)
+        tmp = self._rollup_path + ".tmp"
+        with open(tmp, "w") as f:
+            for bucket in kept:
+                f.write(json.dumps(bucket.summary(histograms=True)) + "\n")
+        os.replace(tmp, self._rollup_path)
+        self._rollups_from = kept[0].minute if kept else None
+
+    # ── Rollups (read path) ───────────────────────────────
+    def _load_rollups(self):
+        if not os.path.exists(self._rollup_path):
+            return
+        oldest = int(time.time() // 60) - self.retain_minutes
+        with open(self._rollup_path) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if self._rollups_from is None or row["minute"] < self._rollups_from:
+                    self._rollups_from = row["minute"]
+                if row["minute"] >= oldest:
+                    self._closed.append(_Minute.from_row(row))
+
+    def _trim(self):
+        oldest = int(time.time() // 60) - self.retain_minutes
+        while self._closed and self._closed[0].minute < oldest:
+            self._closed.popleft()
+
+    def rollups(self, minutes=60, step=1):
+        """
+        Rollup rows for the last `minutes` (open minute included), merged
+        into `step`-minute buckets, plus a total over the whole range.
+        """
+        now_minute = int(time.time() // 60)
+        first = now_minute - minutes + 1
+        with self._lock:
+            buckets = [m for m in self._closed if m.minute >= first]
+            buckets += [m for m in self._minutes.values() if m.minute >= first]
+
+        merged = {}
+        total = _Minute(first)
+        for bucket in buckets:
+            key = first + (bucket.minute - first) // step * step
+            if key not in merged:
+                merged[key] = _Minute(key)
+            merged[key].merge(bucket)
+            total.merge(bucket)
+        rows = [merged[k].summary() for k in sorted(merged)]
+        return {"step_minutes": step, "minutes": minutes, "rows": rows, "total": total.summary()}
+
+    def recent(self, limit=20):
+        with self._lock:
+            items = list(self._recent)[-limit:]
+        return items[::-1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "rows_logged": self.rows_logged,
+                "rows_written": self.rows_written,
+                "pending": self._pending,
+                "segments": self.segments,
+                "segments_deleted": self.segments_deleted,
+                "bytes_on_disk": self.bytes_on_disk,
+                "max_bytes": self.max_bytes,
+                "retain_minutes": self.retain_minutes,
+                "rollup_minutes": len(self._closed) + len(self._minutes),
+            }
@@ -0,0 +1,93 @@
+import threading
+
+
+class IncrementalComponents:
+    """
+    Online union-find over weak components, seeded from the training graph.
+
+    Nodes known at training time resolve to their exported component label
+    (>= 0) through the mmap'd components index, so the seed costs nothing
+    at startup. Only components touched by new edges live in the Python
+    dicts. Nodes first seen online get negative labels; once
+    `max_new_nodes` of them are tracked, further unseen nodes count as
+    singletons instead of growing memory.
+    """
+
+    def __init__(self, index=None, max_new_nodes=1_000_000):
+        self.index = index
+        self.max_new_nodes = max_new_nodes
+        self._parent = {}
+        self._size = {}
+        self._new_nodes = {}
+        self._lock = threading.Lock()
+        self.edges_seen = 0
+
+    def _label(self, node_id):
+        """Component label for a node (registering its base size), or None."""
+        if self.index is not None:
+            row = self.index.lookup(node_id)
+            if row is not None:
+                label = int(row["component"])
+                if label not in self._size and label not in self._parent:
+                    self._size[label] = int(row["component_size"])
+                return label
+
+        label = self._new_nodes.get(node_id)
+        if label is None:
+            if len(self._new_nodes) >= self.max_new_nodes:
+                return None
+            label = -(len(self._new_nodes) + 1)
+            self._new_nodes[node_id] = label
+            self._size[label] = 1
+        return label
+
+    def _find(self, label):
+        root = label
+        while root in self._parent:
+            root = self._parent[root]
+        while label != root:  # path compression
+            self._parent[label], label = root, self._parent[label]
+        return root
+
+    def add_edge(self, sender_id, receiver_id):
+        """Union both endpoints; returns the sender's component size after."""
+        with self._lock:
+            self.edges_seen += 1
+            a = self._label(sender_id)
+            b = self._label(receiver_id)
+            if a is None:
+                return 1
+            ra = self._find(a)
+            if b is None:
+                return self._size[ra]
+            rb = self._find(b)
+            if ra == rb:
+                return self._size[ra]
+            if self._size[ra] < self._size[rb]:
+                ra, rb = rb, ra
+            self._parent[rb] = ra
+            self._size[ra] += self._size.pop(rb)
+            return self._size[ra]
+
+    def component_size(self, node_id):
+        """Read-only lookup (explain): never registers the node; 1 if unseen."""
+        with self._lock:
+            if self.index is not None:
+                row = self.index.lookup(node_id)
+                if row is not None:
+                    label = int(row["component"])
+                    if label not in self._size and label not in self._parent:
+                        return int(row["component_size"])  # untouched seed component
+                    return self._size[self._find(label)]
+            label = self._new_nodes.get(node_id)
+            return 1 if label is None else self._size[self._find(label)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "edges_seen": self.edges_seen,
+                "seeded_nodes": len(self.index) if self.index is not None else 0,
+                "new_nodes": len(self._new_nodes),
+                "max_new_nodes": self.max_new_nodes,
+                "touched_components": len(self._size),
+            }
@@ -1,21 +1,80 @@
+import time
+_IMPORT_START = time.perf_counter()  # time-to-ready is measured from here
 
-from fastapi import FastAPI, HTTPException
+from fastapi import (
+    BackgroundTasks, FastAPI, HTTPException, Header, Request, Response, WebSocket, WebSocketDisconnect
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+import asyncio
+import json
+import math
+import anyio
+from contextlib import asynccontextmanager
 import pickle
 import pandas as pd
 import numpy as np
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import Optional
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
+from api.batcher import MicroBatcher
+from api.admission import (
+    ADMIT, DEGRADE, FALLBACK_THRESHOLD, AdmissionController, LiveWork, fallback_decision
+)
+from api.cache import ResultCache, payload_key
+from api.columnar import (
+    BatchValidationError, UnsupportedFormat,
+    body_format, decode_batch, encode_results, validate_batch
+)
+from api.decision_log import DecisionLog
+from api.graph import IncrementalComponents
+from api.profiling import RequestProfiler
+from api.receivers import ReceiverStore
+from api.replay import ReplayDetector
+from api.scoring import (
+    TransactionRequest, decide, engineer_frame, engineer_single_row, enrich_frame,
+    request_dict, score_columns, synthetic_records
+)
+from api.shadow import ShadowScorer
+from src.drift import CATEGORICAL_FEATURES, NUMERIC_FEATURES, SCORE, DriftMonitor
+from src.explain import ExplanationCache, explain_frame
+from src.sender_profiles import SenderProfileIndex
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Liveness (/health) answers at once; model load and warm-up run in
+    # the background and /ready flips to 200 when they are done.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    if BLOCKING_STARTUP:
+        await _start()
+        loader = None
+    else:
+        loader = asyncio.create_task(_start())
+    yield
+    if loader is not None:
+        loader.cancel()
+    if decision_log is not None:
+        decision_log.close()
+    explain_executor.shutdown(wait=False)
+    if shadow is not None:
+        shadow.shutdown()
+
+
 app = FastAPI(
     title="UPI-Guard++ Fraud Detection API",
     description="Graph-aware, cost-sensitive UPI fraud detection using XGBoost",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # ── CORS — allow Streamlit UI (localhost:8501) ────────────
@@ -30,121 +89,876 @@ app.add_middleware(
 MODEL_PATH     = os.path.join(BASE_DIR, "model", "fraud_model.pkl")
 FEATURE_PATH   = os.path.join(BASE_DIR, "model", "feature_columns.pkl")
 THRESHOLD_PATH = os.path.join(BASE_DIR, "model", "threshold.pkl")
+PROFILES_PATH  = os.environ.get(
+    "UPI_GUARD_SENDER_PROFILES",
+    os.path.join(BASE_DIR, "model", "sender_profiles.bin")
+)
+COMPONENTS_PATH = os.environ.get(
+    "UPI_GUARD_GRAPH_COMPONENTS",
+    os.path.join(BASE_DIR, "model", "graph_components.bin")
+)
+GRAPH_MAX_NEW_NODES = int(os.environ.get("UPI_GUARD_GRAPH_MAX_NEW_NODES", "1000000"))
+DRIFT_REFERENCE_PATH = os.environ.get(
+    "UPI_GUARD_DRIFT_REFERENCE",
+    os.path.join(BASE_DIR, "model", "drift_reference.json")
+)
+DRIFT_BUCKET_SECONDS = float(os.environ.get("UPI_GUARD_DRIFT_BUCKET_SECONDS", "60"))
+DRIFT_BUCKETS        = int(os.environ.get("UPI_GUARD_DRIFT_BUCKETS", "60"))
+
+# Candidate model scored in the background on live traffic (off when unset)
+SHADOW_MODEL_PATH     = os.environ.get("UPI_GUARD_SHADOW_MODEL")
+SHADOW_FEATURE_PATH   = os.environ.get("UPI_GUARD_SHADOW_FEATURES", FEATURE_PATH)
+SHADOW_THRESHOLD_PATH = os.environ.get("UPI_GUARD_SHADOW_THRESHOLD")
+SHADOW_MAX_PENDING    = int(os.environ.get("UPI_GUARD_SHADOW_MAX_PENDING", "64"))
+
+ADMIN_TOKEN = os.environ.get("UPI_GUARD_ADMIN_TOKEN")
+
+# ── Replay / duplicate detection (rotating Bloom filters) ─
+replay = ReplayDetector(
+    window_seconds=float(os.environ.get("UPI_GUARD_REPLAY_WINDOW_SECONDS", "120")),
+    slices=int(os.environ.get("UPI_GUARD_REPLAY_SLICES", "4")),
+    capacity=int(os.environ.get("UPI_GUARD_REPLAY_CAPACITY", "1000000")),
+)
+
+# ── Receiver aggregates (bounded, LRU-evicted) ───────────
+receivers = ReceiverStore(
+    max_receivers=int(os.environ.get("UPI_GUARD_RECEIVER_MAX_ACCOUNTS", "100000")),
+    max_events=int(os.environ.get("UPI_GUARD_RECEIVER_MAX_EVENTS", "1000000")),
+    max_events_per_receiver=int(os.environ.get("UPI_GUARD_RECEIVER_MAX_EVENTS_PER_ACCOUNT", "10000")),
+)
+
+# ── Decision log (append-only segments + per-minute rollups) ──
+DECISION_LOG_DIR = os.environ.get(
+    "UPI_GUARD_DECISION_LOG_DIR", os.path.join(BASE_DIR, "decision_log")
+)  # empty string disables
+DECISION_LOG_SEGMENT_ROWS = int(os.environ.get("UPI_GUARD_DECISION_LOG_SEGMENT_ROWS", "1000000"))
+DECISION_LOG_RETAIN_DAYS  = float(os.environ.get("UPI_GUARD_DECISION_LOG_RETAIN_DAYS", "7"))
+DECISION_LOG_MAX_BYTES    = int(os.environ.get("UPI_GUARD_DECISION_LOG_MAX_BYTES", "10000000000"))  # 0: no cap
+
+# ── Request profiling (opt-in) ────────────────────────────
+profiler = RequestProfiler(
+    directory=os.environ.get("UPI_GUARD_PROFILE_DIR", os.path.join(BASE_DIR, "profiles")),
+    sample_rate=float(os.environ.get("UPI_GUARD_PROFILE_SAMPLE_RATE", "0")),
+    max_files=int(os.environ.get("UPI_GUARD_PROFILE_MAX_FILES", "200")),
+    mode=os.environ.get("UPI_GUARD_PROFILE_MODE", "stack"),
+    admin_token=ADMIN_TOKEN,
+)
+
+# ── Result cache (idempotent retries) ─────────────────────
+result_cache = ResultCache(
+    maxsize=int(os.environ.get("UPI_GUARD_RESULT_CACHE_SIZE", "50000")),
+    ttl_seconds=float(os.environ.get("UPI_GUARD_RESULT_CACHE_TTL", "300")),
+)
+
+# ── Admission control (load shedding) ─────────────────────
+# Scoring runs in the AnyIO worker threadpool (run_in_threadpool); the
+# lifespan hook sizes it from the same setting the wait estimate uses.
+THREADPOOL_SIZE = int(os.environ.get("UPI_GUARD_THREADPOOL_SIZE", "40"))
+
+admission = AdmissionController(
+    max_inflight=int(os.environ.get("UPI_GUARD_MAX_INFLIGHT", "64")),
+    hard_limit=int(os.environ.get("UPI_GUARD_HARD_INFLIGHT", "256")),
+    concurrency=THREADPOOL_SIZE,
+)
+live_work = LiveWork()  # every live scoring call, not just /predict
+
+# ── Streaming connections (WebSocket / NDJSON) ────────────
+BATCH_MAX_ROWS      = int(os.environ.get("UPI_GUARD_BATCH_MAX_ROWS", "100000"))
+STREAM_MAX_INFLIGHT = int(os.environ.get("UPI_GUARD_STREAM_MAX_INFLIGHT", "512"))
+
+batcher = MicroBatcher(
+    bundle=lambda: (model, features, threshold),
+    enrich=lambda df: _enrich_frame(df),
+    observe=lambda df, X, probs, score_ms: _after_batch(df, X, probs, score_ms),
+    work=live_work,
+    max_batch=int(os.environ.get("UPI_GUARD_BATCH_MAX_SIZE", "256")),
+    max_wait_ms=float(os.environ.get("UPI_GUARD_BATCH_MAX_WAIT_MS", "5")),
+)
+
+
+# ── Explanation settings (opt-in) ─────────────────────────
+EXPLAIN_ENABLED   = os.environ.get("UPI_GUARD_ENABLE_EXPLAIN", "0") == "1"
+EXPLAIN_BUDGET_MS = float(os.environ.get("UPI_GUARD_EXPLAIN_BUDGET_MS", "50"))
+EXPLAIN_CACHE_MAX = int(os.environ.get("UPI_GUARD_EXPLAIN_CACHE_SIZE", "10000"))
+EXPLAIN_MAX_PENDING = int(os.environ.get("UPI_GUARD_EXPLAIN_MAX_PENDING", "8"))
+
+explain_cache    = ExplanationCache(maxsize=EXPLAIN_CACHE_MAX)
+explain_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="explain")
+explain_slots    = threading.BoundedSemaphore(EXPLAIN_MAX_PENDING)  # queued + running
+
+
+# ── Startup / readiness ───────────────────────────────────
+WARMUP_REQUESTS   = int(os.environ.get("UPI_GUARD_WARMUP_REQUESTS", "32"))
+WARMUP_BATCH_ROWS = int(os.environ.get("UPI_GUARD_WARMUP_BATCH_ROWS", "256"))
+BLOCKING_STARTUP  = os.environ.get("UPI_GUARD_BLOCKING_STARTUP", "0") == "1"
+
+startup = {
+    "phase": "starting",
+    "import_ms": None,
+    "load_ms": None,
+    "warmup_ms": None,
+    "time_to_ready_ms": None,
+    "warmup": None,
+    "error": None,
+}
+
+# Filled in by load_artifacts() / _start() from the lifespan hook
+model = features = sender_profiles = drift = shadow = decision_log = None
+threshold  = 0.18
+components = IncrementalComponents()
+
+
+def _warm_up(new_model, new_features, new_profiles) -> dict:
+    """
+    Run synthetic requests through the real single-row and batch feature
+    paths, so lazy imports, XGBoost's first-call setup and the profile
+    pages are paid for before the first real request. Stateful pieces
+    (union-find, drift, shadow, caches) are left untouched.
+    """
+    records = synthetic_records(new_features, max(WARMUP_REQUESTS, WARMUP_BATCH_ROWS))
+    latencies = []
+    for record in records[:WARMUP_REQUESTS]:
+        start = time.perf_counter()
+        data = dict(record)
+        if new_profiles is not None:
+            new_profiles.fill_record(data)
+        new_model.predict_proba(engineer_single_row(data, new_features))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    batch_ms = None
+    if WARMUP_BATCH_ROWS:
+        start = time.perf_counter()
+        df = pd.DataFrame.from_records(records[:WARMUP_BATCH_ROWS])
+        if new_profiles is not None:
+            df = new_profiles.fill_frame(df)
+        new_model.predict_proba(engineer_frame(df, new_features))
+        batch_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    tail = latencies[-max(1, len(latencies) // 4):]
+    return {
+        "requests": len(latencies),
+        "first_ms": round(latencies[0], 2) if latencies else None,
+        "steady_ms": round(float(np.median(tail)), 2) if latencies else None,
+        "batch_rows": WARMUP_BATCH_ROWS,
+        "batch_ms": batch_ms,
+    }
+
+
+def _open_decision_log():
+    global decision_log
+    if not DECISION_LOG_DIR:
+        return
+    try:
+        decision_log = DecisionLog(
+            DECISION_LOG_DIR,
+            segment_rows=DECISION_LOG_SEGMENT_ROWS,
+            retain_minutes=int(DECISION_LOG_RETAIN_DAYS * 24 * 60),
+            max_bytes=DECISION_LOG_MAX_BYTES or None,
+        )
+    except ImportError:
+        print("Decision log disabled: needs pyarrow (pip install pyarrow)")
+
+
+async def _start():
+    startup["phase"] = "loading"
+    try:
+        await run_in_threadpool(_open_decision_log)
+        await run_in_threadpool(load_artifacts)
+    except Exception as e:
+        startup.update(phase="failed", error=str(e))
+        print(f"Startup failed: {e}")
+        return
+    startup["time_to_ready_ms"] = round((time.perf_counter() - _IMPORT_START) * 1000, 1)
+    startup["phase"] = "ready"
+    print(f"Ready in {startup['time_to_ready_ms']:.0f} ms "
+          f"(load {startup['load_ms']:.0f} ms, warm-up {startup['warmup_ms']:.0f} ms)")
+
+
+def _require_ready():
+    if model is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Model is still loading",
+            headers={"Retry-After": "1"}
+        )
+
+
+def load_artifacts():
+    """
+    (Re)load model, features and threshold, warm the new bundle up, then
+    swap it in; drops every cached result.
+    """
+    global model, features, threshold, sender_profiles, components, drift, shadow
+
+    start = time.perf_counter()
+
+    new_model    = pickle.load(open(MODEL_PATH, "rb"))
+    new_features = list(pickle.load(open(FEATURE_PATH, "rb")))
+    if os.path.exists(THRESHOLD_PATH):
+        new_threshold = float(pickle.load(open(THRESHOLD_PATH, "rb")))
+    else:
+        new_threshold = 0.18
+
+    # mmap'd read-only: opening reads only the header, pages are shared
+    new_profiles = SenderProfileIndex(PROFILES_PATH) if os.path.exists(PROFILES_PATH) else None
+    new_components = IncrementalComponents(
+        SenderProfileIndex(COMPONENTS_PATH) if os.path.exists(COMPONENTS_PATH) else None,
+        max_new_nodes=GRAPH_MAX_NEW_NODES
+    )
+    # a new model gets a new reference and an empty window
+    new_drift = DriftMonitor.load(
+        DRIFT_REFERENCE_PATH, bucket_seconds=DRIFT_BUCKET_SECONDS, n_buckets=DRIFT_BUCKETS
+    ) if os.path.exists(DRIFT_REFERENCE_PATH) else None
+
+    new_shadow = _load_shadow(new_threshold) if SHADOW_MODEL_PATH else None
+    startup["load_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    # warm before the swap, so a reload never serves a cold model either
+    startup["phase"] = "warming" if model is None else startup["phase"]
+    start = time.perf_counter()
+    startup["warmup"] = _warm_up(new_model, new_features, new_profiles)
+    startup["warmup_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    model, features, threshold = new_model, new_features, new_threshold
+    sender_profiles = new_profiles
+    components = new_components
+    drift = new_drift
+    if shadow is not None:
+        shadow.shutdown()
+    shadow = new_shadow
+    result_cache.invalidate()
+    explain_cache.clear()
+
+    print(f"Model loaded | Features: {len(features)} | Threshold: {threshold:.4f} | "
+          f"Sender profiles: {len(sender_profiles) if sender_profiles is not None else 'none'}")
+
+
+def _load_shadow(live_threshold):
+    shadow_threshold = live_threshold
+    if SHADOW_THRESHOLD_PATH and os.path.exists(SHADOW_THRESHOLD_PATH):
+        shadow_threshold = float(pickle.load(open(SHADOW_THRESHOLD_PATH, "rb")))
+    return ShadowScorer(
+        pickle.load(open(SHADOW_MODEL_PATH, "rb")),
+        list(pickle.load(open(SHADOW_FEATURE_PATH, "rb"))),
+        shadow_threshold,
+        max_pending=SHADOW_MAX_PENDING,
+        # any queueing on a live path means no spare capacity for shadow work
+        busy=lambda: live_work.count > THREADPOOL_SIZE or batcher.backlog() >= batcher.max_batch,
+    )
+
+
+def _enrich(data: dict, observe: bool = True) -> dict:
+    """
+    Fill missing sender fields from the profile index. With `observe`, the
+    transaction's edge is first merged into the online union-find and its
+    payment added to the receiver's windows, so component size and receiver
+    aggregates count the transaction itself, as build_features does
+    offline, and its fingerprint is recorded for replay detection.
+    `recent_duplicate` always comes from the replay detector; a re-read
+    (explain) gets the verdict the transaction was scored with.
+    """
+    if observe:
+        size = components.add_edge(data["sender_id"], data["receiver_id"])
+    else:
+        size = components.component_size(data["sender_id"])
+    if data.get("sender_component_size") is None:
+        data["sender_component_size"] = size
+    if observe:
+        inbound = receivers.observe(data["receiver_id"], data["sender_id"], data["amount"])
+    else:
+        inbound = receivers.lookup(data["receiver_id"]) or {}
+    for name, value in inbound.items():
+        if data.get(name) is None:
+            data[name] = value
+    data["recent_duplicate"] = int(replay.check(
+        data["sender_id"], data["receiver_id"], data["amount"], data["device_type"],
+        data["transaction_id"], add=observe
+    ))
+    if sender_profiles is not None:
+        sender_profiles.fill_record(data)
+    return data
+
+
+def _enrich_frame(df):
+    return enrich_frame(df, components, replay, receivers, sender_profiles)
+
+
+def _observe_drift(data: dict, X, prob: float):
+    if drift is None:
+        return
+    row = dict(zip(X.columns, X.to_numpy()[0].tolist()))
+    values = {SCORE: prob}
+    for name in NUMERIC_FEATURES:
+        values[name] = row[name] if name in row else data.get(name)
+    for name in CATEGORICAL_FEATURES:
+        values[name] = data.get(name)
+    drift.observe(values)
+
+
+def _observe_drift_frame(df, X, probs):
+    if drift is None:
+        return
+    columns = {SCORE: np.asarray(probs, dtype=np.float64)}
+    for name in NUMERIC_FEATURES:
+        source = X if name in X.columns else df
+        if name in source.columns:
+            columns[name] = source[name].to_numpy()
+    for name in CATEGORICAL_FEATURES:
+        if name in df.columns:
+            columns[name] = df[name].to_numpy()
+    drift.observe_frame(columns)
+
+
+def _shadow_job(X, probs, score_ms: float):
+    """Shadow submission for one live model call, to run once its results are sent."""
+    if shadow is None:
+        return None
+    live_threshold = threshold
+
+    def job():
+        if shadow is not None:  # may have been reloaded away meanwhile
+            shadow.submit(X, probs, live_threshold, score_ms)
+    return job
+
+
+async def _run_after_response(jobs):
+    for job in jobs:
+        job()
+
+
+def _after_batch(df, X, probs, score_ms: float, path: str = "stream"):
+    """Feed drift and the decision log; returns the deferred shadow job."""
+    _observe_drift_frame(df, X, probs)
+    if decision_log is not None:
+        decision_log.append(
+            df["transaction_id"].to_numpy(), probs, threshold, score_ms, path,
+            amounts=pd.to_numeric(df["amount"], errors="coerce").to_numpy()
+        )
+    return _shadow_job(X, probs, score_ms)
+
 
-model     = pickle.load(open(MODEL_PATH, "rb"))
-features  = list(pickle.load(open(FEATURE_PATH, "rb")))
-
-if os.path.exists(THRESHOLD_PATH):
-    threshold = float(pickle.load(open(THRESHOLD_PATH, "rb")))
-else:
-    threshold = 0.18
-
-print(f"Model loaded | Features: {len(features)} | Threshold: {threshold:.4f}")
-
-
-# ── Request Schema ────────────────────────────────────────
-class TransactionRequest(BaseModel):
-    transaction_id:    str   = Field(example="TXN_001")
-    timestamp:         str   = Field(example="2024-03-15T14:30:00")
-    sender_id:         str   = Field(example="USER_042")
-    receiver_id:       str   = Field(example="USER_899")
-    amount:            float = Field(gt=0, example=48500.0)
-    transaction_type:  str   = Field(example="P2P")
-    merchant_category: str   = Field(example="Food")
-    sender_state:      str   = Field(example="Odisha")
-    receiver_state:    str   = Field(example="Maharashtra")
-    sender_bank:       str   = Field(example="SBI")
-    receiver_bank:     str   = Field(example="HDFC")
-    device_type:       str   = Field(example="Android")
-    network_type:      str   = Field(example="4G")
-    account_age_days:  int   = Field(ge=0, example=45)
-    txn_velocity_1h:   Optional[float] = 1.0
-    sender_mean_amt:   Optional[float] = None
-    sender_std_amt:    Optional[float] = None
-    sender_txn_count:  Optional[int]   = 1
-    unique_receivers:  Optional[int]   = 1
-    sender_pagerank:   Optional[float] = 0.0
-    sender_degree:     Optional[float] = 0.0
-
-
-# ── Single-row safe feature engineering ──────────────────
-def engineer_single_row(data: dict) -> pd.DataFrame:
-    df = pd.DataFrame([data])
-
-    ts = pd.to_datetime(data["timestamp"])
-    df["hour"]           = ts.hour
-    df["day_of_week"]    = ts.dayofweek
-    df["is_weekend"]     = int(ts.dayofweek >= 5)
-    df["month"]          = ts.month
-    df["is_night"]       = int(0 <= ts.hour <= 5)
-    df["is_salary_week"] = int(ts.day <= 7)
-
-    df["cross_state"] = int(data["sender_state"] != data["receiver_state"])
-
-    amt      = data["amount"]
-    mean_amt = data.get("sender_mean_amt") or amt
-    std_amt  = data.get("sender_std_amt")  or 1.0
-    df["sender_mean_amt"]  = mean_amt
-    df["sender_std_amt"]   = std_amt
-    df["sender_txn_count"] = data.get("sender_txn_count") or 1
-    df["unique_receivers"] = data.get("unique_receivers") or 1
-    df["amount_zscore"]    = (amt - mean_amt) / (std_amt + 1e-5)
-    df["txn_velocity_1h"]  = data.get("txn_velocity_1h") or 1.0
-    df["sender_pagerank"]  = data.get("sender_pagerank") or 0.0
-    df["sender_degree"]    = data.get("sender_degree")   or 0.0
-
-    cat_cols = [
-        "transaction_type", "merchant_category",
-        "sender_state", "receiver_state",
-        "sender_bank", "receiver_bank",
-        "device_type", "network_type"
-    ]
-    existing = [c for c in cat_cols if c in df.columns]
-    df = pd.get_dummies(df, columns=existing, drop_first=True)
-
-    df = df.drop(columns=[
-        "transaction_id", "timestamp", "sender_id",
-        "receiver_id", "fraud_flag"
-    ], errors="ignore")
-
-    df = df.reindex(columns=features, fill_value=0)
-    return df
+def _log_decision(result: dict, data: dict, latency_ms, degraded=False):
+    if decision_log is not None:
+        decision_log.append(
+            result["transaction_id"], result["fraud_probability"],
+            FALLBACK_THRESHOLD if degraded else threshold,
+            latency_ms if latency_ms is not None else 0.0,
+            "degraded" if degraded else "predict",
+            amounts=data.get("amount"), degraded=degraded
+        )
 
 
 # ── Endpoints ─────────────────────────────────────────────
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    # FastAPI's default handler echoes each bad input back, and JSON has no
+    # inf/nan, so a rejected amount=inf would turn the 422 into a 500.
+    errors = []
+    for error in exc.errors():
+        value = error.get("input")
+        if isinstance(value, float) and not math.isfinite(value):
+            error = {**error, "input": str(value)}
+        errors.append(error)
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(errors)})
+
 @app.get("/")
 def root():
     return {
         "service": "UPI-Guard++ Fraud Detection API",
         "version": "2.0.0",
-        "status": "running",
+        "status": "running" if model is not None else startup["phase"],
         "threshold": round(threshold, 4),
-        "features": len(features)
+        "features": len(features) if features is not None else 0
     }
 
 @app.get("/health")
 def health():
     return {
         "status": "ok",
-        "model_loaded": True,
+        "model_loaded": model is not None,
+        "phase": startup["phase"],
+        "feature_count": len(features) if features is not None else 0,
+        "threshold": round(threshold, 4),
+        "sender_profiles": len(sender_profiles) if sender_profiles is not None else 0,
+        "graph": components.stats(),
+        "drift_observed": drift.observed if drift is not None else 0,
+        "shadow": shadow is not None,
+        "result_cache": result_cache.stats(),
+        "admission": admission.stats(),
+        "batcher": batcher.stats(),
+        "decision_log": decision_log.stats() if decision_log is not None else None,
+        "replay": replay.stats(),
+        "receivers": receivers.stats()
+    }
+
+@app.get("/ready")
+def ready(response: Response):
+    """Readiness probe: 200 once the model is loaded and warmed up."""
+    if startup["phase"] != "ready":
+        response.status_code = 503
+    return {"ready": startup["phase"] == "ready", **startup}
+
+@app.get("/rollups")
+def rollups(minutes: int = 60, step: int = 1):
+    """Per-minute volume, fraud rate, score and latency percentiles."""
+    if decision_log is None:
+        raise HTTPException(status_code=404, detail="Decision log is disabled")
+    minutes = max(1, min(minutes, decision_log.retain_minutes))
+    return decision_log.rollups(minutes, max(1, step))
+
+@app.get("/decisions/recent")
+def recent_decisions(limit: int = 20):
+    if decision_log is None:
+        raise HTTPException(status_code=404, detail="Decision log is disabled")
+    return decision_log.recent(max(1, min(limit, 200)))
+
+@app.get("/cache/stats")
+def cache_stats():
+    return result_cache.stats()
+
+@app.get("/admission/stats")
+def admission_stats():
+    return admission.stats()
+
+@app.get("/drift")
+def drift_report(window_minutes: Optional[float] = None):
+    """PSI/KS of recent traffic against the training reference."""
+    if drift is None:
+        raise HTTPException(status_code=404, detail="No drift reference loaded")
+    return drift.report(window_minutes)
+
+@app.get("/shadow")
+def shadow_stats():
+    """Live vs. candidate agreement, score deltas and latency."""
+    if shadow is None:
+        raise HTTPException(status_code=404, detail="No shadow model configured")
+    return shadow.stats()
+
+@app.get("/profile/stats")
+def profile_stats():
+    return profiler.stats()
+
+@app.post("/model/reload")
+def reload_model(x_admin_token: Optional[str] = Header(default=None)):
+    # resets caches and online state, so never open to anonymous callers
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Reload is disabled; set UPI_GUARD_ADMIN_TOKEN")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        load_artifacts()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "status": "reloaded",
         "feature_count": len(features),
-        "threshold": round(threshold, 4)
+        "threshold": round(threshold, 4),
+        "cache_generation": result_cache.stats()["generation"]
     }
 
+def _score(data: dict, after: list) -> dict:
+    enriched = _enrich(dict(data))
+    df    = engineer_single_row(enriched, features)
+    start = time.perf_counter()
+    prob  = float(model.predict_proba(df)[0][1])
+    score_ms = (time.perf_counter() - start) * 1000
+    _observe_drift(data, df, prob)
+    job = _shadow_job(df, [prob], score_ms)
+    if job is not None:
+        after.append(job)
+    result = decide(data["transaction_id"], prob, threshold)
+    result["recent_duplicate"] = bool(enriched.get("recent_duplicate"))
+    return result
+
+def _score_profiled(data: dict, reason: str, after: list):
+    """
+    Re-run validation and the scoring path under the profiler. Bypasses
+    the result cache, so the trace always shows real work.
+    """
+    def path():
+        validated = request_dict(TransactionRequest(**data))
+        return _score(validated, after)
+
+    start = time.perf_counter()
+    result, trace = profiler.run(path, data["transaction_id"], reason)
+    return result, trace, (time.perf_counter() - start) * 1000
+
+def _score_timed(key: str, data: dict, after: list):
+    start = time.perf_counter()
+    result, hit = result_cache.get_or_compute(key, lambda: _score(data, after))
+    return result, hit, (time.perf_counter() - start) * 1000
+
 @app.post("/predict")
-def predict(request: TransactionRequest):
+async def predict(
+    request: TransactionRequest,
+    response: Response,
+    background: BackgroundTasks,
+    x_request_deadline_ms: Optional[float] = Header(default=None),
+    x_profile: Optional[str] = Header(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    # Runs on the event loop so overload is decided before the request
+    # ever waits in the threadpool queue.
+    _require_ready()
+    data = request_dict(request)
+    key  = payload_key(data)
+    profile_reason = profiler.should_profile(x_profile, x_admin_token)
+
+    if profile_reason is None:
+        cached = result_cache.peek(key)
+        if cached is not None:
+            response.headers["X-Cache"] = "HIT"
+            return cached
+
+    verdict = admission.admit(x_request_deadline_ms)
+    if verdict == DEGRADE:
+        result = fallback_decision(data)
+        _log_decision(result, data, 0.0, degraded=True)
+        return result
+    if verdict != ADMIT:
+        raise HTTPException(
+            status_code=503,
+            detail="Overloaded or deadline already expired",
+            headers={"Retry-After": "1"}
+        )
+
+    # shadow work is handed over only after the response has been sent
+    after = []
+    background.add_task(_run_after_response, after)
+    service_ms = None
+    try:
+        if profile_reason is not None:
+            with live_work:
+                result, trace, service_ms = await run_in_threadpool(
+                    _score_profiled, data, profile_reason, after
+                )
+            if trace is not None:
+                response.headers["X-Profile-Trace"] = os.path.basename(trace)
+            _log_decision(result, data, service_ms)
+            return result
+        with live_work:
+            result, hit, service_ms = await run_in_threadpool(_score_timed, key, data, after)
+        response.headers["X-Cache"] = "HIT" if hit else "MISS"
+        if not hit:  # a retry's decision is already logged
+            _log_decision(result, data, service_ms)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        admission.release(service_ms)
+
+def _score_batch(body: bytes, fmt: str, after: list):
+    df = decode_batch(body, fmt)
+    if len(df) > BATCH_MAX_ROWS:
+        raise BatchValidationError(f"Batch has {len(df)} rows; limit is {BATCH_MAX_ROWS}")
+
+    errors = validate_batch(df)
+    valid  = pd.isna(errors)
+
+    n = len(df)
+    columns = {
+        "transaction_id":    df["transaction_id"].astype(str).to_numpy(dtype=object),
+        "fraud_probability": np.full(n, np.nan),
+        "decision":          np.full(n, None, dtype=object),
+        "risk_level":        np.full(n, None, dtype=object),
+        "recent_duplicate":  np.full(n, None, dtype=object),
+    }
+    if valid.any():
+        enriched = _enrich_frame(df[valid])
+        X = engineer_frame(enriched, features)
+        start  = time.perf_counter()
+        scored = score_columns(model, X, threshold)
+        for name, values in scored.items():
+            columns[name][valid] = values
+        columns["recent_duplicate"][valid] = enriched["recent_duplicate"].to_numpy() != 0
+        job = _after_batch(
+            enriched, X, scored["fraud_probability"], (time.perf_counter() - start) * 1000, path="batch"
+        )
+        if job is not None:
+            after.append(job)
+    columns["threshold_used"] = np.full(n, round(threshold, 4))
+    columns["error"] = errors
+    return encode_results(columns, fmt)
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request, background: BackgroundTasks):
+    """
+    Columnar batch scoring. Body may be Arrow IPC stream, MessagePack or
+    JSON (column map or list of records); the response uses the same
+    format. Invalid rows are returned with `error` set instead of failing
+    the whole batch.
+    """
+    _require_ready()
+    try:
+        fmt = body_format(request.headers.get("content-type"))
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    body  = await request.body()
+    after = []
+    background.add_task(_run_after_response, after)
+    try:
+        with live_work:
+            content, media_type = await run_in_threadpool(_score_batch, body, fmt, after)
+    except UnsupportedFormat as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except (BatchValidationError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return Response(content=content, media_type=media_type)
+
+def _compute_explanation(data: dict) -> dict:
+    df   = engineer_single_row(_enrich(dict(data), observe=False), features)
+    prob = float(model.predict_proba(df)[0][1])
+    result = {
+        "transaction_id":    data["transaction_id"],
+        "fraud_probability": round(prob, 6),
+        "decision":          "Fraud" if prob > threshold else "Safe",
+        **explain_frame(model, df)[0],
+    }
+    # Cached even when the caller already gave up on the budget,
+    # so a retry for the same transaction returns immediately.
+    explain_cache.put(data["transaction_id"], result)
+    return result
+
+@app.post("/explain")
+def explain(request: TransactionRequest):
+    if not EXPLAIN_ENABLED:
+        raise HTTPException(
+            status_code=404,
+            detail="Explanations are disabled; set UPI_GUARD_ENABLE_EXPLAIN=1"
+        )
+    _require_ready()
+
+    data   = request_dict(request)
+    cached = explain_cache.get(data["transaction_id"])
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    # A full queue answers 503 at once instead of timing out behind it.
+    if not explain_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Too many explanations pending",
+            headers={"Retry-After": "1"}
+        )
+    future = explain_executor.submit(_compute_explanation, data)
+    future.add_done_callback(lambda _: explain_slots.release())
+    try:
+        result = future.result(timeout=EXPLAIN_BUDGET_MS / 1000.0)
+    except FutureTimeout:
+        # still queued: drop it; already running: it finishes and is cached
+        future.cancel()
+        raise HTTPException(
+            status_code=503,
+            detail=f"Explanation exceeded the {EXPLAIN_BUDGET_MS:.0f} ms budget; "
+                   f"retry to fetch the cached result"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {**result, "cached": False}
+
+
+# ── Streaming endpoints ───────────────────────────────────
+def _iter_records(text):
+    """A frame/body is one JSON object, a JSON array, or NDJSON lines."""
+    text = text.strip()
+    if not text:
+        return
+    if text[0] == "[":
+        yield from json.loads(text)
+        return
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _validate(record):
+    """Return (data, None) for a valid record or (None, error_result)."""
     try:
-        data = request.dict()
-        df   = engineer_single_row(data)
-        prob     = float(model.predict_proba(df)[0][1])
-        decision = "Fraud" if prob > threshold else "Safe"
-        risk     = "High" if prob > 0.70 else ("Medium" if prob > threshold else "Low")
-        return {
-            "transaction_id":    data["transaction_id"],
-            "fraud_probability": round(prob, 6),
-            "decision":          decision,
-            "risk_level":        risk,
-            "threshold_used":    round(threshold, 4)
-        }
+        return request_dict(TransactionRequest(**record)), None
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        txn_id = record.get("transaction_id") if isinstance(record, dict) else None
+        return None, {"transaction_id": txn_id, "error": str(e).splitlines()[0]}
+
+
+class _StreamSession:
+    """
+    Per-connection pipelining state. A record holds one of
+    STREAM_MAX_INFLIGHT window slots from the moment it is read until its
+    result has been written back. A client that stops reading results
+    therefore stalls the reader (backpressure), and the results queue never
+    holds more than the window.
+    """
+
+    def __init__(self):
+        self.window  = asyncio.Semaphore(STREAM_MAX_INFLIGHT)
+        self.results = asyncio.Queue(maxsize=STREAM_MAX_INFLIGHT + 1)  # + end marker
+        self.pending = set()
+
+    async def submit(self, record):
+        await self.window.acquire()
+        data, error = _validate(record)
+        if error is not None:
+            await self.results.put(error)
+            return
+        task = asyncio.create_task(self._score(data))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    async def reject(self, error):
+        """Queue an error result for input that never became a record."""
+        await self.window.acquire()
+        await self.results.put(error)
+
+    async def _score(self, data):
+        try:
+            result = await batcher.submit(data)
+        except Exception as e:
+            result = {"transaction_id": data["transaction_id"], "error": str(e)}
+        await self.results.put(result)
+
+    async def drain(self):
+        """Wait for one result, then take everything else already finished."""
+        items = [await self.results.get()]
+        while not self.results.empty():
+            items.append(self.results.get_nowait())
+        return items
+
+    def written(self, items):
+        """Free the window slots of results that reached the client."""
+        for item in items:
+            if item is not _END:
+                self.window.release()
+
+    async def finish(self):
+        """After the last record: wait for its results, then mark the end."""
+        await asyncio.gather(*list(self.pending), return_exceptions=True)
+        await self.results.put(_END)
+
+    def close(self):
+        for task in self.pending:
+            task.cancel()
+
+
+_END = object()  # end-of-input marker in a session's results queue
+
+
+def _ndjson(items):
+    return "".join(json.dumps(item) + "\n" for item in items if item is not None and item is not _END)
+
+
+@app.websocket("/ws/predict")
+async def ws_predict(websocket: WebSocket):
+    """
+    Long-lived pipelined scoring. Each client frame is a JSON object, a
+    JSON array or NDJSON lines. Each server frame is NDJSON: one or more
+    results tagged by transaction_id, in completion order.
+    """
+    if model is None:
+        await websocket.close(code=1013)  # try again later
+        return
+    await websocket.accept()
+    session = _StreamSession()
+
+    async def writer():
+        while True:
+            items = await session.drain()
+            await websocket.send_text(_ndjson(items))
+            session.written(items)
+
+    writer_task = asyncio.create_task(writer())
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                records = list(_iter_records(text))
+            except ValueError as e:
+                await session.reject({"transaction_id": None, "error": f"Invalid JSON: {e}"})
+                continue
+            for record in records:
+                await session.submit(record)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
+        writer_task.cancel()
+
+
+class _NDJSONPipe(Response):
+    """
+    Full-duplex NDJSON response: results are written while the request
+    body is still being read, from the same ASGI call. (StreamingResponse
+    only starts once the handler has returned, i.e. after the whole body
+    was read, and on ASGI < 2.4 it also consumes `receive` itself.)
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self):
+        self.status_code = 200
+        self.background  = None
+        self.raw_headers = [(b"content-type", self.media_type.encode())]
+
+    async def _read(self, session, receive):
+        buffer = b""
+
+        async def submit_line(line):
+            line = line.strip()
+            if not line:
+                return
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                await session.reject({"transaction_id": None, "error": f"Invalid JSON: {e}"})
+                return
+            await session.submit(record)
+
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    break
+                buffer += message.get("body", b"")
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    await submit_line(line)
+                if not message.get("more_body", False):
+                    await submit_line(buffer)
+                    break
+        finally:
+            await session.finish()
+
+    async def __call__(self, scope, receive, send):
+        session = _StreamSession()
+        await send({"type": "http.response.start", "status": 200, "headers": self.raw_headers})
+        reader = asyncio.create_task(self._read(session, receive))
+        try:
+            done = False
+            while not done:
+                items = await session.drain()
+                done = _END in items
+                body = _ndjson(items)
+                if body:
+                    await send({"type": "http.response.body", "body": body.encode(), "more_body": True})
+                session.written(items)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            reader.cancel()
+            session.close()
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """
+    Chunked NDJSON in, NDJSON out. Records are scored while the body is
+    still uploading and results stream back as they complete, so the
+    client must read the response while it writes.
+    """
+    _require_ready()
+    return _NDJSONPipe()
+
+
+startup["import_ms"] = round((time.perf_counter() - _IMPORT_START) * 1000, 1)
@@ -0,0 +1,160 @@
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+
+STACK    = "stack"
+CPROFILE = "cprofile"
+
+
+class _StackTracer:
+    """
+    Deterministic call-stack tracer for the calling thread.
+
+    Installed with `sys.setprofile`, it charges wall time to the full stack
+    on every return, so even a request of a few milliseconds yields exact
+    stacks (a sampling thread would rarely get the GIL in time). Output is
+    the collapsed-stack format (`frame;frame;frame <microseconds>`) read by
+    flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self._stack = []  # [name, start, child_time]
+
+    @staticmethod
+    def _name(frame, event, arg):
+        if event.startswith("c_"):
+            module = getattr(arg, "__module__", None) or "builtins"
+            return f"{module}.{getattr(arg, '__qualname__', repr(arg))}"
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        return f"{module}.{code.co_name}:{code.co_firstlineno}"
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if event in ("call", "c_call"):
+            self._stack.append([self._name(frame, event, arg), now, 0.0])
+        elif event in ("return", "c_return", "c_exception") and self._stack:
+            name, start, child = self._stack.pop()
+            elapsed = now - start
+            path = ";".join([entry[0] for entry in self._stack] + [name])
+            self.totals[path] += elapsed - child
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def collapsed(self):
+        lines = []
+        for path, seconds in self.totals.items():
+            micros = int(round(seconds * 1e6))
+            if micros > 0:
+                lines.append(f"{path} {micros}")
+        return "\n".join(sorted(lines)) + "\n"
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of single requests.
+
+    A request is profiled when it carries `X-Profile: 1` with the admin
+    token, or when it is picked by `sample_rate`. With no header and a zero
+    sample rate, `should_profile` is one comparison and nothing else runs.
+    Traces go to `directory`; only the newest `max_files` are kept.
+    """
+
+    def __init__(self, directory, sample_rate=0.0, max_files=200, mode=STACK, admin_token=None):
+        if mode not in (STACK, CPROFILE):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.mode = mode
+        self.admin_token = admin_token
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        self.profiled = 0
+        self.skipped = 0
+
+    def should_profile(self, header=None, token=None):
+        """Returns the trigger ("header" / "sampled") or None."""
+        if header and header not in ("0", "false"):
+            # header profiling writes files, so it needs a configured token
+            if self.admin_token and token == self.admin_token:
+                return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def run(self, fn, label, reason):
+        """
+        Call `fn()` under the profiler; returns (result, trace path). One
+        request is profiled at a time (cProfile is process-wide on newer
+        Pythons); a request arriving meanwhile runs unprofiled, path None.
+        """
+        if not self._active.acquire(blocking=False):
+            with self._lock:
+                self.skipped += 1
+            return fn(), None
+        try:
+            return self._run(fn, label, reason)
+        finally:
+            self._active.release()
+
+    def _run(self, fn, label, reason):
+        if self.mode == CPROFILE:
+            profile = cProfile.Profile()
+            result = profile.runcall(fn)
+            path = self._path(label, reason, "prof")
+            profile.dump_stats(path)
+        else:
+            tracer = _StackTracer()
+            previous = sys.getprofile()
+            sys.setprofile(tracer)
+            try:
+                result = fn()
+            finally:
+                sys.setprofile(previous)
+            path = self._path(label, reason, "collapsed")
+            with open(path, "w") as f:
+                f.write(tracer.collapsed())
+        self._rotate()
+        return result, path
+
+    def _path(self, label, reason, ext):
+        os.makedirs(self.directory, exist_ok=True)
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", str(label))[:64]
+        with self._lock:
+            self.profiled += 1
+            seq = self.profiled
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        return os.path.join(self.directory, f"{stamp}-{seq:06d}-{reason}-{safe}.{ext}")
+
+    def _rotate(self):
+        with self._lock:
+            try:
+                entries = [e for e in os.scandir(self.directory)
+                           if e.is_file() and e.name.endswith((".collapsed", ".prof"))]
+            except FileNotFoundError:
+                return
+            if len(entries) <= self.max_files:
+                return
+            entries.sort(key=lambda e: e.name)  # names start with a timestamp
+            for entry in entries[:len(entries) - self.max_files]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "sample_rate": self.sample_rate,
+            "directory": self.directory,
+            "max_files": self.max_files,
+            "profiled": self.profiled,
+            "skipped": self.skipped,
+        }
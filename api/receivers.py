@@ -0,0 +1,177 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from src.receiver_features import AMOUNT_WINDOW, RECEIVER_FEATURES, WINDOWS
+
+# (seconds, count key, senders key) per window, in output order
+_WINDOWS = [
+    (seconds, f"receiver_txn_{name}", f"receiver_senders_{name}")
+    for name, seconds in WINDOWS.items()
+]
+_AMOUNT = list(WINDOWS).index(AMOUNT_WINDOW)
+_LONGEST = max(range(len(_WINDOWS)), key=lambda w: _WINDOWS[w][0])
+_MEAN, _STD = f"receiver_amt_mean_{AMOUNT_WINDOW}", f"receiver_amt_std_{AMOUNT_WINDOW}"
+
+
+class _Inbound:
+    """
+    One receiver's recent inbound payments: parallel arrays in arrival
+    order, a start offset per window, per-window sender counts and the
+    amount window's running sums.
+    """
+
+    __slots__ = ("times", "amounts", "senders", "starts", "counts", "total", "total_sq")
+
+    def __init__(self):
+        self.times = array("d")
+        self.amounts = array("d")
+        self.senders = []
+        self.starts = [0] * len(_WINDOWS)
+        self.counts = [{} for _ in _WINDOWS]
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def __len__(self):
+        return len(self.times) - self.starts[_LONGEST]
+
+    def add(self, now, sender_id, amount):
+        self.times.append(now)
+        self.amounts.append(amount)
+        self.senders.append(sender_id)
+        for counts in self.counts:
+            counts[sender_id] = counts.get(sender_id, 0) + 1
+        self.total += amount
+        self.total_sq += amount * amount
+
+    def expire(self, now, max_events):
+        times, senders, end = self.times, self.senders, len(self.times)
+        for w, (seconds, _, _) in enumerate(_WINDOWS):
+            cutoff, counts = now - seconds, self.counts[w]
+            i = self.starts[w]
+            while i < end and (times[i] <= cutoff or end - i > max_events):
+                sender = senders[i]
+                left = counts[sender] - 1
+                if left:
+                    counts[sender] = left
+                else:
+                    del counts[sender]
+                if w == _AMOUNT:
+                    amount = self.amounts[i]
+                    self.total -= amount
+                    self.total_sq -= amount * amount
+                i += 1
+            self.starts[w] = i
+        if self.starts[_AMOUNT] == end:  # drop accumulated float error
+            self.total = self.total_sq = 0.0
+
+        # compact once most of the arrays are expired
+        done = min(self.starts)
+        if done >= 64 and done * 2 >= end:
+            del self.times[:done], self.amounts[:done], self.senders[:done]
+            self.starts = [i - done for i in self.starts]
+
+
+class ReceiverStore:
+    """
+    Online receiver aggregates (src/receiver_features.py) over live traffic.
+
+    Each receiver keeps its inbound payments for the longest window in
+    compact arrays, with a start offset, per-sender counts and amount sums
+    per window, so an update or a lookup is amortized O(1) however busy
+    the account is.
+    Memory is bounded twice over. Each window keeps at most
+    `max_events_per_receiver` events (counts saturate there). When the
+    total number of events or receivers goes past `max_events` or
+    `max_receivers`, the least recently paid receivers are evicted.
+    Windows run on the server clock, not the request timestamp, unless the
+    caller passes event times (src/stream_score.py does).
+    """
+
+    def __init__(self, max_receivers=100_000, max_events=1_000_000, max_events_per_receiver=10_000):
+        self.max_receivers = max_receivers
+        self.max_events = max_events
+        self.max_events_per_receiver = max_events_per_receiver
+        self._receivers = OrderedDict()
+        self._events = 0
+        self._lock = threading.Lock()
+        self.observed = 0
+        self.evicted = 0
+
+    def _features(self, inbound, now):
+        before = len(inbound)
+        inbound.expire(now, self.max_events_per_receiver)
+        self._events -= before - len(inbound)
+        out = {}
+        end = len(inbound.times)
+        for w, (_, count_key, senders_key) in enumerate(_WINDOWS):
+            out[count_key] = end - inbound.starts[w]
+            out[senders_key] = len(inbound.counts[w])
+        count = end - inbound.starts[_AMOUNT]
+        mean = inbound.total / count if count else 0.0
+        var = (inbound.total_sq - inbound.total * mean) / (count - 1) if count > 1 else 0.0
+        out[_MEAN] = mean
+        out[_STD] = max(var, 0.0) ** 0.5
+        return out
+
+    def _evict(self):
+        while self._receivers and (
+            len(self._receivers) > self.max_receivers or self._events > self.max_events
+        ):
+            _, inbound = self._receivers.popitem(last=False)
+            self._events -= len(inbound)
+            self.evicted += 1
+
+    def observe(self, receiver_id, sender_id, amount, now=None) -> dict:
+        """Record one inbound payment; returns RECEIVER_FEATURES including it."""
+        now = time.time() if now is None else now
+        with self._lock:
+            inbound = self._receivers.get(receiver_id)
+            if inbound is None:
+                inbound = self._receivers[receiver_id] = _Inbound()
+            else:
+                self._receivers.move_to_end(receiver_id)
+            inbound.add(now, sender_id, float(amount))
+            self._events += 1
+            self.observed += 1
+            out = self._features(inbound, now)
+            self._evict()
+        return out
+
+    def lookup(self, receiver_id, now=None):
+        """Current RECEIVER_FEATURES without recording anything; None if unseen."""
+        now = time.time() if now is None else now
+        with self._lock:
+            inbound = self._receivers.get(receiver_id)
+            if inbound is None:
+                return None
+            return self._features(inbound, now)
+
+    def observe_frame(self, df, now=None) -> dict:
+        """
+        `observe` for every row, in order; RECEIVER_FEATURES as lists.
+        `now` is one time for all rows or one non-decreasing time per row.
+        """
+        now = time.time() if now is None else now
+        times = np.broadcast_to(np.asarray(now, dtype=np.float64), (len(df),))
+        out = {name: [] for name in RECEIVER_FEATURES}
+        for receiver_id, sender_id, amount, at in zip(
+            df["receiver_id"].to_numpy(), df["sender_id"].to_numpy(), df["amount"].to_numpy(), times
+        ):
+            for name, value in self.observe(receiver_id, sender_id, amount, float(at)).items():
+                out[name].append(value)
+        return out
+
+    def stats(self):
+        with self._lock:
+            return {
+                "receivers": len(self._receivers),
+                "events": self._events,
+                "max_receivers": self.max_receivers,
+                "max_events": self.max_events,
+                "observed": self.observed,
+                "evicted": self.evicted,
+            }
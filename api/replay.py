@@ -0,0 +1,191 @@
+import hashlib
+import math
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.replay_features import WINDOW_SECONDS, fingerprint, fingerprints, seen_key, verdict_key
+
+_MASK64 = (1 << 64) - 1
+
+
+class ReplayDetector:
+    """
+    Time-windowed duplicate detection with rotating Bloom filters.
+
+    The window is split into `slices`; one filter is kept per slice plus
+    the one being filled, as slices + 1 fixed-size byte arrays.
+    When a new slice starts, the oldest filter is zeroed and reused, so
+    memory never grows with traffic. A fingerprint counts as recent if
+    every one of its `k` bits is set in any live filter: it looks back at
+    least `window_seconds` and at most one slice more, with a false
+    positive rate of about `error_rate` per filter at `capacity` entries.
+    Positions come from one 128-bit blake2b digest (double hashing), so a
+    check costs one hash and k byte probes per filter per key.
+
+    With a transaction_id, two more keys are kept: one says the id was
+    seen with this fingerprint, the other that it was flagged then. A
+    repeat of the same id (a retry, or a re-read by /explain) gets its
+    first verdict back instead of matching itself. That is about two
+    entries per transaction against `capacity`.
+    """
+
+    def __init__(self, window_seconds=WINDOW_SECONDS, slices=4, capacity=1_000_000,
+                 error_rate=0.001):
+        self.window_seconds = window_seconds
+        self.slices = slices
+        self.slice_seconds = window_seconds / slices
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        bits = -capacity * math.log(error_rate) / math.log(2) ** 2
+        self.n_bits = int(math.ceil(bits / 64)) * 64
+        self.k = max(1, int(round(self.n_bits / capacity * math.log(2))))
+
+        # bytearrays for cheap single-byte access on the request path,
+        # numpy views over the same memory for the batch path
+        self._rows = [bytearray(self.n_bits // 8) for _ in range(slices + 1)]
+        self._bits = [np.frombuffer(row, dtype=np.uint8) for row in self._rows]
+        self._slice_ids = np.full(slices + 1, -1, dtype=np.int64)
+        self._steps = np.arange(self.k, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.duplicates = 0
+
+    def _positions(self, keys):
+        """(byte index, bit mask) arrays of shape (n, k)."""
+        digests = b"".join(hashlib.blake2b(key.encode(), digest_size=16).digest() for key in keys)
+        h = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+        h1, h2 = h[:, :1], h[:, 1:] | np.uint64(1)
+        pos = (h1 + self._steps * h2) % np.uint64(self.n_bits)  # h1 + i*h2 wraps mod 2^64
+        return (pos >> np.uint64(3)).astype(np.intp), (np.uint8(1) << (pos & np.uint64(7)).astype(np.uint8))
+
+    def _current_slot(self, now):
+        slice_id = int(now // self.slice_seconds)
+        slot = slice_id % len(self._slice_ids)
+        if self._slice_ids[slot] != slice_id:
+            self._bits[slot][:] = 0
+            self._slice_ids[slot] = slice_id
+        live = self._slice_ids >= slice_id - self.slices
+        return slot, np.flatnonzero(live)
+
+    def _lookup(self, byte_idx, masks, live):
+        """True per row when all k bits are set in at least one live filter."""
+        hits = np.zeros(len(byte_idx), dtype=bool)
+        for slot in live:
+            hits |= ((self._bits[slot][byte_idx] & masks) != 0).all(axis=1)
+        return hits
+
+    def _record(self, slot, byte_idx, masks, rows=None):
+        if rows is not None:
+            byte_idx, masks = byte_idx[rows], masks[rows]
+        np.bitwise_or.at(self._bits[slot], byte_idx.ravel(), masks.ravel())
+
+    def check_frame(self, df, now=None, add=True) -> np.ndarray:
+        """
+        Duplicate flags for a frame of transactions (earlier rows of the
+        same frame count too); with `add`, the rows are recorded after.
+
+        `now` is the server clock by default. It may also be one
+        non-decreasing time per row (event time, for replaying a log); the
+        frame is then checked in runs that fall in the same slice.
+        """
+        if len(df) and np.ndim(now):
+            times = np.asarray(now, dtype=np.float64)
+            cuts = np.flatnonzero(np.diff(times // self.slice_seconds)) + 1
+            starts, ends = np.r_[0, cuts], np.r_[cuts, len(df)]
+            return np.concatenate([
+                self.check_frame(df.iloc[a:b], times[b - 1], add) for a, b in zip(starts, ends)
+            ])
+        keys = fingerprints(df)
+        if not keys:
+            return np.zeros(0, dtype=bool)
+        ids = df["transaction_id"].astype(str).tolist() if "transaction_id" in df.columns else None
+        byte_idx, masks = self._positions(keys)
+        if ids is not None:
+            seen = [seen_key(key, txn) for key, txn in zip(keys, ids)]
+            seen_pos = self._positions(seen)
+            verdict_pos = self._positions([verdict_key(key) for key in seen])
+        now = time.time() if now is None else now
+        with self._lock:
+            slot, live = self._current_slot(now)
+            # an earlier row of the frame with the same fingerprint has a
+            # different id; a same-id repeat is folded in below
+            hits = self._lookup(byte_idx, masks, live) | pd.Series(keys).duplicated().to_numpy()
+            if ids is not None:
+                repeat = self._lookup(*seen_pos, live)
+                hits = np.where(repeat, self._lookup(*verdict_pos, live), hits)
+                hits = pd.Series(hits).groupby(seen, sort=False).transform("first").to_numpy(dtype=bool)
+            if add:
+                self._record(slot, byte_idx, masks)
+                if ids is not None:
+                    self._record(slot, *seen_pos)
+                    self._record(slot, *verdict_pos, rows=hits)
+            if add:  # re-reads are not counted
+                self.checked += len(keys)
+                self.duplicates += int(hits.sum())
+        return hits
+
+    def _probes(self, key):
+        """`_positions` for one key, in plain ints."""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        probes = []
+        for i in range(self.k):
+            pos = ((h1 + i * h2) & _MASK64) % self.n_bits
+            probes.append((pos >> 3, 1 << (pos & 7)))
+        return probes
+
+    def _contains(self, probes, live):
+        for s in live.tolist():
+            row = self._rows[s]
+            if all(row[b] & m for b, m in probes):
+                return True
+        return False
+
+    def _add(self, slot, probes):
+        row = self._rows[slot]
+        for b, m in probes:
+            row[b] |= m
+
+    def check(self, sender_id, receiver_id, amount, device_type, transaction_id=None,
+              now=None, add=True) -> bool:
+        """Single-transaction `check_frame`: k bit probes per live filter and key."""
+        key = fingerprint(sender_id, receiver_id, amount, device_type)
+        probes = self._probes(key)
+        if transaction_id is not None:
+            seen = seen_key(key, transaction_id)
+            seen_probes, verdict_probes = self._probes(seen), self._probes(verdict_key(seen))
+        now = time.time() if now is None else now
+        with self._lock:
+            slot, live = self._current_slot(now)
+            if transaction_id is not None and self._contains(seen_probes, live):
+                # same id again: its first verdict, and nothing new to record
+                hit = self._contains(verdict_probes, live)
+            else:
+                hit = self._contains(probes, live)
+                if add:
+                    self._add(slot, probes)
+                    if transaction_id is not None:
+                        self._add(slot, seen_probes)
+                        if hit:
+                            self._add(slot, verdict_probes)
+            if add:
+                self.checked += 1
+                self.duplicates += hit
+        return hit
+
+    def stats(self):
+        with self._lock:
+            return {
+                "window_seconds": self.window_seconds,
+                "slices": self.slices,
+                "capacity_per_slice": self.capacity,
+                "hash_functions": self.k,
+                "memory_mb": round(sum(map(len, self._rows)) / 2**20, 2),
+                "checked": self.checked,
+                "duplicates": self.duplicates,
+            }
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class ShadowScorer:
+    """
+    Scores live traffic with a candidate model off the request path.
+
+    `submit` hands the live request's already-encoded feature frame to a
+    small executor and returns at once. Work is dropped instead of queued
+    when `max_pending` jobs are outstanding or `busy()` says the live path
+    is saturated, so shadow scoring never competes with live requests for
+    a backlog. If the candidate was trained on a different feature list,
+    the frame is re-indexed and missing columns are zero-filled.
+    """
+
+    def __init__(self, model, features, threshold, max_pending=64, workers=1,
+                 busy=None, latency_window=4096):
+        self.model = model
+        self.features = list(features)
+        self.threshold = threshold
+        self.max_pending = max_pending
+        self.busy = busy
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.submitted = 0
+        self.dropped = 0
+        self.failed = 0
+        self.rows = 0
+        self.agree = 0
+        self.live_flagged = 0
+        self.shadow_flagged = 0
+        self.delta_sum = 0.0
+        self.abs_delta_sum = 0.0
+        self.max_abs_delta = 0.0
+        self.missing_features = 0
+        self._live_ms = deque(maxlen=latency_window)
+        self._shadow_ms = deque(maxlen=latency_window)
+
+    def submit(self, X, live_probs, live_threshold, live_ms):
+        """Queue one scored call for shadow scoring; False if it was dropped."""
+        with self._lock:
+            if self.pending >= self.max_pending or (self.busy is not None and self.busy()):
+                self.dropped += 1
+                return False
+            self.pending += 1
+            self.submitted += 1
+        self._executor.submit(self._run, X, np.asarray(live_probs, dtype=np.float64),
+                              live_threshold, live_ms)
+        return True
+
+    def _run(self, X, live_probs, live_threshold, live_ms):
+        try:
+            if list(X.columns) != self.features:
+                missing = len(set(self.features) - set(X.columns))
+                X = X.reindex(columns=self.features, fill_value=0)
+            else:
+                missing = 0
+            start = time.perf_counter()
+            probs = self.model.predict_proba(X)[:, 1].astype(np.float64)
+            shadow_ms = (time.perf_counter() - start) * 1000
+
+            delta = probs - live_probs
+            live_fraud = live_probs > live_threshold
+            shadow_fraud = probs > self.threshold
+            with self._lock:
+                self.rows += len(probs)
+                self.agree += int(np.sum(live_fraud == shadow_fraud))
+                self.live_flagged += int(live_fraud.sum())
+                self.shadow_flagged += int(shadow_fraud.sum())
+                self.delta_sum += float(delta.sum())
+                self.abs_delta_sum += float(np.abs(delta).sum())
+                if len(delta):
+                    self.max_abs_delta = max(self.max_abs_delta, float(np.abs(delta).max()))
+                self.missing_features = missing
+                self._live_ms.append(live_ms)
+                self._shadow_ms.append(shadow_ms)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    @staticmethod
+    def _latency(samples):
+        if not samples:
+            return {"p50_ms": None, "p99_ms": None}
+        values = np.fromiter(samples, dtype=np.float64)
+        return {
+            "p50_ms": round(float(np.percentile(values, 50)), 3),
+            "p99_ms": round(float(np.percentile(values, 99)), 3),
+        }
+
+    def stats(self):
+        with self._lock:
+            rows = self.rows
+            return {
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pending": self.pending,
+                "rows": rows,
+                "agreement_rate": round(self.agree / rows, 4) if rows else None,
+                "live_flag_rate": round(self.live_flagged / rows, 4) if rows else None,
+                "shadow_flag_rate": round(self.shadow_flagged / rows, 4) if rows else None,
+                "mean_delta": round(self.delta_sum / rows, 6) if rows else None,
+                "mean_abs_delta": round(self.abs_delta_sum / rows, 6) if rows else None,
+                "max_abs_delta": round(self.max_abs_delta, 6),
+                "missing_features": self.missing_features,
+                "shadow_threshold": round(self.threshold, 4),
+                "live_latency": self._latency(self._live_ms),
+                "shadow_latency": self._latency(self._shadow_ms),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
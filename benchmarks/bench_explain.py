@@ -0,0 +1,87 @@
+"""
+Latency benchmark for TreeSHAP explanations vs. plain scoring.
+
+Usage (from the repo root):
+    python benchmarks/bench_explain.py --rows 2000 --repeat 500
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from src.explain import explain_frame, tree_contributions
+
+
+def percentiles(samples_ms):
+    arr = np.asarray(samples_ms)
+    return {
+        "p50": np.percentile(arr, 50),
+        "p95": np.percentile(arr, 95),
+        "p99": np.percentile(arr, 99),
+    }
+
+
+def synthetic_rows(features, n, seed=42):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(0.0, index=range(n), columns=features)
+    for col in features:
+        if col in ("amount", "sender_mean_amt", "sender_std_amt"):
+            df[col] = rng.lognormal(8, 1.2, n)
+        elif col in ("hour",):
+            df[col] = rng.integers(0, 24, n)
+        elif col in ("account_age_days",):
+            df[col] = rng.integers(0, 3000, n)
+        else:
+            df[col] = rng.integers(0, 2, n)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "model", "fraud_model.pkl"))
+    parser.add_argument("--features", default=os.path.join(BASE_DIR, "model", "feature_columns.pkl"))
+    parser.add_argument("--rows", type=int, default=2000, help="rows for the batch benchmark")
+    parser.add_argument("--repeat", type=int, default=500, help="single-row iterations")
+    args = parser.parse_args()
+
+    model = pickle.load(open(args.model, "rb"))
+    features = list(pickle.load(open(args.features, "rb")))
+    X = synthetic_rows(features, args.rows)
+
+    # warm-up (first DMatrix / predictor init)
+    model.predict_proba(X.iloc[:1])
+    explain_frame(model, X.iloc[:1])
+
+    predict_ms, explain_ms = [], []
+    for i in range(args.repeat):
+        row = X.iloc[[i % len(X)]]
+
+        t0 = time.perf_counter()
+        model.predict_proba(row)
+        predict_ms.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        explain_frame(model, row)
+        explain_ms.append((time.perf_counter() - t0) * 1000)
+
+    print(f"Single-row latency over {args.repeat} calls (ms):")
+    for name, samples in [("predict_proba", predict_ms), ("treeshap explain", explain_ms)]:
+        p = percentiles(samples)
+        print(f"  {name:<18} p50={p['p50']:.3f}  p95={p['p95']:.3f}  p99={p['p99']:.3f}")
+
+    t0 = time.perf_counter()
+    tree_contributions(model, X)
+    elapsed = time.perf_counter() - t0
+    print(f"\nBatch pred_contribs: {len(X):,} rows in {elapsed:.3f}s "
+          f"({len(X) / elapsed:,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Throughput comparison of batch ingestion formats: per-row JSON /predict
+vs. /predict/batch with JSON, MessagePack and Arrow IPC bodies. Needs a
+running API:
+
+    python -m uvicorn api.main:app --port 8000
+    python benchmarks/bench_ingest.py --url http://127.0.0.1:8000 --n 20000 --batch 1000
+"""
+import argparse
+import io
+import json
+import time
+
+import requests
+
+from bench_stream import make_payloads, report
+
+
+def to_columns(rows):
+    return {k: [r[k] for r in rows] for k in rows[0]}
+
+
+def encode_json(rows):
+    return json.dumps(rows).encode(), "application/json"
+
+
+def encode_msgpack(rows):
+    import msgpack
+    return msgpack.packb(to_columns(rows), use_bin_type=True), "application/x-msgpack"
+
+
+def encode_arrow(rows):
+    import pyarrow as pa
+    table = pa.table(to_columns(rows))
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue(), "application/vnd.apache.arrow.stream"
+
+
+def bench_batches(session, url, rows, batch, name, encoder):
+    # Client-side encoding is done up front so only the server path is timed.
+    bodies = [encoder(rows[i:i + batch]) for i in range(0, len(rows), batch)]
+    latencies = []
+    start = time.perf_counter()
+    for body, content_type in bodies:
+        t0 = time.perf_counter()
+        r = session.post(f"{url}/predict/batch", data=body,
+                         headers={"content-type": content_type}, timeout=120)
+        r.raise_for_status()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    report(f"batch {name}", len(rows), time.perf_counter() - start, latencies)
+
+
+def bench_single(session, url, rows):
+    latencies = []
+    start = time.perf_counter()
+    for row in rows:
+        t0 = time.perf_counter()
+        session.post(f"{url}/predict", json=row, timeout=30).raise_for_status()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    report("/predict (per row)", len(rows), time.perf_counter() - start, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--single", type=int, default=500, help="rows sent through per-row /predict")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    print(f"{args.n:,} rows in batches of {args.batch:,} against {args.url}")
+
+    bench_single(session, args.url, make_payloads(args.single))
+    for name, encoder in [("json", encode_json), ("msgpack", encode_msgpack), ("arrow", encode_arrow)]:
+        try:
+            bench_batches(session, args.url, make_payloads(args.n), args.batch, name, encoder)
+        except ImportError as e:
+            print(f"  batch {name:<16} skipped ({e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+"""
+Per-stage wall time and memory of the offline pipeline at several sizes.
+
+Every named stage of `build_features` (preprocess.FEATURE_STAGES) and the
+steps of `train.py` (split, fit, predict, threshold tuning, artifact
+export) is timed separately, after reading a generated CSV. Each size
+runs in its own process so peak RSS is not inherited from a larger run.
+A background thread samples RSS every few milliseconds; `peak_rss_mb` is
+the highest value seen during the stage, `rss_delta_mb` its growth over
+the RSS at stage start.
+
+Runs are appended to a JSON history file; `compare` diffs two of them
+and exits non-zero on a regression beyond the tolerance.
+
+Usage (from the repo root):
+    python benchmarks/bench_pipeline.py run --sizes 20000 100000 500000 --label baseline
+    python benchmarks/bench_pipeline.py run --sizes 20000 100000 500000 --label vectorized-velocity
+    python benchmarks/bench_pipeline.py compare                  # latest vs. the one before
+    python benchmarks/bench_pipeline.py compare --baseline baseline --tolerance 0.10
+    python benchmarks/bench_pipeline.py list
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(BASE_DIR, "src")
+sys.path.append(SRC_DIR)  # src modules import each other by bare name
+
+from generate_data import generate
+from preprocess import FEATURE_STAGES
+
+DEFAULT_HISTORY = os.path.join(BASE_DIR, "benchmarks", "results", "pipeline_history.json")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "upi_guard_bench")
+
+
+# ----------------------------------------------------------
+#  MEMORY
+# ----------------------------------------------------------
+
+def _peak_rss():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB on Linux
+
+
+def current_rss():
+    """Resident set size in bytes (/proc on Linux; lifetime peak elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return _peak_rss()
+
+
+class RssSampler:
+    """Tracks the highest RSS seen since the last `reset`."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss()
+            if rss > self.peak:
+                self.peak = rss
+
+    def reset(self):
+        self.peak = current_rss()
+        return self.peak
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+# ----------------------------------------------------------
+#  STAGES
+# ----------------------------------------------------------
+
+def run_pipeline(csv_path, trees, out_dir):
+    """Yields (stage, rows, fn) in pipeline order; each fn runs one stage."""
+    import xgboost as xgb
+    from sklearn.model_selection import train_test_split
+    from drift import export_drift_reference
+    from graph_features import export_components
+    from sender_profiles import export_sender_profiles
+    # train.py's own settings and threshold search; only n_estimators differs (--trees)
+    from train import DROP_COLS, MODEL_PARAMS, find_best_threshold
+
+    state = {}
+
+    def read():
+        state["raw"] = pd.read_csv(csv_path)
+        state["df"] = state["raw"]
+    yield "read_csv", None, read
+
+    for name, stage in FEATURE_STAGES:
+        def step(stage=stage):
+            state["df"] = stage(state["df"])
+        yield f"features.{name}", None, step
+
+    def split():
+        df = state["df"]
+        X = df.drop(columns=[c for c in DROP_COLS if c in df.columns])
+        y = df["fraud_flag"]
+        X_temp, state["X_test"], y_temp, state["y_test"] = train_test_split(
+            X, y, test_size=0.2, stratify=y, random_state=42)
+        state["X_train"], state["X_val"], state["y_train"], state["y_val"] = train_test_split(
+            X_temp, y_temp, test_size=0.2, stratify=y_temp, random_state=42)
+    yield "train.split", None, split
+
+    def fit():
+        y_train = state["y_train"]
+        pos = max(int(y_train.sum()), 1)
+        state["model"] = xgb.XGBClassifier(
+            n_estimators=trees, scale_pos_weight=(len(y_train) - pos) / pos, **MODEL_PARAMS
+        ).fit(state["X_train"], y_train)
+    yield "train.fit", lambda: len(state["X_train"]), fit
+
+    def predict():
+        state["val_proba"] = state["model"].predict_proba(state["X_val"])[:, 1]
+        state["test_proba"] = state["model"].predict_proba(state["X_test"])[:, 1]
+    yield "train.predict", lambda: len(state["X_val"]) + len(state["X_test"]), predict
+
+    def threshold():
+        find_best_threshold(state["y_val"], state["val_proba"])
+    yield "train.threshold", lambda: len(state["X_val"]), threshold
+
+    def export():
+        df = state["df"]
+        export_sender_profiles(df, os.path.join(out_dir, "sender_profiles.bin"))
+        export_components(df, os.path.join(out_dir, "graph_components.bin"))
+        export_drift_reference(state["raw"], df, state["test_proba"],
+                               os.path.join(out_dir, "drift_reference.json"))
+    yield "train.export", None, export
+
+
+def _dataset(rows, data_dir, seed):
+    """Generated CSV for `rows`, cached across runs (same seed = same file)."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"upi_{rows}_seed{seed}.csv")
+    if not os.path.exists(path):
+        generate(path, rows, seed=seed)  # writes to a .tmp file, then renames
+    return path
+
+
+def measure_size(rows, trees, repeat, data_dir, seed):
+    """All stages for one size (runs inside the worker process)."""
+    csv_path = _dataset(rows, data_dir, seed)
+    sampler = RssSampler()
+    stages = {}
+    start_rss = current_rss()
+    with tempfile.TemporaryDirectory() as out_dir:
+        for _ in range(repeat):
+            for name, stage_rows, fn in run_pipeline(csv_path, trees, out_dir):
+                before = sampler.reset()
+                t0 = time.perf_counter()
+                fn()
+                seconds = time.perf_counter() - t0
+                peak = max(sampler.peak, current_rss())
+                n = stage_rows() if stage_rows else rows
+                entry = {
+                    "seconds": round(seconds, 4),
+                    "rows": n,
+                    "rows_per_s": round(n / seconds, 1) if seconds > 0 else None,
+                    "peak_rss_mb": round(peak / 2**20, 1),
+                    "rss_delta_mb": round((peak - before) / 2**20, 1),
+                }
+                # best of `repeat` for time; memory from the same run
+                if name not in stages or entry["seconds"] < stages[name]["seconds"]:
+                    stages[name] = entry
+    sampler.stop()
+
+    feature_keys = [k for k in stages if k.startswith("features.")]
+    total = {
+        "features.total": sum(stages[k]["seconds"] for k in feature_keys),
+        "total": sum(s["seconds"] for s in stages.values()),
+    }
+    return {
+        "rows": rows,
+        "start_rss_mb": round(start_rss / 2**20, 1),
+        "peak_rss_mb": round(_peak_rss() / 2**20, 1),
+        "totals": {k: round(v, 4) for k, v in total.items()},
+        "stages": stages,
+    }
+
+
+# ----------------------------------------------------------
+#  HISTORY
+# ----------------------------------------------------------
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _pick(history, ref):
+    """A run by index ("-1" = latest) or by label (latest with that label)."""
+    try:
+        return history[int(ref)]
+    except ValueError:
+        for run in reversed(history):
+            if run.get("label") == ref:
+                return run
+    except IndexError:
+        pass
+    raise SystemExit(f"No run matching {ref!r} in history ({len(history)} runs)")
+
+
+# ----------------------------------------------------------
+#  COMMANDS
+# ----------------------------------------------------------
+
+def cmd_worker(args):
+    result = measure_size(args.rows, args.trees, args.repeat, args.data_dir, args.seed)
+    with open(args.result_file, "w") as f:
+        json.dump(result, f)
+
+
+def cmd_run(args):
+    run = {
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": {"pandas": pd.__version__, "numpy": np.__version__},
+        "params": {"trees": args.trees, "repeat": args.repeat, "seed": args.seed},
+        "sizes": [],
+    }
+    for rows in args.sizes:
+        print(f"\n── {rows:,} rows " + "─" * 40, flush=True)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            result_file = f.name
+        try:
+            # a fresh interpreter per size keeps peak RSS comparable
+            subprocess.run([
+                sys.executable, os.path.abspath(__file__), "_worker",
+                "--rows", str(rows), "--trees", str(args.trees), "--repeat", str(args.repeat),
+                "--seed", str(args.seed), "--data-dir", args.data_dir, "--result-file", result_file,
+            ], check=True, stdout=None if args.verbose else subprocess.DEVNULL)
+            with open(result_file) as f:
+                result = json.load(f)
+        finally:
+            os.remove(result_file)
+        run["sizes"].append(result)
+        print_size(result)
+
+    history = load_history(args.history)
+    history.append(run)
+    save_history(args.history, history)
+    print(f"\nSaved run #{len(history) - 1} ({args.label or 'unlabelled'}) to {args.history}")
+
+
+def print_size(result):
+    print(f"{'stage':<22}{'seconds':>10}{'rows/s':>14}{'peak MB':>10}{'Δ MB':>9}")
+    for name, s in result["stages"].items():
+        rate = f"{s['rows_per_s']:,.0f}" if s["rows_per_s"] else "-"
+        print(f"{name:<22}{s['seconds']:>10.3f}{rate:>14}{s['peak_rss_mb']:>10.1f}{s['rss_delta_mb']:>9.1f}")
+    t = result["totals"]
+    print(f"{'features total':<22}{t['features.total']:>10.3f}")
+    print(f"{'pipeline total':<22}{t['total']:>10.3f}   process peak {result['peak_rss_mb']:.0f} MB")
+
+
+def cmd_list(args):
+    for i, run in enumerate(load_history(args.history)):
+        sizes = ", ".join(f"{s['rows']:,}" for s in run["sizes"])
+        print(f"#{i:<3} {run['timestamp']}  {run.get('git_commit') or '-':<9} "
+              f"{run.get('label') or '-':<24} trees={run['params']['trees']}  sizes: {sizes}")
+
+
+def cmd_compare(args):
+    history = load_history(args.history)
+    base, cand = _pick(history, args.baseline), _pick(history, args.candidate)
+    print(f"baseline : {base.get('label') or '-'} ({base['timestamp']}, {base.get('git_commit') or '-'})")
+    print(f"candidate: {cand.get('label') or '-'} ({cand['timestamp']}, {cand.get('git_commit') or '-'})")
+    if base["params"] != cand["params"] or base.get("cpu_count") != cand.get("cpu_count"):
+        print(f"warning: runs differ in params or machine "
+              f"({base['params']}, {base.get('cpu_count')} cpus vs. "
+              f"{cand['params']}, {cand.get('cpu_count')} cpus)")
+
+    regressions = []
+    base_sizes = {s["rows"]: s for s in base["sizes"]}
+    for size in cand["sizes"]:
+        old = base_sizes.get(size["rows"])
+        if old is None:
+            continue
+        print(f"\n── {size['rows']:,} rows")
+        print(f"{'stage':<22}{'base s':>10}{'cand s':>10}{'time':>9}{'base MB':>10}{'cand MB':>10}  flag")
+        for name, new in size["stages"].items():
+            prev = old["stages"].get(name)
+            if prev is None:
+                print(f"{name:<22}{'-':>10}{new['seconds']:>10.3f}   (new stage)")
+                continue
+            change = new["seconds"] / prev["seconds"] - 1 if prev["seconds"] > 0 else 0.0
+            flags = []
+            # ignore sub-`min_seconds` stages: their noise dwarfs any real change
+            if change > args.tolerance and new["seconds"] - prev["seconds"] > args.min_seconds:
+                flags.append("SLOWER")
+            grown = new["peak_rss_mb"] - prev["peak_rss_mb"]
+            if grown > args.min_mb and grown > prev["peak_rss_mb"] * args.memory_tolerance:
+                flags.append("MEMORY")
+            if change < -args.tolerance and prev["seconds"] - new["seconds"] > args.min_seconds:
+                flags.append("faster")
+            if set(flags) & {"SLOWER", "MEMORY"}:
+                regressions.append((size["rows"], name, flags))
+            print(f"{name:<22}{prev['seconds']:>10.3f}{new['seconds']:>10.3f}{change:>+9.1%}"
+                  f"{prev['peak_rss_mb']:>10.1f}{new['peak_rss_mb']:>10.1f}  {' '.join(flags)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%} time / "
+              f"{args.memory_tolerance:.0%} memory:")
+        for rows, name, flags in regressions:
+            print(f"  {rows:>10,} rows  {name:<22} {' '.join(flags)}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON history file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="benchmark every stage and append to the history")
+    run.add_argument("--sizes", type=int, nargs="+", default=[20000, 100000, 500000])
+    run.add_argument("--trees", type=int, default=200,
+                     help="n_estimators for the fit stage (train.py uses 800)")
+    run.add_argument("--repeat", type=int, default=1, help="best-of-N wall time per stage")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="cache for generated CSVs")
+    run.add_argument("--label", help="name for this run (e.g. a branch or change)")
+    run.add_argument("--verbose", action="store_true", help="show pipeline output")
+    run.set_defaults(fn=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="diff two runs; exit 1 on a regression")
+    cmp_.add_argument("--baseline", default="-2", help="run index or label")
+    cmp_.add_argument("--candidate", default="-1", help="run index or label")
+    cmp_.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown (0.15 = 15%%)")
+    cmp_.add_argument("--memory-tolerance", type=float, default=0.20, help="allowed peak RSS growth")
+    cmp_.add_argument("--min-seconds", type=float, default=0.05, help="ignore smaller time changes")
+    cmp_.add_argument("--min-mb", type=float, default=20.0, help="ignore smaller memory changes")
+    cmp_.set_defaults(fn=cmd_compare)
+
+    lst = sub.add_parser("list", help="show recorded runs")
+    lst.set_defaults(fn=cmd_list)
+
+    worker = sub.add_parser("_worker")  # internal: one size in a fresh process
+    worker.add_argument("--rows", type=int, required=True)
+    worker.add_argument("--trees", type=int, required=True)
+    worker.add_argument("--repeat", type=int, required=True)
+    worker.add_argument("--seed", type=int, required=True)
+    worker.add_argument("--data-dir", required=True)
+    worker.add_argument("--result-file", required=True)
+    worker.set_defaults(fn=cmd_worker)
+
+    args = parser.parse_args()
+    args.fn(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Throughput benchmark: per-call /predict vs. a persistent WebSocket and a
+chunked NDJSON POST. Needs a running API:
+
+    python -m uvicorn api.main:app --port 8000
+    python benchmarks/bench_stream.py --url http://127.0.0.1:8000 --n 5000
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+import requests
+
+
+def make_payloads(n, seed=7):
+    rng = np.random.default_rng(seed)
+    states = ["Delhi", "Maharashtra", "Karnataka", "Odisha", "Gujarat"]
+    banks = ["SBI", "HDFC", "ICICI", "Axis", "PNB"]
+    run = uuid.uuid4().hex[:6]  # fresh ids so the result cache never hits
+    return [
+        {
+            "transaction_id":    f"BENCH_{run}_{i}",
+            "timestamp":         f"2024-03-{1 + i % 28:02d}T{i % 24:02d}:15:00",
+            "sender_id":         f"USER_{rng.integers(0, 5000)}",
+            "receiver_id":       f"USER_{rng.integers(0, 5000)}",
+            "amount":            float(round(rng.lognormal(8, 1.2), 2)),
+            "transaction_type":  "P2P" if i % 3 else "P2M",
+            "merchant_category": "Food",
+            "sender_state":      states[i % len(states)],
+            "receiver_state":    states[(i * 7) % len(states)],
+            "sender_bank":       banks[i % len(banks)],
+            "receiver_bank":     banks[(i * 3) % len(banks)],
+            "device_type":       "Android",
+            "network_type":      "4G",
+            "account_age_days":  int(rng.integers(0, 3000)),
+        }
+        for i in range(n)
+    ]
+
+
+def report(name, n, elapsed, latencies_ms=None):
+    line = f"  {name:<22} {n / elapsed:>10,.0f} txn/s   ({elapsed:.2f}s for {n:,})"
+    if latencies_ms:
+        p50, p99 = np.percentile(latencies_ms, [50, 99])
+        line += f"   p50={p50:.1f}ms p99={p99:.1f}ms"
+    print(line)
+
+
+def bench_predict(url, payloads, concurrency):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    def call(p):
+        t0 = time.perf_counter()
+        session.post(f"{url}/predict", json=p, timeout=30).raise_for_status()
+        return (time.perf_counter() - t0) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(call, payloads))
+    report(f"/predict x{concurrency}", len(payloads), time.perf_counter() - start, latencies)
+
+
+async def _ndjson(url, payloads, chunk):
+    """
+    Full-duplex chunked POST: results are read while the body is still
+    being written. (requests/httpx only read once the upload is done,
+    which stalls as soon as the server's per-connection window fills.)
+    """
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    start = time.perf_counter()
+    writer.write(
+        f"POST /predict/stream HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        "Content-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n".encode()
+    )
+
+    async def sender():
+        for i in range(0, len(payloads), chunk):
+            data = "".join(json.dumps(p) + "\n" for p in payloads[i:i + chunk]).encode()
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    send_task = asyncio.create_task(sender())
+    status = await reader.readline()
+    if b" 200 " not in status:
+        raise RuntimeError(f"/predict/stream answered {status.decode().strip()}")
+    while (await reader.readline()) not in (b"\r\n", b""):
+        pass  # headers
+
+    got, tail = 0, b""
+    while True:
+        size = int((await reader.readline()).strip(), 16)
+        if size == 0:
+            break
+        data = tail + await reader.readexactly(size)
+        await reader.readexactly(2)
+        *lines, tail = data.split(b"\n")
+        got += sum(1 for line in lines if line)
+    await send_task
+    writer.close()
+    report("/predict/stream", got, time.perf_counter() - start)
+
+
+async def _ws(url, payloads, chunk):
+    import websockets
+
+    ws_url = url.replace("http://", "ws://").replace("https://", "wss://") + "/ws/predict"
+    start = time.perf_counter()
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        async def sender():
+            for i in range(0, len(payloads), chunk):
+                await ws.send(json.dumps(payloads[i:i + chunk]))
+
+        send_task = asyncio.create_task(sender())
+        got = 0
+        while got < len(payloads):
+            got += len((await ws.recv()).splitlines())
+        await send_task
+    report("/ws/predict", got, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--n", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads for /predict")
+    parser.add_argument("--chunk", type=int, default=100, help="records per WebSocket frame / body chunk")
+    args = parser.parse_args()
+
+    print(f"Scoring {args.n:,} transactions against {args.url}")
+    bench_predict(args.url, make_payloads(args.n), args.concurrency)
+    asyncio.run(_ndjson(args.url, make_payloads(args.n), args.chunk))
+    try:
+        asyncio.run(_ws(args.url, make_payloads(args.n), args.chunk))
+    except ImportError:
+        print("  /ws/predict            skipped (pip install websockets)")
+
+
+if __name__ == "__main__":
+    main()
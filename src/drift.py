@@ -0,0 +1,283 @@
+"""
+Feature and score drift against a training-time reference.
+
+Training exports a reference profile (`drift_reference.json`) with
+fixed histogram bins for a few key numeric features and the model score
+(quantile cut points), plus category frequencies. The API keeps one ring
+of per-minute count buckets over the same bins, so each transaction costs
+a handful of bin increments and memory never grows with traffic. A
+report sums the buckets of the requested window and compares them with
+the reference:
+
+    psi   Population Stability Index over the bins
+          (< 0.1 stable, < 0.25 moderate, otherwise drift)
+    ks    largest gap between the binned CDFs (numeric features only)
+
+Usage (offline report for a new CSV, from the src directory):
+    python drift.py --input ../data/upi_100k_ultra_realistic.csv
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_FEATURES = ["amount", "amount_zscore", "txn_velocity_1h", "account_age_days"]
+CATEGORICAL_FEATURES = ["transaction_type", "merchant_category", "device_type", "network_type"]
+SCORE = "fraud_probability"
+
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+EPS = 1e-4
+
+
+# ----------------------------------------------------------
+#  METRICS
+# ----------------------------------------------------------
+
+def psi(expected, actual):
+    """Population Stability Index between two count vectors over the same bins."""
+    e = np.asarray(expected, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    e = np.maximum(e / max(e.sum(), 1.0), EPS)
+    a = np.maximum(a / max(a.sum(), 1.0), EPS)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def binned_ks(expected, actual):
+    """KS statistic on binned counts (last bin = missing values, excluded)."""
+    e = np.asarray(expected[:-1], dtype=np.float64)
+    a = np.asarray(actual[:-1], dtype=np.float64)
+    if e.sum() == 0 or a.sum() == 0:
+        return None
+    return float(np.max(np.abs(np.cumsum(e) / e.sum() - np.cumsum(a) / a.sum())))
+
+
+def status(value):
+    if value < PSI_MODERATE:
+        return "stable"
+    return "moderate" if value < PSI_DRIFT else "drift"
+
+
+# ----------------------------------------------------------
+#  EXPORT (training side)
+# ----------------------------------------------------------
+
+def _numeric_bins(values, bins):
+    """Interior quantile cut points plus counts (one extra bin for NaN)."""
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[~np.isnan(values)]
+    if len(finite) == 0:
+        edges = np.zeros(0)
+    else:
+        edges = np.unique(np.quantile(finite, np.linspace(0, 1, bins + 1)[1:-1]))
+    return {"edges": edges.tolist(), "counts": _numeric_counts(edges, values).tolist()}
+
+
+def _numeric_counts(edges, values):
+    idx = np.searchsorted(edges, values, side="right")
+    idx[np.isnan(values)] = len(edges) + 1
+    return np.bincount(idx, minlength=len(edges) + 2)
+
+
+def _categorical_bins(values, max_categories):
+    freq = pd.Series(values).astype(str).value_counts()
+    categories = freq.index[:max_categories].tolist()
+    other = int(freq.iloc[max_categories:].sum())
+    return {"categories": categories, "counts": freq.iloc[:max_categories].astype(int).tolist() + [other]}
+
+
+def build_reference(raw, features, scores, bins=20, max_categories=32):
+    """
+    Reference profile from the raw training frame (categories), the
+    `build_features` frame (numeric features) and held-out model scores.
+    """
+    numeric = {
+        name: _numeric_bins(features[name].to_numpy(dtype=np.float64), bins)
+        for name in NUMERIC_FEATURES if name in features.columns
+    }
+    numeric[SCORE] = _numeric_bins(scores, bins)
+    categorical = {
+        name: _categorical_bins(raw[name].to_numpy(), max_categories)
+        for name in CATEGORICAL_FEATURES if name in raw.columns
+    }
+    return {"version": 1, "rows": int(len(features)), "numeric": numeric, "categorical": categorical}
+
+
+def export_drift_reference(raw, features, scores, path):
+    reference = build_reference(raw, features, scores)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(reference, f)
+    os.replace(tmp, path)
+    print(f"Drift reference saved: {path} ({len(reference['numeric'])} numeric, "
+          f"{len(reference['categorical'])} categorical)")
+    return reference
+
+
+# ----------------------------------------------------------
+#  MONITOR (serving side)
+# ----------------------------------------------------------
+
+class DriftMonitor:
+    """
+    Sliding-window histograms over the reference bins.
+
+    Counts live in a (n_buckets, total_bins) ring; a bucket covers
+    `bucket_seconds` and is zeroed when its slot is reused, so memory is
+    fixed and recording a transaction is a few bisects and increments.
+    """
+
+    def __init__(self, reference, bucket_seconds=60, n_buckets=60, min_samples=200):
+        self.reference = reference
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+        self.min_samples = min_samples
+
+        # (name, kind, offset, edges | category->bin map, n_bins)
+        self._layout = []
+        offset = 0
+        for name, ref in reference["numeric"].items():
+            n_bins = len(ref["edges"]) + 2
+            self._layout.append((name, "numeric", offset, list(ref["edges"]), n_bins))
+            offset += n_bins
+        for name, ref in reference["categorical"].items():
+            n_bins = len(ref["categories"]) + 1
+            lookup = {c: i for i, c in enumerate(ref["categories"])}
+            self._layout.append((name, "categorical", offset, lookup, n_bins))
+            offset += n_bins
+
+        self._counts = np.zeros((n_buckets, offset), dtype=np.int64)
+        self._bucket_ids = np.full(n_buckets, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+        self.observed = 0
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with open(path) as f:
+            return cls(json.load(f), **kwargs)
+
+    def _row(self, now):
+        bucket = int(now // self.bucket_seconds)
+        slot = bucket % self.n_buckets
+        if self._bucket_ids[slot] != bucket:
+            self._counts[slot] = 0
+            self._bucket_ids[slot] = bucket
+        return self._counts[slot]
+
+    def observe(self, values: dict, now=None):
+        """Record one transaction; `values` maps feature name -> raw value."""
+        bins = []
+        for name, kind, offset, spec, n_bins in self._layout:
+            if name not in values:
+                continue
+            value = values[name]
+            if kind == "numeric":
+                if value is None or value != value:
+                    bins.append(offset + n_bins - 1)
+                else:
+                    bins.append(offset + bisect_right(spec, value))
+            else:
+                bins.append(offset + spec.get(str(value), n_bins - 1))
+        with self._lock:
+            row = self._row(time.time() if now is None else now)
+            for b in bins:
+                row[b] += 1
+            self.observed += 1
+
+    def observe_frame(self, columns: dict, now=None):
+        """Vectorized `observe` for a batch; `columns` maps name -> array."""
+        n = len(next(iter(columns.values()))) if columns else 0
+        if n == 0:
+            return
+        total = np.zeros(self._counts.shape[1], dtype=np.int64)
+        for name, kind, offset, spec, n_bins in self._layout:
+            if name not in columns:
+                continue
+            if kind == "numeric":
+                values = pd.to_numeric(pd.Series(columns[name]), errors="coerce").to_numpy(dtype=np.float64)
+                total[offset:offset + n_bins] += _numeric_counts(np.asarray(spec), values)
+            else:
+                idx = pd.Series(columns[name]).astype(str).map(spec).fillna(n_bins - 1)
+                total[offset:offset + n_bins] += np.bincount(idx.to_numpy(dtype=np.int64), minlength=n_bins)
+        with self._lock:
+            self._row(time.time() if now is None else now)[:] += total
+            self.observed += n
+
+    def report(self, window_minutes=None, now=None):
+        """PSI/KS per feature over the last `window_minutes` (default: whole ring)."""
+        now = time.time() if now is None else now
+        span = self.n_buckets * self.bucket_seconds
+        if window_minutes is not None:
+            span = min(span, window_minutes * 60)
+        current = int(now // self.bucket_seconds)
+        oldest = current - max(int(span // self.bucket_seconds), 1) + 1
+
+        with self._lock:
+            live = (self._bucket_ids >= oldest) & (self._bucket_ids <= current)
+            window = self._counts[live].sum(axis=0)
+
+        features = {}
+        for name, kind, offset, spec, n_bins in self._layout:
+            actual = window[offset:offset + n_bins]
+            expected = self.reference[kind][name]["counts"]
+            n = int(actual.sum())
+            entry = {"kind": kind, "n": n}
+            if n < self.min_samples:
+                entry["status"] = "insufficient_data"
+            else:
+                entry["psi"] = round(psi(expected, actual), 4)
+                if kind == "numeric":
+                    ks = binned_ks(expected, actual)
+                    entry["ks"] = None if ks is None else round(ks, 4)
+                entry["status"] = status(entry["psi"])
+            features[name] = entry
+
+        drifted = sorted(k for k, v in features.items() if v["status"] == "drift")
+        return {
+            "window_seconds": int(span),
+            "observed_total": self.observed,
+            "reference_rows": self.reference["rows"],
+            "drifted": drifted,
+            "features": features,
+        }
+
+
+# ----------------------------------------------------------
+#  CLI
+# ----------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Drift report for a CSV against the training reference")
+    parser.add_argument("--input", required=True, help="raw transactions CSV")
+    parser.add_argument("--reference", default="../model/drift_reference.json")
+    parser.add_argument("--model", default="../model/fraud_model.pkl")
+    parser.add_argument("--features", default="../model/feature_columns.pkl")
+    args = parser.parse_args()
+
+    import pickle
+    from preprocess import build_features
+
+    raw = pd.read_csv(args.input)
+    df = build_features(raw)
+    model = pickle.load(open(args.model, "rb"))
+    feature_cols = list(pickle.load(open(args.features, "rb")))
+    X = df.reindex(columns=feature_cols, fill_value=0).astype(np.float32)
+
+    monitor = DriftMonitor.load(args.reference, n_buckets=1, min_samples=1)
+    columns = {name: df[name].to_numpy() for name in NUMERIC_FEATURES if name in df.columns}
+    columns.update({name: raw[name].to_numpy() for name in CATEGORICAL_FEATURES if name in raw.columns})
+    columns[SCORE] = model.predict_proba(X)[:, 1]
+    monitor.observe_frame(columns, now=0)
+
+    for name, entry in monitor.report(now=0)["features"].items():
+        ks = entry.get("ks")
+        print(f"{name:<20} psi={entry['psi']:<8} ks={'-' if ks is None else ks:<8} {entry['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+"""
+Synthetic UPI transaction generator for scale and performance testing.
+
+Produces the raw schema `build_features` expects (the Kaggle CSV columns)
+at any size, streamed to CSV or Parquet one chunk at a time, so memory
+stays flat from 1M to 100M rows. Output is deterministic for a given
+--seed and --chunk-rows, and time-ordered across chunks like a log.
+
+    normal traffic   heavy-tailed (lognormal) sender activity, per-sender
+                     spending level, repeat P2P contacts, Zipf merchant
+                     popularity, diurnal timestamps
+    velocity bursts  a compromised account fires 5-20 payments in minutes
+    new accounts     days-old accounts sending 20k-1L, mostly at night
+    mule rings       victims pay into a ring of mule accounts that pass
+                     money around in a cycle (dense, reciprocal subgraph)
+    replays          a captured payment request resent 1-3 times within a
+                     minute, same sender, receiver, amount and device
+
+Usage (from the src directory):
+    python generate_data.py --rows 1000000 --output ../data/upi_1m.csv
+    python generate_data.py --rows 100000000 --output ../data/upi_100m.parquet
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "transaction_id", "timestamp", "sender_id", "receiver_id", "amount",
+    "transaction_type", "merchant_category", "sender_state", "receiver_state",
+    "sender_bank", "receiver_bank", "device_type", "network_type",
+    "account_age_days", "fraud_flag",
+]
+
+STATES = [
+    "Andhra Pradesh", "Delhi", "Gujarat", "Karnataka", "Maharashtra", "Odisha",
+    "Rajasthan", "Tamil Nadu", "Telangana", "Uttar Pradesh", "West Bengal",
+]
+STATE_P = [0.07, 0.10, 0.08, 0.12, 0.17, 0.04, 0.06, 0.10, 0.07, 0.11, 0.08]
+
+BANKS = ["Axis", "Bank of Baroda", "HDFC", "ICICI", "IndusInd", "Kotak", "PNB", "SBI", "Yes Bank"]
+BANK_P = [0.10, 0.08, 0.17, 0.14, 0.04, 0.07, 0.08, 0.28, 0.04]
+
+MERCHANT_CATEGORIES = [
+    "Bills", "Education", "Entertainment", "Food", "Fuel", "Grocery", "Healthcare",
+    "Other", "Retail", "Shopping", "Transport", "Travel", "Utilities",
+]
+MERCHANT_P = [0.06, 0.03, 0.06, 0.17, 0.07, 0.16, 0.04, 0.05, 0.09, 0.12, 0.07, 0.03, 0.05]
+P2P_CATEGORY = MERCHANT_CATEGORIES.index("Other")
+
+DEVICES = ["Android", "Web", "iOS"]
+DEVICE_P = [0.74, 0.06, 0.20]
+
+NETWORKS = ["3G", "4G", "5G", "WiFi"]
+NETWORK_P = [0.05, 0.55, 0.22, 0.18]
+
+TRANSACTION_TYPES = ["P2M", "P2P"]
+P2M, P2P = 0, 1
+
+# relative activity per hour of day (quiet nights, lunch and evening peaks)
+DIURNAL = np.array([
+    0.6, 0.3, 0.2, 0.2, 0.3, 0.6, 1.5, 3.0, 4.5, 5.0, 5.2, 5.6,
+    6.0, 5.5, 5.0, 4.8, 5.0, 5.6, 6.2, 6.5, 6.0, 4.5, 2.8, 1.4,
+])
+
+PATTERNS = ("velocity_burst", "new_account", "mule_ring", "replay")
+
+
+# ----------------------------------------------------------
+#  POPULATION
+# ----------------------------------------------------------
+
+class Population:
+    """
+    Static per-account attributes as flat arrays. Users are codes
+    [0, n_users), merchants [n_users, n_users + n_merchants); `ids` is a
+    categorical dtype over every id string, so id columns are built from
+    codes without formatting a string per row.
+    """
+
+    def __init__(self, n_users, n_merchants, seed):
+        rng = np.random.default_rng([seed, 0])
+        self.n_users = n_users
+        self.n_merchants = n_merchants
+        n = n_users + n_merchants
+
+        self.ids = pd.CategoricalDtype(np.concatenate([
+            np.char.add("USER_", np.arange(n_users).astype(str)),
+            np.char.add("MERCH_", np.arange(n_merchants).astype(str)),
+        ]).astype(object))
+        self.state   = rng.choice(len(STATES), n, p=STATE_P).astype(np.int8)
+        self.bank    = rng.choice(len(BANKS), n, p=BANK_P).astype(np.int8)
+        self.device  = rng.choice(len(DEVICES), n, p=DEVICE_P).astype(np.int8)
+        self.network = rng.choice(len(NETWORKS), n, p=NETWORK_P).astype(np.int8)
+        self.age0    = np.minimum(rng.lognormal(6.3, 1.0, n), 4000).astype(np.int32)
+
+        # lognormal activity: a few heavy users, a long tail of occasional ones
+        activity = rng.lognormal(0.0, 1.1, n_users)
+        self.user_cum = np.cumsum(activity / activity.sum())
+        self.log_amount = rng.normal(7.4, 0.9, n_users)
+
+        popularity = 1.0 / np.arange(1, n_merchants + 1) ** 1.1  # Zipf
+        rng.shuffle(popularity)
+        self.merchant_cum = np.cumsum(popularity / popularity.sum())
+        self.merchant_category = rng.choice(
+            len(MERCHANT_CATEGORIES), n_merchants, p=MERCHANT_P
+        ).astype(np.int8)
+
+    def active_users(self, rng, n):
+        """Users drawn proportionally to their activity."""
+        idx = np.searchsorted(self.user_cum, rng.random(n))
+        return np.minimum(idx, self.n_users - 1)
+
+    def merchants(self, rng, n):
+        idx = np.searchsorted(self.merchant_cum, rng.random(n))
+        return self.n_users + np.minimum(idx, self.n_merchants - 1)
+
+
+# ----------------------------------------------------------
+#  TRANSACTION BLOCKS (dicts of equal-length arrays)
+# ----------------------------------------------------------
+
+def _diurnal_times(rng, n, t0, t1):
+    """Epoch seconds in [t0, t1) following the DIURNAL hour profile."""
+    first_hour = t0 // 3600
+    hours = np.arange(first_hour, (t1 - 1) // 3600 + 1)
+    weights = DIURNAL[hours % 24]
+    pick = np.searchsorted(np.cumsum(weights / weights.sum()), rng.random(n))
+    seconds = hours[np.minimum(pick, len(hours) - 1)] * 3600 + rng.integers(0, 3600, n)
+    return np.clip(seconds, t0, t1 - 1)
+
+
+def _block(pop, rng, senders, receivers, times, amounts, start, fraud,
+           tx_type=None, category=None, age=None, device=None):
+    n = len(senders)
+    if tx_type is None:
+        tx_type = np.where(receivers >= pop.n_users, P2M, P2P).astype(np.int8)
+    if category is None:
+        category = np.full(n, P2P_CATEGORY, dtype=np.int8)
+        is_merchant = receivers >= pop.n_users
+        category[is_merchant] = pop.merchant_category[receivers[is_merchant] - pop.n_users]
+    if age is None:
+        age = pop.age0[senders] + (times - start) // 86400
+    if device is None:
+        device = pop.device[senders].copy()
+        switched = rng.random(n) < 0.03
+        device[switched] = rng.choice(len(DEVICES), int(switched.sum()), p=DEVICE_P)
+    network = pop.network[senders].copy()
+    roaming = rng.random(n) < 0.25
+    network[roaming] = rng.choice(len(NETWORKS), int(roaming.sum()), p=NETWORK_P)
+    return {
+        "timestamp":         times,
+        "sender":            senders,
+        "receiver":          receivers,
+        "amount":            np.round(amounts, 2),
+        "transaction_type":  tx_type,
+        "merchant_category": category,
+        "sender_state":      pop.state[senders],
+        "receiver_state":    pop.state[receivers],
+        "sender_bank":       pop.bank[senders],
+        "receiver_bank":     pop.bank[receivers],
+        "device_type":       device,
+        "network_type":      network,
+        "account_age_days":  np.asarray(age, dtype=np.int32),
+        "fraud_flag":        np.full(n, int(fraud), dtype=np.int8),
+    }
+
+
+def normal_transactions(pop, rng, n, t0, t1, start):
+    senders = pop.active_users(rng, n)
+    to_merchant = rng.random(n) < 0.55
+    receivers = np.empty(n, dtype=np.int64)
+    receivers[to_merchant] = pop.merchants(rng, int(to_merchant.sum()))
+
+    # P2P: mostly a small circle of repeat contacts (ids close to the
+    # sender), sometimes anyone
+    p2p = ~to_merchant
+    k = int(p2p.sum())
+    contact = (senders[p2p] + rng.integers(1, 40, k)) % pop.n_users
+    stranger = pop.active_users(rng, k)
+    receivers[p2p] = np.where(rng.random(k) < 0.7, contact, stranger)
+
+    same = receivers == senders
+    receivers[same] = (receivers[same] + 1) % pop.n_users
+    amounts = np.exp(pop.log_amount[senders] + rng.normal(0, 0.7, n))
+    return _block(pop, rng, senders, receivers, _diurnal_times(rng, n, t0, t1), amounts, start, False)
+
+
+def velocity_bursts(pop, rng, n, t0, t1, start):
+    """Compromised accounts draining funds in quick succession."""
+    sizes = rng.integers(5, 21, max(1, n // 12))
+    sizes = sizes[np.cumsum(sizes) <= n] if sizes.sum() > n else sizes
+    if len(sizes) == 0:
+        return None
+    burst = np.repeat(np.arange(len(sizes)), sizes)
+    senders = pop.active_users(rng, len(sizes))[burst]
+    begin = rng.integers(t0, t1, len(sizes))[burst]
+    # ~30s gaps, accumulated from the start of each burst
+    gaps = rng.exponential(30, len(burst))
+    elapsed = np.cumsum(gaps)
+    firsts = np.cumsum(sizes) - sizes
+    offsets = elapsed - np.repeat(elapsed[firsts] - gaps[firsts], sizes)
+    times = np.minimum(begin + offsets.astype(np.int64), t1 - 1)
+    receivers = rng.integers(0, pop.n_users, len(burst))
+    amounts = np.exp(pop.log_amount[senders] + rng.normal(0.8, 0.5, len(burst)))
+    return _block(pop, rng, senders, receivers, times, amounts, start, True)
+
+
+def new_account_transfers(pop, rng, n, t0, t1, start):
+    """Freshly opened accounts moving large sums, mostly at night."""
+    senders = rng.integers(0, pop.n_users, n)
+    times = rng.integers(t0, t1, n)
+    night = rng.random(n) < 0.6
+    day_start = times - times % 86400
+    times[night] = np.clip(day_start[night] + rng.integers(0, 6 * 3600, int(night.sum())), t0, t1 - 1)
+    receivers = rng.integers(0, pop.n_users, n)
+    amounts = rng.uniform(20000, 100000, n)
+    age = rng.integers(0, 15, n)
+    return _block(pop, rng, senders, receivers, times, amounts, start, True, age=age)
+
+
+def mule_rings(pop, rng, n, t0, t1, start):
+    """Victims pay into a ring; the ring passes money around its cycle."""
+    blocks = []
+    remaining = n
+    while remaining > 0:
+        k = int(rng.integers(5, 13))
+        ring = rng.choice(pop.n_users, k, replace=False)
+        victims = int(min(remaining, rng.integers(k, 4 * k)))
+        laps = int(min(max(remaining - victims, 0), 2 * k))
+        begin = int(rng.integers(t0, t1))
+        end = min(begin + 6 * 3600, t1)
+
+        # fan-in from victims, then round trips along the cycle:
+        # ring[i] -> ring[i + 1] and back on alternate laps
+        hop = np.arange(laps)
+        forward = hop % 2 == 0
+        a, b = ring[(hop // 2) % k], ring[(hop // 2 + 1) % k]
+        senders = np.concatenate([pop.active_users(rng, victims), np.where(forward, a, b)])
+        receivers = np.concatenate([
+            ring[rng.integers(0, k, victims)], np.where(forward, b, a)
+        ])
+        times = np.sort(rng.integers(begin, max(end, begin + 1), len(senders)))
+        amounts = rng.uniform(5000, 45000, len(senders))
+        age = np.where(
+            np.isin(senders, ring), rng.integers(10, 120, len(senders)),
+            pop.age0[senders] + (times - start) // 86400
+        )
+        blocks.append(_block(pop, rng, senders, receivers, times, amounts, start, True, age=age))
+        remaining -= len(senders)
+    return _concat(blocks)
+
+
+def replayed_payments(pop, rng, n, t0, t1, start):
+    """Legitimate payments whose request is resent within a minute."""
+    copies = rng.integers(1, 4, max(1, n // 2))
+    copies = copies[np.cumsum(copies) <= n] if copies.sum() > n else copies
+    if len(copies) == 0:
+        return None
+    m = len(copies)
+    senders = pop.active_users(rng, m)
+    receivers = np.where(rng.random(m) < 0.5, pop.merchants(rng, m), pop.active_users(rng, m))
+    same = receivers == senders
+    receivers[same] = (receivers[same] + 1) % pop.n_users
+    amounts = np.exp(pop.log_amount[senders] + rng.normal(0.3, 0.7, m))
+    times = _diurnal_times(rng, m, t0, t1)
+
+    # originals first, then each replay 2-60s after its original
+    rep = np.repeat(np.arange(m), copies)
+    idx = np.concatenate([np.arange(m), rep])
+    replay_times = np.minimum(times[rep] + rng.integers(2, 61, len(rep)), t1 - 1)
+    block = _block(pop, rng, senders[idx], receivers[idx], np.concatenate([times, replay_times]),
+                   amounts[idx], start, True, device=pop.device[senders][idx])
+    block["fraud_flag"][:m] = 0  # the original payment was genuine
+    return block
+
+
+def _concat(blocks):
+    blocks = [b for b in blocks if b is not None]
+    return {key: np.concatenate([b[key] for b in blocks]) for key in blocks[0]}
+
+
+# ----------------------------------------------------------
+#  CHUNKS
+# ----------------------------------------------------------
+
+def generate_chunk(pop, index, rows, t0, t1, start, seed, fraud_rate, first_txn):
+    """One time-ordered chunk of `rows` transactions covering [t0, t1)."""
+    rng = np.random.default_rng([seed, 1, index])
+    n_fraud = int(round(rows * fraud_rate))
+    per_pattern = np.full(len(PATTERNS), n_fraud // len(PATTERNS))
+    per_pattern[:n_fraud % len(PATTERNS)] += 1
+
+    fraud = [
+        fn(pop, rng, int(k), t0, t1, start) if k else None
+        for fn, k in zip((velocity_bursts, new_account_transfers, mule_rings, replayed_payments),
+                         per_pattern)
+    ]
+    n_fraud = sum(len(b["sender"]) for b in fraud if b is not None)
+    cols = _concat([normal_transactions(pop, rng, rows - n_fraud, t0, t1, start)] + fraud)
+
+    order = np.argsort(cols["timestamp"], kind="stable")
+    cols = {key: value[order] for key, value in cols.items()}
+
+    def cat(codes, labels):
+        dtype = labels if isinstance(labels, pd.CategoricalDtype) else pd.CategoricalDtype(labels)
+        return pd.Categorical.from_codes(codes.astype(np.int32), dtype=dtype)
+
+    return pd.DataFrame({
+        "transaction_id":    np.char.add("TXN_", np.arange(first_txn, first_txn + rows).astype(str)),
+        "timestamp":         pd.to_datetime(cols["timestamp"], unit="s"),
+        "sender_id":         cat(cols["sender"], pop.ids),
+        "receiver_id":       cat(cols["receiver"], pop.ids),
+        "amount":            cols["amount"],
+        "transaction_type":  cat(cols["transaction_type"], TRANSACTION_TYPES),
+        "merchant_category": cat(cols["merchant_category"], MERCHANT_CATEGORIES),
+        "sender_state":      cat(cols["sender_state"], STATES),
+        "receiver_state":    cat(cols["receiver_state"], STATES),
+        "sender_bank":       cat(cols["sender_bank"], BANKS),
+        "receiver_bank":     cat(cols["receiver_bank"], BANKS),
+        "device_type":       cat(cols["device_type"], DEVICES),
+        "network_type":      cat(cols["network_type"], NETWORKS),
+        "account_age_days":  cols["account_age_days"],
+        "fraud_flag":        cols["fraud_flag"],
+    }, columns=COLUMNS)
+
+
+def iter_chunks(rows, chunk_rows=1_000_000, users=None, merchants=None, days=90,
+                start="2024-01-01", seed=42, fraud_rate=0.02):
+    """Yield DataFrame chunks totalling `rows` rows."""
+    users = users or max(1000, rows // 20)
+    merchants = merchants or max(100, users // 50)
+    pop = Population(users, merchants, seed)
+
+    t_start = int(pd.Timestamp(start).timestamp())
+    span = days * 86400
+    n_chunks = max(1, -(-rows // chunk_rows))
+    for i in range(n_chunks):
+        first = i * chunk_rows
+        size = min(chunk_rows, rows - first)
+        t0 = t_start + span * first // rows
+        t1 = t_start + span * (first + size) // rows
+        yield generate_chunk(pop, i, size, t0, max(t1, t0 + 1), t_start, seed, fraud_rate, first)
+
+
+def _to_arrow(chunk):
+    """
+    Arrow table with plain string columns (a per-chunk dictionary of every
+    account id would otherwise be written with each chunk) and
+    second-resolution timestamps.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    columns = {}
+    for name, col in zip(table.column_names, table.columns):
+        if pa.types.is_dictionary(col.type):
+            col = col.cast(pa.string())
+        elif pa.types.is_timestamp(col.type):
+            col = col.cast(pa.timestamp("s"))
+        columns[name] = col
+    return pa.table(columns)
+
+
+def generate(output, rows, **kwargs):
+    """
+    Stream generated chunks to `output` (.csv, .csv.gz or .parquet). Uses
+    pyarrow's writers when installed (Parquet requires it); plain CSV
+    falls back to pandas, several times slower.
+    """
+    parquet = output.endswith(".parquet")
+    try:
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        if parquet:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)")
+        pa_csv = pq = None
+
+    tmp = output + ".tmp"
+    gz = output.endswith(".gz")
+    sink = writer = None
+    written = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_chunks(rows, **kwargs):
+            if pq is None:
+                # gzip members appended per chunk still read as one stream
+                chunk.to_csv(tmp, mode="a" if written else "w", header=not written,
+                             index=False, compression="gzip" if gz else None)
+            else:
+                table = _to_arrow(chunk)
+                if writer is None:
+                    if parquet:
+                        writer = pq.ParquetWriter(tmp, table.schema, compression="zstd")
+                    else:
+                        import pyarrow as pa
+                        sink = pa.CompressedOutputStream(tmp, "gzip") if gz else pa.OSFile(tmp, "wb")
+                        writer = pa_csv.CSVWriter(sink, table.schema)
+                writer.write_table(table)
+            written += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(f"  {written:>12,} rows  {written / elapsed:>10,.0f} rows/s", flush=True)
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+    os.replace(tmp, output)
+    return written
+
+
+# ----------------------------------------------------------
+#  CLI
+# ----------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic UPI transactions")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", default="../data/upi_synthetic.csv",
+                        help=".csv, .csv.gz or .parquet (needs pyarrow)")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=None, help="default rows / 20")
+    parser.add_argument("--merchants", type=int, default=None, help="default users / 50")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--fraud-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    print(f"Generating {args.rows:,} rows -> {args.output}")
+    generate(
+        args.output, args.rows,
+        chunk_rows=args.chunk_rows, users=args.users, merchants=args.merchants,
+        days=args.days, start=args.start, seed=args.seed, fraud_rate=args.fraud_rate
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Fraud-ring graph features over the sender -> receiver edge list.
+
+Everything here works on integer-coded edge arrays with numpy/scipy, so it
+scales to tens of millions of edges without building a networkx graph:
+
+    component_size   weakly connected component size (scipy csgraph)
+    kcore            k-core number on the undirected simple graph
+    reciprocity      share of a node's distinct receivers who also paid it back
+    two_hop_fanout   2-hop paths out of a node (sum of its receivers' out-degree)
+"""
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+def _distinct(codes):
+    """Sorted distinct values (sort + mask; faster than np.unique here)."""
+    codes = np.sort(codes)
+    if len(codes) == 0:
+        return codes
+    return codes[np.concatenate([[True], codes[1:] != codes[:-1]])]
+
+
+def encode_edges(senders, receivers):
+    """Factorize node ids; returns (src, dst, node_ids)."""
+    codes, nodes = pd.factorize(
+        np.concatenate([np.asarray(senders, dtype=object), np.asarray(receivers, dtype=object)])
+    )
+    n = len(senders)
+    return codes[:n].astype(np.int64), codes[n:].astype(np.int64), nodes
+
+
+def weak_components(src, dst, n_nodes):
+    """Component label and component size per node."""
+    graph = coo_matrix(
+        (np.ones(len(src), dtype=np.int8), (src, dst)), shape=(n_nodes, n_nodes)
+    ).tocsr()
+    _, labels = connected_components(graph, directed=True, connection="weak")
+    sizes = np.bincount(labels)
+    return labels, sizes[labels]
+
+
+def kcore_numbers(src, dst, n_nodes):
+    """
+    Vectorized batch peeling. Each round removes every remaining node of
+    degree <= k at once and updates neighbour degrees with one bincount;
+    the edge list shrinks as nodes are removed.
+    """
+    u = np.minimum(src, dst)
+    v = np.maximum(src, dst)
+    keep = u != v
+    edges = _distinct(u[keep] * n_nodes + v[keep])
+    u, v = edges // n_nodes, edges % n_nodes
+
+    degree = np.bincount(u, minlength=n_nodes) + np.bincount(v, minlength=n_nodes)
+    core = np.zeros(n_nodes, dtype=np.int64)
+    alive = np.ones(n_nodes, dtype=bool)
+    k = 0
+
+    while alive.any():
+        k = max(k, int(degree[alive].min()))
+        while True:
+            peel = alive & (degree <= k)
+            if not peel.any():
+                break
+            core[peel] = k
+            alive[peel] = False
+
+            hit_u, hit_v = peel[u], peel[v]
+            dropped = hit_u | hit_v
+            # each dropped edge lowers the degree of its surviving endpoint
+            degree -= np.bincount(u[dropped & ~hit_u], minlength=n_nodes)
+            degree -= np.bincount(v[dropped & ~hit_v], minlength=n_nodes)
+            u, v = u[~dropped], v[~dropped]
+    return core
+
+
+def reciprocity(src, dst, n_nodes):
+    """Per node: fraction of distinct out-edges u->v with a v->u edge."""
+    keep = src != dst
+    edges = _distinct(src[keep] * n_nodes + dst[keep])
+    u, v = edges // n_nodes, edges % n_nodes
+    # an edge is mutual iff its code shows up twice in edges + reversed edges
+    both = np.sort(np.concatenate([edges, v * n_nodes + u]))
+    mutual = both[1:][both[1:] == both[:-1]]
+    out_deg = np.bincount(u, minlength=n_nodes)
+    mutual_deg = np.bincount(mutual // n_nodes, minlength=n_nodes)
+    return np.divide(mutual_deg, out_deg, out=np.zeros(n_nodes), where=out_deg > 0)
+
+
+def two_hop_fanout(src, dst, n_nodes):
+    """Per node: number of 2-hop paths over distinct edges (u->v->w)."""
+    edges = _distinct(src * n_nodes + dst)
+    u, v = edges // n_nodes, edges % n_nodes
+    out_deg = np.bincount(u, minlength=n_nodes)
+    return np.bincount(u, weights=out_deg[v], minlength=n_nodes)
+
+
+def ring_features(senders, receivers):
+    """
+    Per-node fraud-ring features as a frame indexed by node id, plus the
+    weak component label (for seeding the online union-find).
+    """
+    src, dst, nodes = encode_edges(senders, receivers)
+    n_nodes = len(nodes)
+
+    labels, comp_size = weak_components(src, dst, n_nodes)
+    return pd.DataFrame({
+        "component":      labels,
+        "component_size": comp_size,
+        "kcore":          kcore_numbers(src, dst, n_nodes),
+        "reciprocity":    reciprocity(src, dst, n_nodes),
+        "two_hop_fanout": two_hop_fanout(src, dst, n_nodes),
+    }, index=pd.Index(nodes, name="node_id"))
+
+
+def add_sender_ring_features(df):
+    """Map per-node ring features onto each transaction's sender."""
+    ring = ring_features(df["sender_id"].to_numpy(), df["receiver_id"].to_numpy())
+    for name in ["component_size", "kcore", "reciprocity", "two_hop_fanout"]:
+        df["sender_" + name] = df["sender_id"].map(ring[name]).fillna(0)
+    return df
+
+
+def export_components(df, path):
+    """
+    Export node -> (weak component, size) for every sender and receiver,
+    as int64 columns in the mmap profile format. The API seeds its
+    incremental union-find from this file.
+    """
+    from sender_profiles import hash_ids, write_profiles
+
+    src, dst, nodes = encode_edges(df["sender_id"].to_numpy(), df["receiver_id"].to_numpy())
+    labels, sizes = weak_components(src, dst, len(nodes))
+    n = write_profiles(
+        path, hash_ids(nodes),
+        {"component": labels, "component_size": sizes},
+        dtype=np.int64
+    )
+    print(f"Graph components saved: {path} ({n:,} nodes, {int(labels.max()) + 1 if n else 0:,} components)")
+    return n
@@ -3,8 +3,15 @@ import pandas as pd
 import numpy as np
 import networkx as nx
 
+from graph_features import add_sender_ring_features
+from receiver_features import add_receiver_features
+from replay_features import add_recent_duplicate
 
-def build_features(df):
+
+# Each stage takes and returns the frame; build_features runs them in
+# order. They are separate so benchmarks/bench_pipeline.py can time them.
+
+def clean(df):
 
     # ------------------------------------------------------
     #  BASIC CLEANING
@@ -16,8 +23,11 @@ def build_features(df):
     df = df.dropna(subset=["timestamp"])
 
     df = df.sort_values(["sender_id", "timestamp"])
+    return df
 
 
+def temporal_features(df):
+
     # ------------------------------------------------------
     #  TEMPORAL FEATURES
     # ------------------------------------------------------
@@ -32,6 +42,10 @@ def build_features(df):
 
     # Salary week (1st 7 days)
     df["is_salary_week"] = (df["timestamp"].dt.day <= 7).astype(int)
+    return df
+
+
+def velocity_features(df):
 
     # ------------------------------------------------------
     #  TRANSACTION VELOCITY (FIXED VERSION)
@@ -50,7 +64,16 @@ def build_features(df):
 
     # Fill missing velocities
     df["txn_velocity_1h"] = df["txn_velocity_1h"].fillna(1)
+    return df
+
+
+def replay_features(df):
+    # Same sender, receiver, amount and device again within seconds
+    # (replayed or duplicated requests, see replay_features.py)
+    return add_recent_duplicate(df)
+
 
+def behavioral_features(df):
 
     # ------------------------------------------------------
     #  BEHAVIORAL FEATURES
@@ -77,8 +100,17 @@ def build_features(df):
         (df["amount"] - df["sender_mean_amt"]) /
         (df["sender_std_amt"] + 1e-5)
     )
+    return df
+
+
+def receiver_features(df):
+    # Inbound velocity, fan-in and amount stats per receiver over 1h/24h
+    # windows, where mule accounts show up (see receiver_features.py)
+    return add_receiver_features(df)
 
 
+def centrality_features(df):
+
     # ------------------------------------------------------
     #  GRAPH FEATURES
     # ------------------------------------------------------
@@ -101,8 +133,17 @@ def build_features(df):
     # Fill missing graph values
     df["sender_pagerank"] = df["sender_pagerank"].fillna(0)
     df["sender_degree"] = df["sender_degree"].fillna(0)
+    return df
+
+
+def fraud_ring_features(df):
+    # Fraud-ring structure: weak component size, k-core, reciprocity,
+    # 2-hop fan-out (vectorized over the edge list, see graph_features.py)
+    return add_sender_ring_features(df)
 
 
+def cross_state_flag(df):
+
     # ------------------------------------------------------
     #  CROSS-STATE FLAG
     # ------------------------------------------------------
@@ -111,7 +152,10 @@ def build_features(df):
         df["cross_state"] = (
             df["sender_state"] != df["receiver_state"]
         ).astype(int)
+    return df
+
 
+def encode_categoricals(df):
 
     # ------------------------------------------------------
     #  ENCODING CATEGORICAL FEATURES
@@ -131,13 +175,36 @@ def build_features(df):
     existing_cols = [col for col in categorical_cols if col in df.columns]
 
     df = pd.get_dummies(df, columns=existing_cols, drop_first=True)
+    return df
+
 
+def final_cleanup(df):
 
     # ------------------------------------------------------
     #  FINAL CLEANUP
     # ------------------------------------------------------
 
-    df = df.fillna(0)
+    return df.fillna(0)
+
+
+FEATURE_STAGES = [
+    ("clean",       clean),
+    ("temporal",    temporal_features),
+    ("velocity",    velocity_features),
+    ("replay",      replay_features),
+    ("behavioral",  behavioral_features),
+    ("receiver",    receiver_features),
+    ("graph",       centrality_features),
+    ("ring",        fraud_ring_features),
+    ("cross_state", cross_state_flag),
+    ("encode",      encode_categoricals),
+    ("fillna",      final_cleanup),
+]
+
+
+def build_features(df):
+    for _, stage in FEATURE_STAGES:
+        df = stage(df)
 
     print("Feature engineering completed.")
     print("Total Features:", len(df.columns))
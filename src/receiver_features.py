@@ -0,0 +1,104 @@
+"""
+Receiver-side (inbound) aggregates, where mule accounts show up.
+
+For every transaction, looking back from its timestamp at the receiver's
+inbound payments in the window (the transaction itself included, as in
+txn_velocity_1h):
+
+    receiver_txn_1h / _24h        inbound transactions (velocity)
+    receiver_senders_1h / _24h    distinct senders paying in (fan-in)
+    receiver_amt_mean_24h         mean inbound amount
+    receiver_amt_std_24h          sample std of inbound amounts (0 below 2)
+
+Everything is computed on integer-coded arrays sorted once by (receiver,
+time): window starts come from one searchsorted per window, sums from
+per-receiver cumulative sums, and distinct senders from a difference array
+over each payment's "still the latest from this sender" range. The API
+keeps the same windows online in api/receivers.py.
+"""
+import numpy as np
+import pandas as pd
+
+WINDOWS = {"1h": 3600, "24h": 86400}
+AMOUNT_WINDOW = "24h"
+
+RECEIVER_FEATURES = [
+    "receiver_txn_1h", "receiver_txn_24h",
+    "receiver_senders_1h", "receiver_senders_24h",
+    "receiver_amt_mean_24h", "receiver_amt_std_24h",
+]
+
+
+def _distinct_in_window(left, prev):
+    """
+    Distinct senders in rows [left[i], i] for every i (sorted order).
+
+    Row j counts for row i when j <= i, left[i] <= j and its previous
+    payment from the same sender lies before left[i]. `left` is
+    non-decreasing, so those i form one contiguous range per j.
+    """
+    n = len(left)
+    j = np.arange(n)
+    lo = np.maximum(np.searchsorted(left, prev, side="right"), j)
+    hi = np.searchsorted(left, j, side="right")  # exclusive
+    diff = np.bincount(lo, minlength=n + 1) - np.bincount(hi, minlength=n + 1)
+    return np.cumsum(diff[:n])
+
+
+def receiver_window_features(df) -> dict:
+    """RECEIVER_FEATURES as arrays aligned with the rows of `df`."""
+    n = len(df)
+    if n == 0:
+        return {name: np.zeros(0) for name in RECEIVER_FEATURES}
+
+    receiver = pd.factorize(df["receiver_id"].astype(str))[0].astype(np.int64)
+    sender = pd.factorize(df["sender_id"].astype(str))[0].astype(np.int64)
+    ms = pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    amount = pd.to_numeric(df["amount"], errors="coerce").fillna(0).to_numpy(dtype=np.float64)
+
+    order = np.lexsort((ms, receiver))
+    r, t, a = receiver[order], ms[order] - ms.min(), amount[order]
+    # one sorted key per row; receivers are spaced further apart than any window
+    span = int(t.max()) + max(WINDOWS.values()) * 1000 + 1
+    key = r * span + t
+    rows = np.arange(n)
+
+    # previous payment from the same sender to the same receiver (-1 if none)
+    pair = r * (int(sender.max()) + 1) + sender[order]
+    by_pair = np.argsort(pair, kind="stable")
+    prev = np.full(n, -1, dtype=np.int64)
+    same = pair[by_pair[1:]] == pair[by_pair[:-1]]
+    prev[by_pair[1:][same]] = by_pair[:-1][same]
+
+    sorted_out = {}
+    for name, seconds in WINDOWS.items():
+        left = np.searchsorted(key, key - seconds * 1000, side="right")
+        count = rows - left + 1
+        sorted_out[f"receiver_txn_{name}"] = count
+        sorted_out[f"receiver_senders_{name}"] = _distinct_in_window(left, prev)
+
+        if name == AMOUNT_WINDOW:
+            # per-receiver running sums keep float error to each account's own scale
+            groups = pd.Series(r)
+            cs = pd.Series(a).groupby(groups).cumsum().to_numpy()
+            cs2 = pd.Series(a * a).groupby(groups).cumsum().to_numpy()
+            before = left - 1
+            inside = (before >= 0) & (r[np.maximum(before, 0)] == r)
+            total = cs - np.where(inside, cs[np.maximum(before, 0)], 0.0)
+            total_sq = cs2 - np.where(inside, cs2[np.maximum(before, 0)], 0.0)
+            var = (total_sq - total * total / count) / np.maximum(count - 1, 1)
+            sorted_out[f"receiver_amt_mean_{name}"] = total / count
+            sorted_out[f"receiver_amt_std_{name}"] = np.where(count > 1, np.sqrt(np.clip(var, 0, None)), 0.0)
+
+    out = {}
+    for name in RECEIVER_FEATURES:
+        values = np.empty(n, dtype=sorted_out[name].dtype)
+        values[order] = sorted_out[name]
+        out[name] = values
+    return out
+
+
+def add_receiver_features(df):
+    for name, values in receiver_window_features(df).items():
+        df[name] = values
+    return df
@@ -0,0 +1,83 @@
+"""
+Replay / duplicate-transaction feature.
+
+A transaction is a `recent_duplicate` when an earlier one with the same
+fingerprint (sender, receiver, amount to the paisa, device type) happened
+at most WINDOW_SECONDS before it. A repeat of the same transaction_id is
+a retry, not a replay: it carries its first occurrence's flag. Offline this
+is exact: one sort by (fingerprint, timestamp) and a neighbour comparison.
+The API computes the
+same signal with rotating Bloom filters (api/replay.py), which need fixed
+memory but may report a rare false positive and look back up to one
+filter slice past the window.
+"""
+import numpy as np
+import pandas as pd
+
+WINDOW_SECONDS = 120
+
+
+def amount_paise(amount):
+    """Amounts as integer paise, so float noise never splits a fingerprint."""
+    return np.rint(np.asarray(amount, dtype=np.float64) * 100).astype(np.int64)
+
+
+def fingerprint(sender_id, receiver_id, amount, device_type) -> str:
+    """Key for one transaction; api/replay.py hashes exactly this string."""
+    return f"{sender_id}\x1f{receiver_id}\x1f{int(round(float(amount) * 100))}\x1f{device_type}"
+
+
+def seen_key(key, transaction_id) -> str:
+    """Key recording that `transaction_id` was seen with fingerprint `key`."""
+    return f"{key}\x1e{transaction_id}"
+
+
+def verdict_key(seen) -> str:
+    """Key recording that the `seen_key` transaction was flagged."""
+    return f"{seen}\x1edup"
+
+
+def fingerprints(df) -> list:
+    """`fingerprint` for every row of a frame."""
+    device = df["device_type"] if "device_type" in df.columns else pd.Series("", index=df.index)
+    return [
+        f"{s}\x1f{r}\x1f{p}\x1f{d}"
+        for s, r, p, d in zip(df["sender_id"].to_numpy(), df["receiver_id"].to_numpy(),
+                              amount_paise(df["amount"]), device.to_numpy())
+    ]
+
+
+def recent_duplicate(df, window_seconds=WINDOW_SECONDS) -> np.ndarray:
+    """1 where the same fingerprint occurred within the window before, else 0."""
+    if len(df) == 0:
+        return np.zeros(0, dtype=np.int8)
+    if "transaction_id" in df.columns:
+        retry = df["transaction_id"].duplicated().to_numpy()
+        if retry.any():
+            # flag first occurrences only; retries copy their first's flag
+            first = recent_duplicate(df[~retry], window_seconds)
+            by_id = pd.Series(first, index=df["transaction_id"][~retry].to_numpy())
+            return by_id.reindex(df["transaction_id"].to_numpy()).to_numpy(dtype=np.int8)
+    device = df["device_type"] if "device_type" in df.columns else pd.Series("", index=df.index)
+    keys = [
+        df["sender_id"].astype(str),
+        df["receiver_id"].astype(str),
+        pd.Series(amount_paise(df["amount"]), index=df.index),
+        device.astype(str),
+    ]
+    group = df.groupby(keys, sort=False).ngroup().to_numpy()
+    seconds = pd.to_datetime(df["timestamp"]).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+
+    order = np.lexsort((seconds, group))
+    g, t = group[order], seconds[order]
+    flag = np.zeros(len(df), dtype=np.int8)
+    flag[1:] = (g[1:] == g[:-1]) & (t[1:] - t[:-1] <= window_seconds)
+
+    out = np.empty_like(flag)
+    out[order] = flag
+    return out
+
+
+def add_recent_duplicate(df, window_seconds=WINDOW_SECONDS):
+    df["recent_duplicate"] = recent_duplicate(df, window_seconds)
+    return df
@@ -0,0 +1,370 @@
+"""
+Continuous NDJSON stream scorer.
+
+    reader ──▶ [raw_q] ──▶ parse + micro-batch ──▶ [batch_q] ──▶ features ──▶ [feature_q] ──▶ score + write
+
+Every queue is bounded, so a slow model backs pressure up to the reader
+instead of buffering the whole stream in memory. After each batch is
+written and flushed, the input byte offset is checkpointed; a restarted
+worker resumes from there (at-least-once: a crash between the flush and
+the checkpoint may re-emit one batch).
+
+Usage (from the repo root):
+    python src/stream_score.py --input data/stream.ndjson --output data/decisions.ndjson --follow
+    cat data/stream.ndjson | python src/stream_score.py --input - --output -
+"""
+import argparse
+import json
+import os
+import pickle
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+from api.graph import IncrementalComponents
+from api.receivers import ReceiverStore
+from api.replay import ReplayDetector
+from api.scoring import (
+    TransactionRequest, engineer_frame, enrich_frame, parse_timestamps, request_dict, score_frame
+)
+from src.sender_profiles import SenderProfileIndex
+
+_STOP = object()
+
+
+# ----------------------------------------------------------
+#  CHECKPOINTS
+# ----------------------------------------------------------
+
+def load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"offset": 0, "records": 0, "errors": 0}
+
+
+def save_checkpoint(path, state):
+    if not path:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ----------------------------------------------------------
+#  STREAM WORKER
+# ----------------------------------------------------------
+
+class StreamScorer:
+
+    def __init__(self, model, features, threshold, input_path, output,
+                 checkpoint_path=None, batch_size=256, max_wait_ms=50,
+                 queue_size=8, follow=False, poll_interval=0.2,
+                 report_interval=5.0, profiles=None, replay=None, receivers=None,
+                 components=None):
+        self.model = model
+        self.profiles = profiles
+        # the API's online stores, one set per worker; without them the
+        # replay, receiver and component-size features would score as defaults
+        self.replay = ReplayDetector() if replay is None else replay
+        self.receivers = ReceiverStore() if receivers is None else receivers
+        self.components = IncrementalComponents() if components is None else components
+        # windows run on event time, as in training; a late record counts
+        # at the latest time seen so far, since the windows only move forward
+        self._event_clock = -np.inf
+        self.features = features
+        self.threshold = threshold
+        self.input_path = input_path
+        self.output = output
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.follow = follow
+        self.poll_interval = poll_interval
+        self.report_interval = report_interval
+
+        # raw_q holds lines, the others hold whole batches
+        self.raw_q = queue.Queue(maxsize=batch_size * queue_size)
+        self.batch_q = queue.Queue(maxsize=queue_size)
+        self.feature_q = queue.Queue(maxsize=queue_size)
+
+        self.state = load_checkpoint(checkpoint_path)
+        self.stop_event = threading.Event()
+        self.error = None  # first exception raised by a stage thread
+        self.started_at = None
+        self._window_start = None
+        self._window_records = 0
+
+    # ── reader ────────────────────────────────────────────
+    def _put(self, q, item):
+        # blocking put that still notices shutdown
+        while not self.stop_event.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _finish(self, q):
+        # end-of-stream marker; always delivered, even after a stop, so the
+        # stages after this one drain and the main thread returns
+        q.put(_STOP)
+
+    def _read(self):
+        try:
+            if self.input_path == "-":
+                for line in sys.stdin.buffer:
+                    if not self._put(self.raw_q, (None, line)):
+                        return
+                return
+
+            with open(self.input_path, "rb") as f:
+                f.seek(self.state["offset"])
+                while not self.stop_event.is_set():
+                    pos = f.tell()
+                    line = f.readline()
+                    if not line or not line.endswith(b"\n"):
+                        # EOF or a partially written line
+                        if not self.follow:
+                            if line.strip():
+                                self._put(self.raw_q, (f.tell(), line))
+                            return
+                        f.seek(pos)
+                        time.sleep(self.poll_interval)
+                        continue
+                    if not self._put(self.raw_q, (f.tell(), line)):
+                        return
+        finally:
+            self._finish(self.raw_q)
+
+    # ── parse + micro-batch ───────────────────────────────
+    def _parse(self):
+        records, errors, offset = [], [], None
+        deadline = None
+
+        def flush():
+            nonlocal records, errors, deadline
+            if records or errors:
+                self._put(self.batch_q, (records, errors, offset))
+            records, errors, deadline = [], [], None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.raw_q.get(timeout=timeout)
+            except queue.Empty:
+                flush()
+                continue
+
+            if item is _STOP:
+                flush()
+                self._finish(self.batch_q)
+                return
+
+            line_offset, line = item
+            if line_offset is not None:
+                offset = line_offset
+            if deadline is None:
+                deadline = time.monotonic() + self.max_wait
+
+            line = line.strip()
+            if line:
+                record = None
+                try:
+                    record = json.loads(line)
+                    records.append(request_dict(TransactionRequest(**record)))
+                except Exception as e:
+                    txn_id = record.get("transaction_id") if isinstance(record, dict) else None
+                    errors.append({"transaction_id": txn_id, "error": str(e).splitlines()[0]})
+
+            if len(records) + len(errors) >= self.batch_size:
+                flush()
+
+    # ── feature engineering ───────────────────────────────
+    def _engineer(self):
+        while True:
+            item = self.batch_q.get()
+            if item is _STOP:
+                self._finish(self.feature_q)
+                return
+            records, errors, offset = item
+            X = duplicate = None
+            if records:
+                df = pd.DataFrame.from_records(records)
+                df = enrich_frame(
+                    df, self.components, self.replay, self.receivers, self.profiles,
+                    now=self._event_times(df)
+                )
+                duplicate = df["recent_duplicate"].to_numpy()
+                X = engineer_frame(df, self.features)
+            self._put(self.feature_q, (records, X, duplicate, errors, offset))
+
+    def _event_times(self, df):
+        """Record timestamps as epoch seconds, made non-decreasing."""
+        seconds = (parse_timestamps(df["timestamp"]) - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+        times = np.maximum.accumulate(np.maximum(seconds, self._event_clock))
+        self._event_clock = times[-1]
+        return times
+
+    # ── scoring + output ──────────────────────────────────
+    def _score(self):
+        while True:
+            item = self.feature_q.get()
+            if item is _STOP:
+                return
+            records, X, duplicate, errors, offset = item
+
+            decisions = []
+            if records:
+                decisions = score_frame(
+                    self.model, X,
+                    [r["transaction_id"] for r in records],
+                    self.threshold
+                )
+                for decision, dup in zip(decisions, duplicate):
+                    decision["recent_duplicate"] = bool(dup)
+
+            lines = [json.dumps(d) for d in decisions] + [json.dumps(e) for e in errors]
+            if lines:
+                self.output.write("\n".join(lines) + "\n")
+                self.output.flush()
+
+            self.state["records"] += len(decisions)
+            self.state["errors"] += len(errors)
+            if offset is not None:
+                self.state["offset"] = offset
+            save_checkpoint(self.checkpoint_path, self.state)
+
+            self._window_records += len(decisions) + len(errors)
+            self._report()
+
+    # ── throughput reporting ──────────────────────────────
+    def _report(self, final=False):
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if not final and elapsed < self.report_interval:
+            return
+        total = now - self.started_at
+        print(
+            f"[stream] {self._window_records / max(elapsed, 1e-9):,.0f} rec/s | "
+            f"total={self.state['records']:,} errors={self.state['errors']:,} | "
+            f"queues raw={self.raw_q.qsize()} batch={self.batch_q.qsize()} "
+            f"feature={self.feature_q.qsize()} | "
+            f"offset={self.state['offset']} | uptime={total:.1f}s",
+            file=sys.stderr, flush=True
+        )
+        self._window_start = now
+        self._window_records = 0
+
+    def _stage(self, target, downstream):
+        """
+        Thread body for one stage. If it raises, the error is kept for
+        run() to re-raise, the stages after it get _STOP so they drain and
+        finish, and the ones before it are stopped.
+        """
+        def body():
+            try:
+                target()
+            except BaseException as e:
+                if self.error is None:
+                    self.error = e
+                self._finish(downstream)
+                self.stop_event.set()
+        return body
+
+    def run(self):
+        """Run until the input ends; re-raises the first stage failure."""
+        self.started_at = self._window_start = time.monotonic()
+        workers = [
+            threading.Thread(target=self._stage(self._read, self.raw_q), name="stream-read", daemon=True),
+            threading.Thread(target=self._stage(self._parse, self.batch_q), name="stream-parse", daemon=True),
+            threading.Thread(target=self._stage(self._engineer, self.feature_q),
+                             name="stream-features", daemon=True),
+        ]
+        for t in workers:
+            t.start()
+        try:
+            self._score()
+        except KeyboardInterrupt:
+            self.stop_event.set()
+        except BaseException:
+            self.stop_event.set()
+            raise
+        self._report(final=True)
+        if self.error is not None:
+            # the failed batch was never checkpointed; a restart retries it
+            raise self.error
+        return self.state
+
+
+# ----------------------------------------------------------
+#  CLI
+# ----------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Score an NDJSON transaction stream")
+    parser.add_argument("--input", required=True, help="NDJSON file to tail, or - for stdin")
+    parser.add_argument("--output", default="-", help="output NDJSON file (appended), or - for stdout")
+    parser.add_argument("--checkpoint", default=None,
+                        help="offset checkpoint file (default: <output>.ckpt for file input)")
+    parser.add_argument("--follow", action="store_true", help="keep tailing the input at EOF")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=50)
+    parser.add_argument("--queue-size", type=int, default=8, help="max batches buffered per stage")
+    parser.add_argument("--report-interval", type=float, default=5.0)
+    parser.add_argument("--model", default=os.path.join(BASE_DIR, "model", "fraud_model.pkl"))
+    parser.add_argument("--features", default=os.path.join(BASE_DIR, "model", "feature_columns.pkl"))
+    parser.add_argument("--threshold", default=os.path.join(BASE_DIR, "model", "threshold.pkl"))
+    parser.add_argument("--profiles", default=os.path.join(BASE_DIR, "model", "sender_profiles.bin"),
+                        help="sender profile index used to fill missing fields (skipped if absent)")
+    parser.add_argument("--components", default=os.path.join(BASE_DIR, "model", "graph_components.bin"),
+                        help="training-graph components the online union-find starts from (skipped if absent)")
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint
+    if checkpoint is None and args.input != "-":
+        base = args.output if args.output != "-" else args.input
+        checkpoint = base + ".ckpt"
+
+    model = pickle.load(open(args.model, "rb"))
+    features = list(pickle.load(open(args.features, "rb")))
+    threshold = float(pickle.load(open(args.threshold, "rb"))) if os.path.exists(args.threshold) else 0.18
+    profiles = SenderProfileIndex(args.profiles) if os.path.exists(args.profiles) else None
+    components = IncrementalComponents(
+        SenderProfileIndex(args.components) if os.path.exists(args.components) else None
+    )
+
+    output = sys.stdout if args.output == "-" else open(args.output, "a")
+    try:
+        scorer = StreamScorer(
+            model, features, threshold,
+            input_path=args.input,
+            output=output,
+            checkpoint_path=checkpoint,
+            batch_size=args.batch_size,
+            max_wait_ms=args.max_wait_ms,
+            queue_size=args.queue_size,
+            follow=args.follow,
+            report_interval=args.report_interval,
+            profiles=profiles,
+            components=components,
+        )
+        scorer.run()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
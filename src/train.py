@@ -13,20 +13,16 @@ from sklearn.metrics import (
 )
 
 from preprocess import build_features
+from sender_profiles import export_sender_profiles
+from graph_features import export_components
+from drift import export_drift_reference
 
 
 # ----------------------------------------------------------
-# LOAD DATA
+# CONFIGURATION (shared with benchmarks/bench_pipeline.py)
 # ----------------------------------------------------------
 
-print("Loading dataset...")
-df = pd.read_csv("../data/upi_100k_ultra_realistic.csv")
-
-print("Building transaction graph...")
-df = build_features(df)
-print("Feature engineering completed.")
-
-drop_cols = [
+DROP_COLS = [
     "fraud_flag",
     "transaction_id",
     "timestamp",
@@ -34,50 +30,10 @@ drop_cols = [
     "receiver_id"
 ]
 
-X = df.drop(columns=[col for col in drop_cols if col in df.columns])
-y = df["fraud_flag"]
-
-print(f"Total Features: {X.shape[1]}")
-
-
-# ----------------------------------------------------------
-# TRAIN / VALIDATION / TEST SPLIT (NO LEAKAGE)
-# ----------------------------------------------------------
-
-X_temp, X_test, y_temp, y_test = train_test_split(
-    X, y,
-    test_size=0.2,
-    stratify=y,
-    random_state=42
-)
-
-X_train, X_val, y_train, y_val = train_test_split(
-    X_temp, y_temp,
-    test_size=0.2,
-    stratify=y_temp,
-    random_state=42
-)
+N_ESTIMATORS = 800
 
-print("Split completed:")
-print(f"Train size: {len(X_train)}")
-print(f"Validation size: {len(X_val)}")
-print(f"Test size: {len(X_test)}")
-
-
-# ----------------------------------------------------------
-# HANDLE IMBALANCE
-# ----------------------------------------------------------
-
-scale_pos_weight = (len(y_train) - sum(y_train)) / sum(y_train)
-print(f"Computed scale_pos_weight: {scale_pos_weight:.2f}")
-
-
-# ----------------------------------------------------------
-# MODEL CONFIGURATION
-# ----------------------------------------------------------
-
-model = xgb.XGBClassifier(
-    n_estimators=800,
+# Everything but n_estimators and scale_pos_weight (set from the training split)
+MODEL_PARAMS = dict(
     max_depth=10,
     learning_rate=0.02,
     min_child_weight=5,
@@ -86,24 +42,15 @@ model = xgb.XGBClassifier(
     colsample_bytree=0.9,
     reg_alpha=0.5,
     reg_lambda=1,
-    scale_pos_weight=scale_pos_weight,
     eval_metric="aucpr",
     random_state=42,
     n_jobs=-1
 )
 
-print("Training model...")
-model.fit(X_train, y_train)
-
-
-# ----------------------------------------------------------
-# THRESHOLD TUNING ON VALIDATION SET
-# ----------------------------------------------------------
-
+# Cost of a missed fraud vs. a false alarm, in ₹
 C_FN = 5000
 C_FP = 200
 
-val_proba = model.predict_proba(X_val)[:, 1]
 
 def find_best_threshold(y_true, y_prob):
     best_threshold = 0.5
@@ -121,57 +68,138 @@ def find_best_threshold(y_true, y_prob):
     return best_threshold, lowest_loss
 
 
-best_threshold, val_loss = find_best_threshold(y_val, val_proba)
+def main():
+    # ----------------------------------------------------------
+    # LOAD DATA
+    # ----------------------------------------------------------
 
-print(f"\nOptimal Threshold (Validation): {best_threshold:.2f}")
-print(f"Validation Financial Loss: ₹{val_loss:,}")
+    print("Loading dataset...")
+    raw = pd.read_csv("../data/upi_100k_ultra_realistic.csv")
 
+    print("Building transaction graph...")
+    df = build_features(raw)
+    print("Feature engineering completed.")
 
-# ----------------------------------------------------------
-# FINAL TEST EVALUATION (UNSEEN DATA)
-# ----------------------------------------------------------
+    X = df.drop(columns=[col for col in DROP_COLS if col in df.columns])
+    y = df["fraud_flag"]
 
-test_proba = model.predict_proba(X_test)[:, 1]
-test_pred = (test_proba >= best_threshold).astype(int)
+    print(f"Total Features: {X.shape[1]}")
 
-print("\n================ FINAL TEST EVALUATION ================\n")
 
-roc_auc = roc_auc_score(y_test, test_proba)
-pr_auc = average_precision_score(y_test, test_proba)
-accuracy = accuracy_score(y_test, test_pred)
+    # ----------------------------------------------------------
+    # TRAIN / VALIDATION / TEST SPLIT (NO LEAKAGE)
+    # ----------------------------------------------------------
 
-print(f"ROC-AUC Score       : {roc_auc:.4f}")
-print(f"PR-AUC Score        : {pr_auc:.4f}")
-print(f"Accuracy Score      : {accuracy:.4f}")
-print(f"Final Threshold     : {best_threshold:.2f}")
+    X_temp, X_test, y_temp, y_test = train_test_split(
+        X, y,
+        test_size=0.2,
+        stratify=y,
+        random_state=42
+    )
 
-print("\nClassification Report:\n")
-print(classification_report(y_test, test_pred))
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_temp, y_temp,
+        test_size=0.2,
+        stratify=y_temp,
+        random_state=42
+    )
 
-cm = confusion_matrix(y_test, test_pred)
-print("Confusion Matrix:")
-print(cm)
+    print("Split completed:")
+    print(f"Train size: {len(X_train)}")
+    print(f"Validation size: {len(X_val)}")
+    print(f"Test size: {len(X_test)}")
 
-tn, fp, fn, tp = cm.ravel()
 
-print("\nDetailed Breakdown:")
-print(f"True Negatives  : {tn}")
-print(f"False Positives : {fp}")
-print(f"False Negatives : {fn}")
-print(f"True Positives  : {tp}")
+    # ----------------------------------------------------------
+    # HANDLE IMBALANCE
+    # ----------------------------------------------------------
 
-financial_loss = (C_FN * fn) + (C_FP * fp)
-print(f"\nFinal Test Financial Loss: ₹{financial_loss:,}")
+    scale_pos_weight = (len(y_train) - sum(y_train)) / sum(y_train)
+    print(f"Computed scale_pos_weight: {scale_pos_weight:.2f}")
 
-print("\n========================================================\n")
 
+    # ----------------------------------------------------------
+    # MODEL CONFIGURATION
+    # ----------------------------------------------------------
 
-# ----------------------------------------------------------
-# SAVE MODEL + THRESHOLD
-# ----------------------------------------------------------
+    model = xgb.XGBClassifier(
+        n_estimators=N_ESTIMATORS,
+        scale_pos_weight=scale_pos_weight,
+        **MODEL_PARAMS
+    )
+
+    print("Training model...")
+    model.fit(X_train, y_train)
+
+
+    # ----------------------------------------------------------
+    # THRESHOLD TUNING ON VALIDATION SET
+    # ----------------------------------------------------------
+
+    val_proba = model.predict_proba(X_val)[:, 1]
+
+    best_threshold, val_loss = find_best_threshold(y_val, val_proba)
+
+    print(f"\nOptimal Threshold (Validation): {best_threshold:.2f}")
+    print(f"Validation Financial Loss: ₹{val_loss:,}")
+
+
+    # ----------------------------------------------------------
+    # FINAL TEST EVALUATION (UNSEEN DATA)
+    # ----------------------------------------------------------
+
+    test_proba = model.predict_proba(X_test)[:, 1]
+    test_pred = (test_proba >= best_threshold).astype(int)
+
+    print("\n================ FINAL TEST EVALUATION ================\n")
+
+    roc_auc = roc_auc_score(y_test, test_proba)
+    pr_auc = average_precision_score(y_test, test_proba)
+    accuracy = accuracy_score(y_test, test_pred)
+
+    print(f"ROC-AUC Score       : {roc_auc:.4f}")
+    print(f"PR-AUC Score        : {pr_auc:.4f}")
+    print(f"Accuracy Score      : {accuracy:.4f}")
+    print(f"Final Threshold     : {best_threshold:.2f}")
+
+    print("\nClassification Report:\n")
+    print(classification_report(y_test, test_pred))
+
+    cm = confusion_matrix(y_test, test_pred)
+    print("Confusion Matrix:")
+    print(cm)
+
+    tn, fp, fn, tp = cm.ravel()
+
+    print("\nDetailed Breakdown:")
+    print(f"True Negatives  : {tn}")
+    print(f"False Positives : {fp}")
+    print(f"False Negatives : {fn}")
+    print(f"True Positives  : {tp}")
+
+    financial_loss = (C_FN * fn) + (C_FP * fp)
+    print(f"\nFinal Test Financial Loss: ₹{financial_loss:,}")
+
+    print("\n========================================================\n")
+
+
+    # ----------------------------------------------------------
+    # SAVE MODEL + THRESHOLD
+    # ----------------------------------------------------------
+
+    pickle.dump(model, open("../model/fraud_model.pkl", "wb"))
+    pickle.dump(X.columns, open("../model/feature_columns.pkl", "wb"))
+    pickle.dump(best_threshold, open("../model/threshold.pkl", "wb"))
+
+    # Per-sender aggregates for the API to fill in missing request fields
+    export_sender_profiles(df, "../model/sender_profiles.bin")
+    export_components(df, "../model/graph_components.bin")
+
+    # Reference histograms for the API drift monitor (scores from the test set)
+    export_drift_reference(raw, df, test_proba, "../model/drift_reference.json")
+
+    print("Model, Features, Threshold Saved Successfully")
 
-pickle.dump(model, open("../model/fraud_model.pkl", "wb"))
-pickle.dump(X.columns, open("../model/feature_columns.pkl", "wb"))
-pickle.dump(best_threshold, open("../model/threshold.pkl", "wb"))
 
-print("Model, Features, Threshold Saved Successfully")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import pytest
+
+from api.admission import (
+    ADMIT, DEGRADE, FALLBACK_THRESHOLD, REJECT,
+    AdmissionController, fallback_decision, fallback_score,
+)
+
+
+def test_admits_below_limits():
+    ac = AdmissionController(max_inflight=2, hard_limit=4, concurrency=1, initial_service_ms=10)
+    assert ac.admit(deadline_ms=100) == ADMIT
+    assert ac.inflight == 1
+
+
+def test_degrades_at_soft_limit_and_rejects_at_hard_limit():
+    ac = AdmissionController(max_inflight=2, hard_limit=3, concurrency=1, initial_service_ms=1)
+    assert [ac.admit() for _ in range(2)] == [ADMIT, ADMIT]
+    assert ac.admit() == DEGRADE  # degraded requests do not queue
+    ac.inflight = 3
+    assert ac.admit() == REJECT
+    stats = ac.stats()
+    assert (stats["admitted"], stats["degraded"], stats["rejected"]) == (2, 1, 1)
+
+
+def test_rejects_expired_deadline():
+    ac = AdmissionController()
+    assert ac.admit(deadline_ms=0) == REJECT
+    assert ac.admit(deadline_ms=-5) == REJECT
+    assert ac.inflight == 0
+
+
+def test_degrades_when_estimate_exceeds_deadline():
+    ac = AdmissionController(max_inflight=100, hard_limit=200, concurrency=2, initial_service_ms=10)
+    for _ in range(4):
+        assert ac.admit() == ADMIT
+    # 4 in flight on 2 workers: two waves ahead plus our own
+    assert ac.estimate_ms() == pytest.approx(30)
+    assert ac.admit(deadline_ms=29) == DEGRADE
+    assert ac.admit(deadline_ms=30) == ADMIT
+
+
+def test_release_updates_service_time_ewma():
+    ac = AdmissionController(initial_service_ms=10, alpha=0.5)
+    ac.admit()
+    ac.release(service_ms=30)
+    assert ac.inflight == 0
+    assert ac.service_ms == pytest.approx(20)
+    ac.admit()
+    ac.release()  # no timing: estimate unchanged
+    assert ac.service_ms == pytest.approx(20)
+
+
+def base(**overrides):
+    data = {"transaction_id": "T1", "amount": 500.0, "account_age_days": 400,
+            "timestamp": "2024-03-15T14:00:00"}
+    data.update(overrides)
+    return data
+
+
+def test_fallback_needs_two_signals():
+    assert fallback_score(base()) == pytest.approx(0.05)
+    assert fallback_score(base(amount=60000)) < FALLBACK_THRESHOLD
+    assert fallback_score(base(amount=60000, account_age_days=5)) > FALLBACK_THRESHOLD
+
+
+@pytest.mark.parametrize("timestamp, night", [
+    ("2024-03-15T02:30:00", True),         # naive = IST wall clock
+    ("2024-03-15T02:30:00+05:30", True),
+    ("2024-03-14T21:00:00Z", True),        # 02:30 IST
+    ("2024-03-15T02:30:00Z", False),       # 08:00 IST
+    ("2024-03-15T06:00:00", False),
+    ("15/03/2024 02:30", False),           # not ISO-8601: no hour
+    (None, False),
+])
+def test_fallback_night_hour_is_ist(timestamp, night):
+    score = fallback_score(base(timestamp=timestamp))
+    assert score == pytest.approx(0.25 if night else 0.05)
+
+
+def test_fallback_decision_fields():
+    out = fallback_decision(base(amount=60000, account_age_days=5, timestamp="2024-03-15T03:00:00"))
+    assert out["decision"] == "Fraud"
+    assert out["risk_level"] == "High"
+    assert out["degraded"] is True
+    assert out["threshold_used"] == FALLBACK_THRESHOLD
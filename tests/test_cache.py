@@ -0,0 +1,165 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import api.cache
+from api.cache import ResultCache, payload_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual monotonic clock for the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(api.cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def blocking_compute(calls, release, value="v"):
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return value
+    return compute
+
+
+def test_payload_key_changes_with_body_only():
+    data = {"transaction_id": "T1", "amount": 100.0, "sender_id": "S1"}
+    assert payload_key(data) == payload_key(dict(reversed(list(data.items()))))
+    assert payload_key(data) != payload_key({**data, "amount": 100.5})
+    assert payload_key(data).startswith("T1:")
+
+
+def test_hit_after_miss():
+    cache = ResultCache(maxsize=10, ttl_seconds=60)
+    calls = []
+    compute = lambda: calls.append(1) or "v"
+
+    assert cache.get_or_compute("k", compute) == ("v", False)
+    assert cache.get_or_compute("k", compute) == ("v", True)
+    assert cache.peek("k") == "v"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 1)
+
+
+def test_single_flight_coalesces_concurrent_misses():
+    cache = ResultCache(maxsize=10, ttl_seconds=60)
+    calls, release = [], threading.Event()
+    compute = blocking_compute(calls, release)
+    results = []
+
+    def worker():
+        results.append(cache.get_or_compute("k", compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    wait_for(lambda: cache.stats()["coalesced"] == 7)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("v", False)] + [("v", True)] * 7
+    assert cache.stats()["misses"] == 1
+
+
+def test_single_flight_error_reaches_waiters_and_is_not_cached():
+    cache = ResultCache(maxsize=10, ttl_seconds=60)
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise ValueError("boom")
+
+    errors = []
+
+    def worker():
+        try:
+            cache.get_or_compute("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    wait_for(lambda: cache.stats()["coalesced"] == 2)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(errors) == 3
+    assert cache.peek("k") is None
+    assert cache.get_or_compute("k", lambda: "ok") == ("ok", False)
+
+
+def test_ttl_expiry(clock):
+    cache = ResultCache(maxsize=10, ttl_seconds=5)
+    cache.get_or_compute("k", lambda: "old")
+
+    clock[0] += 4.9
+    assert cache.get_or_compute("k", lambda: "new") == ("old", True)
+    clock[0] += 0.2
+    assert cache.peek("k") is None
+    assert cache.get_or_compute("k", lambda: "new") == ("new", False)
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = ResultCache(maxsize=2, ttl_seconds=60)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)  # a is now most recent
+    cache.get_or_compute("c", lambda: 3)
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 1
+    assert cache.peek("c") == 3
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"]) == (2, 1)
+
+
+def test_invalidate_drops_in_flight_result():
+    cache = ResultCache(maxsize=10, ttl_seconds=60)
+    calls, release = [], threading.Event()
+    results = []
+    owner = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("k", blocking_compute(calls, release, "stale")))
+    )
+    owner.start()
+    wait_for(lambda: calls)
+
+    cache.invalidate()  # e.g. a model reload while "k" is being scored
+    release.set()
+    owner.join(5)
+
+    assert results == [("stale", False)]
+    assert cache.peek("k") is None
+    assert cache.get_or_compute("k", lambda: "fresh") == ("fresh", False)
+    assert cache.stats()["generation"] == 1
+
+
+def test_invalidate_clears_stored_results():
+    cache = ResultCache(maxsize=10, ttl_seconds=60)
+    cache.get_or_compute("k", lambda: "v")
+    cache.invalidate()
+    assert cache.stats()["size"] == 0
+    assert cache.peek("k") is None
+
+
+def test_zero_maxsize_disables_caching():
+    cache = ResultCache(maxsize=0, ttl_seconds=60)
+    calls = []
+    compute = lambda: calls.append(1) or "v"
+    assert cache.get_or_compute("k", compute) == ("v", False)
+    assert cache.get_or_compute("k", compute) == ("v", False)
+    assert len(calls) == 2
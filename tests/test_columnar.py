@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from api.columnar import (
+    JSON, MSGPACK, REQUIRED_COLUMNS, BatchValidationError, UnsupportedFormat,
+    body_format, decode_batch, validate_batch,
+)
+from api.scoring import TransactionRequest
+
+ROW = {
+    "transaction_id": "TXN_001", "timestamp": "2024-03-15T14:30:00",
+    "sender_id": "USER_042", "receiver_id": "USER_899", "amount": 48500.0,
+    "transaction_type": "P2P", "merchant_category": "Food",
+    "sender_state": "Odisha", "receiver_state": "Maharashtra",
+    "sender_bank": "SBI", "receiver_bank": "HDFC",
+    "device_type": "Android", "network_type": "4G", "account_age_days": 45,
+}
+
+
+def batch(*overrides):
+    return pd.DataFrame([{**ROW, **o} for o in overrides])
+
+
+def test_valid_rows_have_no_errors():
+    df = batch({}, {"timestamp": "2024-03-15T09:00:00Z"}, {"timestamp": "2024-03-15 09:00:00+05:30"})
+    assert validate_batch(df).tolist() == [None, None, None]
+
+
+def test_missing_column_fails_the_batch():
+    with pytest.raises(BatchValidationError, match="account_age_days"):
+        validate_batch(batch({}).drop(columns=["account_age_days"]))
+
+
+CASES = [
+    ({"amount": 0}, "amount must be > 0"),
+    ({"amount": -5.0}, "amount must be > 0"),
+    ({"amount": float("inf")}, "amount must be finite"),
+    ({"amount": float("nan")}, "amount is required"),
+    ({"amount": "abc"}, "amount must be > 0"),
+    ({"account_age_days": -1}, "account_age_days must be >= 0"),
+    ({"account_age_days": None}, "account_age_days is required"),
+    ({"sender_id": None}, "sender_id is required"),
+    ({"timestamp": "15/03/2024 02:30"}, "timestamp is not a valid ISO-8601 datetime"),
+    ({"timestamp": "not a date"}, "timestamp is not a valid ISO-8601 datetime"),
+]
+
+
+@pytest.mark.parametrize("override, message", CASES)
+def test_row_errors(override, message):
+    errors = validate_batch(batch({}, override, {}))
+    assert errors.tolist() == [None, message, None]
+
+
+@pytest.mark.parametrize("override, message", CASES)
+def test_rows_rejected_by_the_request_model_too(override, message):
+    data = {**ROW, **override}
+    with pytest.raises(ValidationError):
+        TransactionRequest(**data)
+
+
+def test_first_error_per_row_wins():
+    errors = validate_batch(batch({"amount": -1, "account_age_days": -1, "timestamp": "x"}))
+    assert errors.tolist() == ["amount must be > 0"]
+
+
+def test_one_error_per_row_across_a_mixed_batch():
+    df = batch({}, {"amount": 0}, {}, {"timestamp": "bad"}, {"account_age_days": -3})
+    errors = validate_batch(df)
+    assert pd.isna(errors).tolist() == [True, False, True, False, False]
+    assert isinstance(errors, np.ndarray) and len(errors) == len(df)
+
+
+def test_decode_column_map_and_records():
+    records = [ROW, {**ROW, "transaction_id": "TXN_002"}]
+    columns = {c: [r[c] for r in records] for c in REQUIRED_COLUMNS}
+    for payload in (records, {"records": records}, columns):
+        df = decode_batch(json.dumps(payload).encode(), JSON)
+        assert df["transaction_id"].tolist() == ["TXN_001", "TXN_002"]
+    with pytest.raises(BatchValidationError):
+        decode_batch(b'"just a string"', JSON)
+
+
+def test_body_format():
+    assert body_format(None) == JSON
+    assert body_format("application/msgpack; charset=binary") == MSGPACK
+    with pytest.raises(UnsupportedFormat):
+        body_format("text/csv")
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from api.graph import IncrementalComponents
+from src.sender_profiles import SenderProfileIndex, hash_ids, write_profiles
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    """Training graph: {A, B, C} and {D, E}, in the exported components format."""
+    path = str(tmp_path / "graph_components.bin")
+    nodes = np.array(["A", "B", "C", "D", "E"], dtype=object)
+    write_profiles(path, hash_ids(nodes), {
+        "component": [0, 0, 0, 1, 1],
+        "component_size": [3, 3, 3, 2, 2],
+    }, dtype=np.int64)
+    return IncrementalComponents(SenderProfileIndex(path))
+
+
+def test_seed_sizes(seeded):
+    assert [seeded.component_size(n) for n in "ABCDE"] == [3, 3, 3, 2, 2]
+    assert seeded.component_size("Z") == 1
+
+
+def test_component_size_is_read_only(seeded):
+    for node in ["A", "Z", "Y"]:
+        seeded.component_size(node)
+    stats = seeded.stats()
+    assert (stats["new_nodes"], stats["touched_components"]) == (0, 0)
+
+
+def test_merge_seeded_components(seeded):
+    assert seeded.add_edge("A", "D") == 5
+    assert [seeded.component_size(n) for n in "ABCDE"] == [5] * 5
+    assert seeded.add_edge("B", "E") == 5  # already one component
+
+
+def test_merge_new_nodes_into_seed(seeded):
+    assert seeded.add_edge("X", "Y") == 2
+    assert seeded.component_size("Y") == 2
+    assert seeded.add_edge("Y", "C") == 5
+    assert seeded.component_size("X") == 5
+    assert seeded.component_size("D") == 2  # untouched
+    assert seeded.stats()["new_nodes"] == 2
+
+
+def test_chain_of_merges_without_seed():
+    components = IncrementalComponents()
+    sizes = [components.add_edge(f"N{i}", f"N{i + 1}") for i in range(10)]
+    assert sizes == list(range(2, 12))
+    assert components.component_size("N0") == 11
+    assert components.stats()["edges_seen"] == 10
+
+
+def test_new_node_cap_counts_singletons():
+    components = IncrementalComponents(max_new_nodes=2)
+    assert components.add_edge("N1", "N2") == 2
+    assert components.add_edge("N3", "N1") == 1   # sender past the cap
+    assert components.add_edge("N1", "N4") == 2   # receiver past the cap
+    assert components.component_size("N3") == 1
+    assert components.stats()["new_nodes"] == 2
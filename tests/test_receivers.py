@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.receivers import ReceiverStore
+from src.receiver_features import RECEIVER_FEATURES, receiver_window_features
+
+START = pd.Timestamp("2024-03-15 00:00:00")
+
+
+@pytest.fixture
+def payments():
+    """Two days of payments to a few receivers, in time order."""
+    rng = np.random.default_rng(7)
+    n = 400
+    seconds = np.cumsum(rng.integers(0, 900, n))
+    seconds[50] = seconds[49]                 # same-second payments
+    seconds[100:] += 3600 - (seconds[100] - seconds[99])  # an exact 1h gap
+    df = pd.DataFrame({
+        "receiver_id": [f"R{i}" for i in rng.integers(0, 5, n)],
+        "sender_id": [f"S{i}" for i in rng.integers(0, 12, n)],
+        "amount": np.round(rng.lognormal(7, 1.5, n), 2),
+        "seconds": seconds,
+    })
+    df["timestamp"] = START + pd.to_timedelta(df["seconds"], unit="s")
+    return df
+
+
+def test_online_matches_offline(payments):
+    offline = receiver_window_features(payments)
+    online = ReceiverStore().observe_frame(
+        payments, now=START.timestamp() + payments["seconds"].to_numpy(dtype=np.float64)
+    )
+    for name in RECEIVER_FEATURES:
+        np.testing.assert_allclose(online[name], offline[name], rtol=1e-9, atol=1e-6, err_msg=name)
+
+
+def test_windows_expire():
+    store = ReceiverStore()
+    store.observe("R1", "S1", 100.0, now=0)
+    store.observe("R1", "S2", 300.0, now=1800)
+    out = store.lookup("R1", now=3600)  # the first payment is exactly 1h old
+    assert (out["receiver_txn_1h"], out["receiver_senders_1h"]) == (1, 1)
+    assert (out["receiver_txn_24h"], out["receiver_senders_24h"]) == (2, 2)
+    assert out["receiver_amt_mean_24h"] == pytest.approx(200.0)
+    assert out["receiver_amt_std_24h"] == pytest.approx(np.std([100, 300], ddof=1))
+
+    out = store.lookup("R1", now=1800 + 86400)
+    assert out["receiver_txn_24h"] == 0
+    assert (out["receiver_amt_mean_24h"], out["receiver_amt_std_24h"]) == (0.0, 0.0)
+
+
+def test_lookup_records_nothing():
+    store = ReceiverStore()
+    assert store.lookup("R1", now=0) is None
+    store.observe("R1", "S1", 100.0, now=0)
+    store.lookup("R1", now=10)
+    assert store.observe("R1", "S1", 100.0, now=20)["receiver_txn_1h"] == 2
+    assert store.stats()["observed"] == 2
+
+
+def test_least_recently_paid_receivers_are_evicted():
+    store = ReceiverStore(max_receivers=2)
+    for t, receiver in enumerate(["R1", "R2", "R1", "R3"]):
+        store.observe(receiver, "S1", 10.0, now=t)
+    assert store.lookup("R2", now=5) is None
+    assert store.lookup("R1", now=5)["receiver_txn_1h"] == 2
+    assert store.stats()["evicted"] == 1
+
+
+def test_counts_saturate_at_max_events_per_receiver():
+    store = ReceiverStore(max_events_per_receiver=3)
+    for t in range(10):
+        out = store.observe("R1", f"S{t}", 10.0, now=t)
+    assert (out["receiver_txn_1h"], out["receiver_senders_24h"]) == (3, 3)
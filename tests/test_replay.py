@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.replay import ReplayDetector
+from src.replay_features import recent_duplicate
+
+PAYMENT = ("S1", "R1", 500.0, "Android")
+
+
+@pytest.fixture
+def detector():
+    # 120 s window in four 30 s slices; small filters keep the tests fast
+    return ReplayDetector(window_seconds=120, slices=4, capacity=10_000)
+
+
+def test_repeat_within_window_is_duplicate(detector):
+    assert not detector.check(*PAYMENT, now=0)
+    assert detector.check(*PAYMENT, now=100)
+    assert not detector.check("S1", "R1", 500.01, "Android", now=101)  # other amount
+    stats = detector.stats()
+    assert (stats["checked"], stats["duplicates"]) == (3, 1)
+
+
+def test_rotation_forgets_old_slices(detector):
+    memory = detector.stats()["memory_mb"]
+    detector.check(*PAYMENT, now=0)
+    # the filter for slice 0 stays live for 4 more slices, then is reused
+    assert detector.check(*PAYMENT, add=False, now=149)
+    assert not detector.check(*PAYMENT, add=False, now=150)
+    for t in range(150, 1500, 30):
+        detector.check("S9", "R9", t, "Android", now=t)
+    assert not detector.check(*PAYMENT, now=1500)
+    assert detector.stats()["memory_mb"] == memory
+
+
+def test_same_id_retry_gets_first_verdict(detector):
+    assert not detector.check(*PAYMENT, transaction_id="T1", now=0)
+    assert not detector.check(*PAYMENT, transaction_id="T1", now=5)   # retry, not a replay
+    assert detector.check(*PAYMENT, transaction_id="T2", now=10)      # replay under a new id
+    assert detector.check(*PAYMENT, transaction_id="T2", now=15)      # its retry stays flagged
+    assert not detector.check(*PAYMENT, transaction_id="T1", now=20)
+
+
+def test_add_false_records_and_counts_nothing(detector):
+    assert not detector.check(*PAYMENT, now=0, add=False)
+    assert not detector.check(*PAYMENT, now=1)
+    assert detector.stats()["checked"] == 1
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["transaction_id", "sender_id", "receiver_id", "amount",
+                                       "device_type", "seconds"])
+
+
+def test_check_frame_flags_rows_within_the_frame(detector):
+    df = frame([
+        ("T1", *PAYMENT, 0),
+        ("T2", *PAYMENT, 0),
+        ("T1", *PAYMENT, 0),      # retry of T1 in the same frame
+        ("T3", "S2", "R1", 500.0, "Android", 0),
+    ])
+    assert detector.check_frame(df, now=0).tolist() == [False, True, False, False]
+    assert detector.check_frame(df.iloc[[1]], now=1).tolist() == [True]
+
+
+def test_check_frame_matches_check(detector):
+    other = ReplayDetector(window_seconds=120, slices=4, capacity=10_000)
+    df = frame([("T1", *PAYMENT, 0), ("T2", *PAYMENT, 0), ("T2", *PAYMENT, 0)])
+    online = [other.check(*row[1:5], transaction_id=row[0], now=0) for row in df.itertuples(index=False)]
+    assert detector.check_frame(df, now=0).tolist() == online
+
+
+def test_event_time_frame_matches_offline_feature(detector):
+    start = pd.Timestamp("2024-03-15 09:00:00")
+    df = frame([
+        ("T1", *PAYMENT, 0),
+        ("T2", *PAYMENT, 60),                       # replay
+        ("T1", *PAYMENT, 90),                       # retry of T1: not a replay
+        ("T4", "S2", "R1", 500.0, "Android", 95),
+        ("T5", *PAYMENT, 86_400),                   # a day later
+        ("T6", *PAYMENT, 2 * 86_400),
+        ("T7", *PAYMENT, 2 * 86_400 + 119),         # replay
+    ])
+    df["timestamp"] = start + pd.to_timedelta(df["seconds"], unit="s")
+    now = start.timestamp() + df["seconds"].to_numpy(dtype=np.float64)
+
+    offline = recent_duplicate(df, window_seconds=120)
+    online = detector.check_frame(df, now=now)
+    assert offline.tolist() == [0, 1, 0, 0, 0, 0, 1]
+    assert online.astype(int).tolist() == offline.tolist()
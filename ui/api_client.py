@@ -0,0 +1,117 @@
+"""
+Shared HTTP client for the Streamlit pages.
+
+Streamlit re-runs the whole script on every interaction, so a bare
+`requests.get` opens a new connection each time. The session below is
+created once per process (`st.cache_resource`) and keeps a pool of
+keep-alive connections; read-only monitoring calls are additionally
+cached for a few seconds (`st.cache_data`) so a burst of reruns costs
+one API call.
+"""
+import io
+import time
+
+import pandas as pd
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE = st.secrets.get("API_BASE", "http://127.0.0.1:8000")
+
+HEALTH_TIMEOUT  = 0.5   # seconds; the header must never block a rerun
+MONITOR_TIMEOUT = 3
+PREDICT_TIMEOUT = 10
+BATCH_TIMEOUT   = 120
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+@st.cache_resource
+def session(pool_size: int = 32) -> requests.Session:
+    s = requests.Session()
+    # retry only idempotent reads; a retried POST could log a decision twice
+    retry = Retry(total=2, backoff_factor=0.1, status_forcelist=(502, 503, 504),
+                  allowed_methods=frozenset({"GET"}))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+
+def _get(path: str, timeout: float, **params):
+    r = session().get(f"{API_BASE}{path}", params=params or None, timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def health():
+    """`/health` payload, or None when the API is down or still loading."""
+    try:
+        data = _get("/health", HEALTH_TIMEOUT)
+    except Exception:
+        return None
+    # the API answers /health while the model is still loading
+    return data if data.get("model_loaded", True) else None
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def rollups(minutes: int = 60, step: int = 1):
+    """Pre-aggregated per-minute rollups, or None if unavailable."""
+    try:
+        return _get("/rollups", MONITOR_TIMEOUT, minutes=minutes, step=step)
+    except Exception:
+        return None
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def recent_decisions(limit: int = 20):
+    try:
+        return _get("/decisions/recent", MONITOR_TIMEOUT, limit=limit)
+    except Exception:
+        return None
+
+
+def predict(payload: dict) -> dict:
+    r = session().post(f"{API_BASE}/predict", json=payload, timeout=PREDICT_TIMEOUT)
+    r.raise_for_status()
+    return r.json()
+
+
+# Worker threads have no Streamlit script context, so the helpers below
+# take the session from the caller instead of calling `session()` there.
+def timed_post(s: requests.Session, path: str, **kwargs):
+    """POST for load generation; returns (status code or 0 on error, latency ms)."""
+    start = time.perf_counter()
+    try:
+        status = s.post(f"{API_BASE}{path}", timeout=PREDICT_TIMEOUT, **kwargs).status_code
+    except requests.RequestException:
+        status = 0
+    return status, (time.perf_counter() - start) * 1000
+
+
+# ── Batch scoring ─────────────────────────────────────────
+def encode_frame(df: pd.DataFrame):
+    """Arrow IPC body when pyarrow is installed, JSON records otherwise."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return df.to_json(orient="records").encode(), "application/json"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue(), ARROW_STREAM
+
+
+def score_batch(s: requests.Session, body: bytes, content_type: str) -> pd.DataFrame:
+    """Score one encoded batch through /predict/batch; result columns as a frame."""
+    r = s.post(f"{API_BASE}/predict/batch", data=body,
+               headers={"content-type": content_type}, timeout=BATCH_TIMEOUT)
+    r.raise_for_status()
+    if r.headers.get("content-type", "").startswith(ARROW_STREAM):
+        import pyarrow as pa
+        with pa.ipc.open_stream(pa.BufferReader(r.content)) as reader:
+            return reader.read_all().to_pandas()
+    return pd.DataFrame(r.json())
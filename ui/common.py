@@ -0,0 +1,247 @@
+"""
+Theme, dataset-aligned constants and small helpers shared by the
+dashboard and its pages (Streamlit runs each page as its own script).
+"""
+import uuid
+
+import numpy as np
+import streamlit as st
+
+# ── Constants (dataset-aligned) ───────────────────────────
+STATES    = ["Delhi","Maharashtra","Karnataka","Tamil Nadu","Gujarat",
+             "Uttar Pradesh","Telangana","West Bengal","Rajasthan","Odisha"]
+BANKS     = ["SBI","HDFC","ICICI","Axis","PNB","Bank of Baroda","Kotak","IndusInd","Yes Bank"]
+MERCHANTS = ["Grocery","Retail","Travel","Entertainment","Food",
+             "Bills","Utilities","Healthcare","Shopping","Fuel","Education","Transport","Other"]
+DEVICES   = ["Android","iOS","Web"]
+NETWORKS  = ["4G","5G","WiFi"]
+TXN_TYPES = ["P2P","P2M"]
+
+# ── Theme ─────────────────────────────────────────────────
+CSS = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Space+Mono:wght@400;700&family=DM+Sans:wght@300;400;500;600&display=swap');
+
+:root {
+    --bg:       #0a0e17;
+    --panel:    #111827;
+    --border:   #1e2d40;
+    --accent:   #00d4ff;
+    --danger:   #ff3b5c;
+    --safe:     #00e5a0;
+    --warn:     #ffaa00;
+    --text:     #e2e8f0;
+    --muted:    #64748b;
+}
+
+html, body, [class*="css"] {
+    font-family: 'DM Sans', sans-serif;
+    background-color: var(--bg) !important;
+    color: var(--text);
+}
+
+.stApp { background: var(--bg); }
+
+h1, h2, h3 { font-family: 'Space Mono', monospace; }
+
+/* Top header bar */
+.header-bar {
+    background: linear-gradient(135deg, #0a0e17 0%, #0d1b2a 100%);
+    border-bottom: 1px solid var(--border);
+    padding: 1.2rem 2rem;
+    display: flex;
+    align-items: center;
+    gap: 1rem;
+    margin-bottom: 1.5rem;
+}
+.header-title {
+    font-family: 'Space Mono', monospace;
+    font-size: 1.4rem;
+    font-weight: 700;
+    color: var(--accent);
+    letter-spacing: 0.05em;
+}
+.header-sub {
+    font-size: 0.75rem;
+    color: var(--muted);
+    letter-spacing: 0.08em;
+    text-transform: uppercase;
+}
+
+/* Card panels */
+.card {
+    background: var(--panel);
+    border: 1px solid var(--border);
+    border-radius: 10px;
+    padding: 1.4rem 1.6rem;
+    margin-bottom: 1rem;
+}
+.card-title {
+    font-family: 'Space Mono', monospace;
+    font-size: 0.7rem;
+    color: var(--muted);
+    text-transform: uppercase;
+    letter-spacing: 0.12em;
+    margin-bottom: 0.8rem;
+}
+
+/* Result verdict box */
+.verdict-fraud {
+    background: linear-gradient(135deg, rgba(255,59,92,0.15), rgba(255,59,92,0.05));
+    border: 1px solid var(--danger);
+    border-radius: 12px;
+    padding: 1.5rem;
+    text-align: center;
+}
+.verdict-safe {
+    background: linear-gradient(135deg, rgba(0,229,160,0.12), rgba(0,229,160,0.04));
+    border: 1px solid var(--safe);
+    border-radius: 12px;
+    padding: 1.5rem;
+    text-align: center;
+}
+.verdict-label {
+    font-family: 'Space Mono', monospace;
+    font-size: 2rem;
+    font-weight: 700;
+    letter-spacing: 0.1em;
+}
+.verdict-sub {
+    font-size: 0.8rem;
+    color: var(--muted);
+    margin-top: 0.3rem;
+}
+
+/* Metric chips */
+.metric-chip {
+    background: rgba(0,212,255,0.08);
+    border: 1px solid rgba(0,212,255,0.2);
+    border-radius: 6px;
+    padding: 0.6rem 1rem;
+    display: inline-block;
+    font-family: 'Space Mono', monospace;
+    font-size: 0.85rem;
+}
+
+/* API status badge */
+.status-online  { color: var(--safe);   font-size: 0.75rem; }
+.status-offline { color: var(--danger); font-size: 0.75rem; }
+
+/* Risk bar */
+.risk-bar-bg {
+    background: var(--border);
+    border-radius: 4px;
+    height: 8px;
+    overflow: hidden;
+    margin: 0.4rem 0;
+}
+
+/* History table */
+.hist-row-fraud { color: var(--danger); }
+.hist-row-safe  { color: var(--safe); }
+
+/* Streamlit widget overrides */
+.stSelectbox > div > div,
+.stNumberInput > div > div > input,
+.stSlider > div { color: var(--text) !important; }
+
+div[data-testid="stForm"] { background: transparent; }
+
+.stButton > button {
+    background: linear-gradient(135deg, #0066cc, #00aaff) !important;
+    border: none !important;
+    color: white !important;
+    font-family: 'Space Mono', monospace !important;
+    font-size: 0.85rem !important;
+    letter-spacing: 0.08em !important;
+    padding: 0.75rem 1.5rem !important;
+    border-radius: 8px !important;
+    width: 100%;
+    transition: opacity 0.2s;
+}
+.stButton > button:hover { opacity: 0.85 !important; }
+
+hr { border-color: var(--border) !important; }
+</style>
+"""
+
+
+def apply_theme():
+    st.markdown(CSS, unsafe_allow_html=True)
+
+
+def header(subtitle="Graph-Aware · Cost-Sensitive · XGBoost · Real-Time Fraud Detection"):
+    st.markdown(f"""
+<div class="header-bar">
+  <span style="font-size:1.8rem">🛡</span>
+  <div>
+    <div class="header-title">UPI-GUARD++</div>
+    <div class="header-sub">{subtitle}</div>
+  </div>
+</div>
+""", unsafe_allow_html=True)
+
+
+def status_line(health_data):
+    if health_data:
+        html = (
+            f'<span class="status-online">● API ONLINE &nbsp;|&nbsp; '
+            f'threshold={health_data.get("threshold", "?")} &nbsp;|&nbsp; '
+            f'features={health_data.get("feature_count", health_data.get("features", "?"))}</span>'
+        )
+    else:
+        html = '<span class="status-offline">⚠ API OFFLINE — start uvicorn before classifying</span>'
+    st.markdown(html, unsafe_allow_html=True)
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+def style_chart(fig, title=None, height=220, yrange=None):
+    """Dark, compact layout used by every chart."""
+    fig.update_layout(
+        title={"text": title, "font": {"size": 11, "color": "#64748b", "family": "Space Mono"}} if title else None,
+        height=height,
+        margin=dict(l=0, r=0, t=30 if title else 10, b=0),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font={"color": "#e2e8f0", "size": 10},
+        xaxis=dict(gridcolor="#1e2d40"),
+        yaxis=dict(gridcolor="#1e2d40", range=yrange),
+        legend=dict(orientation="h", y=1.15, x=1, xanchor="right"),
+    )
+    return fig
+
+
+# ── Synthetic traffic ─────────────────────────────────────
+def synthetic_payloads(n, seed=None, senders=5000):
+    """
+    Valid /predict payloads drawn from the dataset's categories. Ids are
+    prefixed with a fresh run tag so the API's result cache never hits.
+    """
+    rng = np.random.default_rng(seed)
+    run = uuid.uuid4().hex[:6]
+    amounts = np.round(rng.lognormal(8, 1.2, n), 2)
+    ages    = rng.integers(0, 3000, n)
+    users   = rng.integers(0, senders, (n, 2))
+    picks   = {name: rng.integers(0, len(values), n) for name, values in [
+        ("state_s", STATES), ("state_r", STATES), ("bank_s", BANKS), ("bank_r", BANKS),
+        ("merchant", MERCHANTS), ("device", DEVICES), ("network", NETWORKS), ("type", TXN_TYPES),
+    ]}
+    return [
+        {
+            "transaction_id":    f"LOAD_{run}_{i}",
+            "timestamp":         f"2024-03-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00",
+            "sender_id":         f"USER_{users[i, 0]}",
+            "receiver_id":       f"USER_{users[i, 1]}",
+            "amount":            float(amounts[i]),
+            "transaction_type":  TXN_TYPES[picks["type"][i]],
+            "merchant_category": MERCHANTS[picks["merchant"][i]],
+            "sender_state":      STATES[picks["state_s"][i]],
+            "receiver_state":    STATES[picks["state_r"][i]],
+            "sender_bank":       BANKS[picks["bank_s"][i]],
+            "receiver_bank":     BANKS[picks["bank_r"][i]],
+            "device_type":       DEVICES[picks["device"][i]],
+            "network_type":      NETWORKS[picks["network"][i]],
+            "account_age_days":  int(ages[i]),
+        }
+        for i in range(n)
+    ]
@@ -7,6 +7,12 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 
+import api_client as api
+from common import (
+    STATES, BANKS, MERCHANTS, DEVICES, NETWORKS, TXN_TYPES,
+    apply_theme, header, status_line, style_chart
+)
+
 # ── Page config ───────────────────────────────────────────
 st.set_page_config(
     page_title="UPI-Guard++",
@@ -15,168 +21,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# ── Custom CSS ────────────────────────────────────────────
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Space+Mono:wght@400;700&family=DM+Sans:wght@300;400;500;600&display=swap');
-
-:root {
-    --bg:       #0a0e17;
-    --panel:    #111827;
-    --border:   #1e2d40;
-    --accent:   #00d4ff;
-    --danger:   #ff3b5c;
-    --safe:     #00e5a0;
-    --warn:     #ffaa00;
-    --text:     #e2e8f0;
-    --muted:    #64748b;
-}
-
-html, body, [class*="css"] {
-    font-family: 'DM Sans', sans-serif;
-    background-color: var(--bg) !important;
-    color: var(--text);
-}
-
-.stApp { background: var(--bg); }
-
-h1, h2, h3 { font-family: 'Space Mono', monospace; }
-
-/* Top header bar */
-.header-bar {
-    background: linear-gradient(135deg, #0a0e17 0%, #0d1b2a 100%);
-    border-bottom: 1px solid var(--border);
-    padding: 1.2rem 2rem;
-    display: flex;
-    align-items: center;
-    gap: 1rem;
-    margin-bottom: 1.5rem;
-}
-.header-title {
-    font-family: 'Space Mono', monospace;
-    font-size: 1.4rem;
-    font-weight: 700;
-    color: var(--accent);
-    letter-spacing: 0.05em;
-}
-.header-sub {
-    font-size: 0.75rem;
-    color: var(--muted);
-    letter-spacing: 0.08em;
-    text-transform: uppercase;
-}
-
-/* Card panels */
-.card {
-    background: var(--panel);
-    border: 1px solid var(--border);
-    border-radius: 10px;
-    padding: 1.4rem 1.6rem;
-    margin-bottom: 1rem;
-}
-.card-title {
-    font-family: 'Space Mono', monospace;
-    font-size: 0.7rem;
-    color: var(--muted);
-    text-transform: uppercase;
-    letter-spacing: 0.12em;
-    margin-bottom: 0.8rem;
-}
-
-/* Result verdict box */
-.verdict-fraud {
-    background: linear-gradient(135deg, rgba(255,59,92,0.15), rgba(255,59,92,0.05));
-    border: 1px solid var(--danger);
-    border-radius: 12px;
-    padding: 1.5rem;
-    text-align: center;
-}
-.verdict-safe {
-    background: linear-gradient(135deg, rgba(0,229,160,0.12), rgba(0,229,160,0.04));
-    border: 1px solid var(--safe);
-    border-radius: 12px;
-    padding: 1.5rem;
-    text-align: center;
-}
-.verdict-label {
-    font-family: 'Space Mono', monospace;
-    font-size: 2rem;
-    font-weight: 700;
-    letter-spacing: 0.1em;
-}
-.verdict-sub {
-    font-size: 0.8rem;
-    color: var(--muted);
-    margin-top: 0.3rem;
-}
-
-/* Metric chips */
-.metric-chip {
-    background: rgba(0,212,255,0.08);
-    border: 1px solid rgba(0,212,255,0.2);
-    border-radius: 6px;
-    padding: 0.6rem 1rem;
-    display: inline-block;
-    font-family: 'Space Mono', monospace;
-    font-size: 0.85rem;
-}
-
-/* API status badge */
-.status-online  { color: var(--safe);   font-size: 0.75rem; }
-.status-offline { color: var(--danger); font-size: 0.75rem; }
-
-/* Risk bar */
-.risk-bar-bg {
-    background: var(--border);
-    border-radius: 4px;
-    height: 8px;
-    overflow: hidden;
-    margin: 0.4rem 0;
-}
-
-/* History table */
-.hist-row-fraud { color: var(--danger); }
-.hist-row-safe  { color: var(--safe); }
-
-/* Streamlit widget overrides */
-.stSelectbox > div > div,
-.stNumberInput > div > div > input,
-.stSlider > div { color: var(--text) !important; }
-
-div[data-testid="stForm"] { background: transparent; }
-
-.stButton > button {
-    background: linear-gradient(135deg, #0066cc, #00aaff) !important;
-    border: none !important;
-    color: white !important;
-    font-family: 'Space Mono', monospace !important;
-    font-size: 0.85rem !important;
-    letter-spacing: 0.08em !important;
-    padding: 0.75rem 1.5rem !important;
-    border-radius: 8px !important;
-    width: 100%;
-    transition: opacity 0.2s;
-}
-.stButton > button:hover { opacity: 0.85 !important; }
-
-hr { border-color: var(--border) !important; }
-</style>
-""", unsafe_allow_html=True)
-
-# ── Constants (dataset-aligned) ───────────────────────────
-API_BASE = st.secrets.get(
-    "API_BASE",
-    "http://127.0.0.1:8000"
-)
-
-STATES    = ["Delhi","Maharashtra","Karnataka","Tamil Nadu","Gujarat",
-             "Uttar Pradesh","Telangana","West Bengal","Rajasthan","Odisha"]
-BANKS     = ["SBI","HDFC","ICICI","Axis","PNB","Bank of Baroda","Kotak","IndusInd","Yes Bank"]
-MERCHANTS = ["Grocery","Retail","Travel","Entertainment","Food",
-             "Bills","Utilities","Healthcare","Shopping","Fuel","Education","Transport","Other"]
-DEVICES   = ["Android","iOS","Web"]
-NETWORKS  = ["4G","5G","WiFi"]
-TXN_TYPES = ["P2P","P2M"]
+# ── Theme ─────────────────────────────────────────────────
+apply_theme()
 
 # ── Session state ─────────────────────────────────────────
 for k, v in [
@@ -189,39 +35,15 @@ for k, v in [
 
 # ── API health probe ──────────────────────────────────────
 def check_api():
-    try:
-        r = requests.get(f"{API_BASE}/health", timeout=2)
-        if r.status_code == 200:
-            st.session_state.api_ok = True
-            return r.json()
-    except Exception:
-        pass
-    st.session_state.api_ok = False
-    return None
+    data = api.health()  # pooled session, cached for a few seconds
+    st.session_state.api_ok = data is not None
+    return data
 
 health_data = check_api()
 
 # ── Header ────────────────────────────────────────────────
-st.markdown("""
-<div class="header-bar">
-  <span style="font-size:1.8rem">🛡</span>
-  <div>
-    <div class="header-title">UPI-GUARD++</div>
-    <div class="header-sub">Graph-Aware · Cost-Sensitive · XGBoost · Real-Time Fraud Detection</div>
-  </div>
-</div>
-""", unsafe_allow_html=True)
-
-if st.session_state.api_ok and health_data:
-    api_status_html = (
-        f'<span class="status-online">● API ONLINE &nbsp;|&nbsp; '
-        f'threshold={health_data.get("threshold", "?")} &nbsp;|&nbsp; '
-        f'features={health_data.get("feature_count", health_data.get("features", "?"))}</span>'
-    )
-else:
-    api_status_html = '<span class="status-offline">⚠ API OFFLINE — start uvicorn before classifying</span>'
-st.markdown(api_status_html, unsafe_allow_html=True)
-st.markdown("<br>", unsafe_allow_html=True)
+header()
+status_line(health_data)
 
 # ══════════════════════════════════════════════════════════
 # LAYOUT
@@ -370,9 +192,7 @@ if run:
 
         with st.spinner("Classifying via XGBoost model…"):
             try:
-                resp = requests.post(f"{API_BASE}/predict", json=payload, timeout=10)
-                resp.raise_for_status()
-                result = resp.json()
+                result = api.predict(payload)
                 result["_payload"] = payload
                 st.session_state.result = result
 
@@ -386,6 +206,8 @@ if run:
                     "time":  timestamp.strftime("%H:%M:%S"),
                 })
                 st.session_state.history = st.session_state.history[:20]
+                api.recent_decisions.clear()
+                api.rollups.clear()
             except requests.exceptions.ConnectionError:
                 st.error("Cannot reach API. Make sure FastAPI is running on port 8000.")
             except Exception as e:
@@ -486,10 +308,23 @@ with right:
             st.json(payload_display)
 
     # ── History ───────────────────────────────────────────
+    # Server-side decision log when available (survives refreshes and
+    # covers every client), otherwise this session's own results.
     st.divider()
-    st.markdown('<div class="card-title">📋 Session History</div>', unsafe_allow_html=True)
-
-    hist = st.session_state.history
+    recent = api.recent_decisions(20) if st.session_state.api_ok else None
+    if recent:
+        st.markdown('<div class="card-title">📋 Recent Decisions (all clients)</div>', unsafe_allow_html=True)
+        hist = [{
+            "id":   r["transaction_id"],
+            "amt":  f"₹{r['amount']:,.0f}" if r["amount"] is not None else "—",
+            "prob": r["fraud_probability"],
+            "dec":  r["decision"],
+            "risk": r["risk_level"],
+            "time": datetime.fromtimestamp(r["ts"]).strftime("%H:%M:%S"),
+        } for r in recent]
+    else:
+        st.markdown('<div class="card-title">📋 Session History</div>', unsafe_allow_html=True)
+        hist = st.session_state.history
     if not hist:
         st.caption("No transactions classified yet.")
     else:
@@ -535,6 +370,62 @@ with right:
             )
             st.plotly_chart(fig2, width='stretch')
 
-        if st.button("🗑  Clear History", width='content'):
+        if not recent and st.button("🗑  Clear History", width='content'):
             st.session_state.history = []
-            st.rerun()
\ No newline at end of file
+            st.rerun()
+
+
+# ══════════════════════════════════════════════════════════
+# MONITORING — per-minute rollups from the decision log
+# ══════════════════════════════════════════════════════════
+def _line(df, columns, title, names, colors, yrange=None):
+    fig = go.Figure()
+    for col, name, color in zip(columns, names, colors):
+        fig.add_trace(go.Scatter(x=df["time"], y=df[col], name=name, mode="lines",
+                                 line={"color": color, "width": 1.6}))
+    return style_chart(fig, title, yrange=yrange)
+
+st.divider()
+st.markdown('<div class="card-title">📈 Live Monitoring</div>', unsafe_allow_html=True)
+
+WINDOWS = {"Last hour": (60, 1), "Last 6 hours": (360, 5), "Last 24 hours": (1440, 15),
+           "Last 7 days": (10080, 60)}
+window = st.radio("Window", list(WINDOWS), horizontal=True, label_visibility="collapsed")
+minutes, step = WINDOWS[window]
+roll = api.rollups(minutes, step) if st.session_state.api_ok else None
+
+if roll is None:
+    st.caption("Monitoring needs the API with its decision log enabled.")
+elif not roll["rows"]:
+    st.caption("No decisions logged in this window yet.")
+else:
+    total = roll["total"]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Scored",        f"{total['count']:,}")
+    c2.metric("Fraud rate",    f"{total['fraud_rate'] * 100:.2f}%")
+    c3.metric("Latency p99",   f"{total['latency_p99_ms']} ms")
+    c4.metric("Degraded",      f"{total['degraded']:,}")
+
+    df_roll = pd.DataFrame(roll["rows"])
+    df_roll["time"] = pd.to_datetime(df_roll["minute"] * 60, unit="s")
+    df_roll["fraud_pct"] = df_roll["fraud_rate"] * 100
+
+    c1, c2 = st.columns(2)
+    with c1:
+        fig_v = px.bar(df_roll, x="time", y="count", labels={"time": "", "count": "Transactions"})
+        fig_v.update_traces(marker_color="#00d4ff")
+        style_chart(fig_v, f"VOLUME / {step} MIN")
+        st.plotly_chart(fig_v, width='stretch')
+    with c2:
+        st.plotly_chart(_line(df_roll, ["fraud_pct"], "FRAUD RATE (%)", ["fraud rate"], ["#ff3b5c"]),
+                        width='stretch')
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.plotly_chart(_line(df_roll, ["score_p50", "score_p99"], "SCORE PERCENTILES",
+                              ["p50", "p99"], ["#00e5a0", "#ffaa00"], yrange=[0, 1]),
+                        width='stretch')
+    with c2:
+        st.plotly_chart(_line(df_roll, ["latency_p50_ms", "latency_p99_ms"], "LATENCY (ms)",
+                              ["p50", "p99"], ["#00d4ff", "#ff3b5c"]),
+                        width='stretch')
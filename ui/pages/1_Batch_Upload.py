@@ -0,0 +1,108 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import api_client as api
+from common import apply_theme, header, status_line, style_chart
+
+# ── Page config ───────────────────────────────────────────
+st.set_page_config(page_title="UPI-Guard++ · Batch", page_icon="🛡", layout="wide")
+apply_theme()
+header("Batch Upload · Columnar Scoring")
+health_data = api.health()
+status_line(health_data)
+
+ID_COLUMNS = {"transaction_id": str, "sender_id": str, "receiver_id": str}
+
+# ── Controls ──────────────────────────────────────────────
+st.markdown('<div class="card-title">📤 Transactions CSV</div>', unsafe_allow_html=True)
+uploaded = st.file_uploader("CSV", type=["csv"], label_visibility="collapsed",
+                            help="Same columns as the training data (or the /predict payload)")
+c1, c2 = st.columns(2)
+with c1:
+    batch_rows = st.select_slider("Rows per request", options=[500, 1000, 2000, 5000, 10000, 20000],
+                                  value=5000)
+with c2:
+    parallel = st.slider("Requests in flight", 1, 8, 2,
+                         help="Overlaps encoding and network time with server scoring")
+run = st.button("🚀  SCORE FILE", width='stretch', disabled=uploaded is None or health_data is None)
+
+if run:
+    session = api.session()
+    size = max(uploaded.size, 1)
+    uploaded.seek(0)
+    chunks = pd.read_csv(uploaded, chunksize=batch_rows, dtype=ID_COLUMNS)
+
+    progress = st.progress(0.0, text="Starting…")
+    m1, m2, m3, m4 = st.columns(4)
+    scored_box, fraud_box, error_box, rate_box = m1.empty(), m2.empty(), m3.empty(), m4.empty()
+    chart_box = st.empty()
+
+    results, scored, flagged, errors = [], 0, 0, 0
+    start = time.perf_counter()
+    # A bounded window of requests in flight keeps at most `parallel`
+    # encoded batches in memory, however large the file.
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        inflight = deque()
+        chunks = iter(chunks)
+        exhausted = False
+        while inflight or not exhausted:
+            while not exhausted and len(inflight) < parallel:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                body, content_type = api.encode_frame(chunk)
+                inflight.append(pool.submit(api.score_batch, session, body, content_type))
+            if not inflight:
+                break
+            try:
+                result = inflight.popleft().result()
+            except Exception as e:
+                st.error(f"Batch failed: {e}")
+                break
+            results.append(result)
+
+            valid = result["error"].isna()
+            scored += int(valid.sum())
+            errors += int((~valid).sum())
+            flagged += int((result["decision"] == "Fraud").sum())
+            elapsed = time.perf_counter() - start
+            progress.progress(min(uploaded.tell() / size, 1.0),
+                              text=f"{scored + errors:,} rows · {elapsed:.1f}s")
+            scored_box.metric("Scored", f"{scored:,}")
+            fraud_box.metric("Flagged", f"{flagged:,}",
+                             f"{flagged / scored * 100:.2f}%" if scored else None, delta_color="off")
+            error_box.metric("Invalid rows", f"{errors:,}")
+            rate_box.metric("Throughput", f"{(scored + errors) / elapsed:,.0f} rows/s")
+
+            probs = pd.concat([r["fraud_probability"] for r in results[-20:]], ignore_index=True)
+            chart_box.plotly_chart(
+                style_chart(px.histogram(probs.dropna(), nbins=50, color_discrete_sequence=["#00d4ff"]),
+                            "SCORE DISTRIBUTION (LATEST BATCHES)", height=200).update_layout(showlegend=False),
+                width='stretch'
+            )
+    progress.progress(1.0, text=f"Done · {scored + errors:,} rows in {time.perf_counter() - start:.1f}s")
+    if results:
+        st.session_state.batch_results = pd.concat(results, ignore_index=True)
+        api.rollups.clear()
+
+# ── Results ───────────────────────────────────────────────
+out = st.session_state.get("batch_results")
+if out is not None:
+    st.divider()
+    st.markdown('<div class="card-title">🚨 Highest-risk transactions</div>', unsafe_allow_html=True)
+    top = out[out["error"].isna()].nlargest(200, "fraud_probability")
+    st.dataframe(top, width='stretch', height=320)
+
+    bad = out[out["error"].notna()]
+    if len(bad):
+        with st.expander(f"⚠ {len(bad):,} invalid rows"):
+            st.dataframe(bad[["transaction_id", "error"]].head(1000), width='stretch')
+
+    st.download_button("⬇  Download all results (CSV)", out.to_csv(index=False).encode(),
+                       file_name="scored_transactions.csv", mime="text/csv")
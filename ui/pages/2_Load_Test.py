@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import api_client as api
+from common import apply_theme, header, status_line, style_chart, synthetic_payloads
+
+# ── Page config ───────────────────────────────────────────
+st.set_page_config(page_title="UPI-Guard++ · Load Test", page_icon="🛡", layout="wide")
+apply_theme()
+header("Load Test · Synthetic Traffic")
+health_data = api.health()
+status_line(health_data)
+
+st.caption("Fires synthetic transactions at the API from this machine. The traffic is scored "
+           "for real and lands in the decision log and drift window, so point it at a staging "
+           "deployment.")
+
+# ── Controls ──────────────────────────────────────────────
+c1, c2, c3, c4 = st.columns(4)
+with c1:
+    mode = st.selectbox("Endpoint", ["/predict", "/predict/batch"])
+with c2:
+    workers = st.slider("Concurrent clients", 1, 128, 16)
+with c3:
+    duration = st.slider("Duration (s)", 5, 300, 30)
+with c4:
+    target_rps = st.number_input("Target requests/s (0 = as fast as possible)", 0, 100000, 0, step=50)
+batch_rows = 1
+if mode == "/predict/batch":
+    batch_rows = st.select_slider("Rows per batch request", options=[10, 50, 100, 500, 1000], value=100)
+run = st.button("🚀  START LOAD TEST", width='stretch', disabled=health_data is None)
+
+
+def _client(s, path, bodies, client, clients, deadline, interval, stop, samples, lock):
+    """
+    One closed-loop client; paced to `interval` seconds per request if > 0.
+    Each client walks its own slice of `bodies`, and single requests get a
+    per-send transaction_id, so the result cache never answers for a
+    repeated body once a client wraps around.
+    """
+    own = bodies[client::clients] or bodies
+    i = 0
+    next_at = time.perf_counter()
+    while not stop.is_set() and time.perf_counter() < deadline:
+        if interval:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_at += interval
+        kwargs = own[i % len(own)]
+        if "json" in kwargs:
+            row = kwargs["json"]
+            kwargs = {"json": {**row, "transaction_id": f"{row['transaction_id']}_{client}_{i}"}}
+        status, ms = api.timed_post(s, path, **kwargs)
+        with lock:
+            samples.append((time.perf_counter(), ms, status))
+        i += 1
+
+
+def _bodies(n_requests):
+    rows = synthetic_payloads(n_requests * batch_rows)
+    if mode == "/predict":
+        return [{"json": r} for r in rows]
+    out = []
+    for i in range(0, len(rows), batch_rows):
+        body, content_type = api.encode_frame(pd.DataFrame.from_records(rows[i:i + batch_rows]))
+        out.append({"data": body, "headers": {"content-type": content_type}})
+    return out
+
+
+def _summarize(samples, start, now):
+    """Per-second throughput and latency percentiles (successful calls only)."""
+    seconds = pd.RangeIndex(int((now - start) // 1) + 1, name="second")
+    if not samples:
+        return pd.DataFrame({"second": seconds, "rows_per_s": 0, "p50": None, "p99": None})
+    frame = pd.DataFrame(samples, columns=["t", "ms", "status"])
+    frame["second"] = ((frame["t"] - start) // 1).astype(int)
+    ok = frame[frame["status"].between(200, 299)].groupby("second")["ms"]
+    out = pd.DataFrame({
+        "rows_per_s": ok.size() * batch_rows,
+        "p50": ok.quantile(0.50),
+        "p99": ok.quantile(0.99),
+    }).reindex(seconds)
+    out["rows_per_s"] = out["rows_per_s"].fillna(0)
+    return out.reset_index()
+
+
+if run:
+    # Payloads are built before the clock starts so only the API is measured;
+    # distinct bodies, split between the clients, keep the result cache from answering.
+    with st.spinner("Preparing synthetic traffic…"):
+        bodies = _bodies(min(max(workers * 50, 500), 20000 // batch_rows or 1))
+    s = api.session(max(32, workers))
+    samples, lock, stop = [], threading.Lock(), threading.Event()
+    interval = workers / target_rps if target_rps else 0.0
+
+    m1, m2, m3, m4 = st.columns(4)
+    boxes = [m1.empty(), m2.empty(), m3.empty(), m4.empty()]
+    c1, c2 = st.columns(2)
+    tput_box, lat_box = c1.empty(), c2.empty()
+    status_box = st.empty()
+    progress = st.progress(0.0)
+
+    start = time.perf_counter()
+    deadline = start + duration
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for client in range(workers):
+            pool.submit(_client, s, mode, bodies, client, workers, deadline, interval, stop, samples, lock)
+        while True:
+            now = time.perf_counter()
+            with lock:
+                snapshot = list(samples)
+            df = _summarize(snapshot, start, min(now, deadline))
+            # the last, partial second would read low; plot completed seconds
+            done = df[df["second"] < int(now - start)] if now < deadline else df
+
+            ok = [m for _, m, code in snapshot if 200 <= code < 300]
+            elapsed = min(now, deadline) - start
+            boxes[0].metric("Requests", f"{len(snapshot):,}")
+            boxes[1].metric("Throughput", f"{len(ok) * batch_rows / max(elapsed, 1e-9):,.0f} txn/s")
+            boxes[2].metric("p99 latency", f"{np.percentile(ok, 99):.1f} ms" if ok else "—")
+            boxes[3].metric("Errors / shed", f"{len(snapshot) - len(ok):,}")
+
+            fig = go.Figure(go.Scatter(x=done["second"], y=done["rows_per_s"], mode="lines",
+                                       line={"color": "#00d4ff", "width": 1.6}, name="txn/s"))
+            tput_box.plotly_chart(style_chart(fig, "THROUGHPUT (TXN/S)"), width='stretch')
+            fig = go.Figure([
+                go.Scatter(x=done["second"], y=done["p50"], mode="lines", name="p50",
+                           line={"color": "#00e5a0", "width": 1.6}),
+                go.Scatter(x=done["second"], y=done["p99"], mode="lines", name="p99",
+                           line={"color": "#ff3b5c", "width": 1.6}),
+            ])
+            lat_box.plotly_chart(style_chart(fig, "LATENCY (ms)"), width='stretch')
+            progress.progress(min(elapsed / duration, 1.0))
+
+            if now >= deadline:
+                break
+            time.sleep(1.0)
+    finally:
+        # also runs when a rerun interrupts the script, so clients never outlive it
+        stop.set()
+        pool.shutdown(wait=True)
+
+    codes = pd.Series([code for _, _, code in samples]).value_counts().sort_index()
+    status_box.caption("Status codes: " + ", ".join(
+        f"{'conn error' if code == 0 else code}: {count:,}" for code, count in codes.items()
+    ))
+    api.rollups.clear()